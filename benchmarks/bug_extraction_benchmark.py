@@ -0,0 +1,121 @@
+"""
+Benchmark for bug report extraction (device, OS version, error message, steps)
+
+Compares the previous per-pattern `re.search` loops with the single-scan
+ExtractionEngine on the bundled CSVs replicated `--scale` times.
+
+Usage:
+    python benchmarks/bug_extraction_benchmark.py --scale 10000
+"""
+import argparse
+import os
+import re
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.agents.bug_analyzer_agent import BugAnalyzerAgent  # noqa: E402
+from src.agents.extraction_engine import bug_report_extractor  # noqa: E402
+
+
+DEVICE_PATTERNS = [
+    r'(iPhone \d+\s*Pro\s*Max|iPhone \d+\s*Pro|iPhone \d+)',
+    r'(iPad Pro|iPad Air|iPad Mini|iPad)',
+    r'(Samsung Galaxy [A-Z]\d+)',
+    r'(Pixel \d+\s*Pro|Pixel \d+)',
+    r'(OnePlus \d+)',
+    r'(Xiaomi [A-Za-z0-9\s]+)'
+]
+
+ERROR_PATTERNS = [
+    r'["\']([^"\']*error[^"\']*)["\']',
+    r'error[:\s]+([^.]+)',
+    r'message[:\s]+([^.]+)'
+]
+
+
+def legacy_extract(text: str) -> tuple:
+    """Previous implementation: one re.search per pattern"""
+    device = 'Unknown'
+    for pattern in DEVICE_PATTERNS:
+        match = re.search(pattern, text, re.IGNORECASE)
+        if match:
+            device = match.group(1)
+            break
+
+    os_version = 'Unknown'
+    for name in ['Android', 'iOS', 'iPadOS']:
+        match = re.search(name + r'\s+(\d+(?:\.\d+)?)', text, re.IGNORECASE)
+        if match:
+            os_version = f"{name} {match.group(1)}"
+            break
+
+    error_message = 'None'
+    for pattern in ERROR_PATTERNS:
+        match = re.search(pattern, text, re.IGNORECASE)
+        if match:
+            error_message = match.group(1).strip()
+            break
+
+    match = re.search(r'(?:steps?|reproduce|how to)[\s:]+(.+?)(?:\.|$)', text, re.IGNORECASE | re.DOTALL)
+    steps = match.group(1).strip() if match else None
+
+    return device, os_version, error_message, steps
+
+
+def engine_extract(agent: BugAnalyzerAgent, text: str) -> tuple:
+    """Current implementation: one scan through the extraction engine"""
+    found = bug_report_extractor.extract(text)
+    steps = found['steps'][1].strip() if 'steps' in found else None
+    return (
+        agent._extract_device(found),
+        agent._extract_os_version(found),
+        agent._extract_error_message(found),
+        steps
+    )
+
+
+def load_texts(data_dir: str) -> list:
+    """Read review texts and email bodies from the bundled CSVs"""
+    reviews = pd.read_csv(os.path.join(data_dir, 'app_store_reviews.csv'))
+    emails = pd.read_csv(os.path.join(data_dir, 'support_emails.csv'))
+    return reviews['review_text'].tolist() + emails['body'].tolist()
+
+
+def time_per_item(func, texts: list) -> float:
+    """Run func over texts and return the mean latency in microseconds"""
+    start = time.perf_counter()
+    for text in texts:
+        func(text)
+    return (time.perf_counter() - start) / len(texts) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scale', type=int, default=10000, help='Times to replicate the bundled rows')
+    parser.add_argument('--data-dir', default='data', help='Directory with the bundled CSVs')
+    args = parser.parse_args()
+
+    agent = BugAnalyzerAgent()
+    base_texts = load_texts(args.data_dir)
+
+    # Both implementations must agree before timing them
+    for text in base_texts:
+        assert legacy_extract(text) == engine_extract(agent, text), text
+
+    texts = base_texts * args.scale
+    print(f"Items: {len(texts)} ({len(base_texts)} bundled rows x {args.scale})")
+
+    before = time_per_item(legacy_extract, texts)
+    after = time_per_item(lambda text: engine_extract(agent, text), texts)
+
+    print(f"Before (per-pattern re.search): {before:8.2f} us/item")
+    print(f"After  (single-scan engine):    {after:8.2f} us/item")
+    print(f"Speedup: {before / after:.2f}x")
+
+
+if __name__ == '__main__':
+    main()
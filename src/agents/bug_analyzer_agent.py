@@ -1,6 +1,8 @@
 import logging
-import re
-from typing import Dict, Optional
+from typing import Dict, Optional, Tuple
+from src.agents.extraction_engine import bug_report_extractor
+from src.agents.keyword_matcher import KeywordHits, feedback_hits
+from src.models.feedback_record import feedback_text, feedback_text_lower
 
 logger = logging.getLogger(__name__)
 
@@ -8,167 +10,113 @@ logger = logging.getLogger(__name__)
 class BugAnalyzerAgent:
     """Agent responsible for extracting technical details from bug reports"""
     
+    # Prefix for each `os_version` pattern, in pattern order
+    OS_NAMES = ['Android', 'iOS', 'iPadOS']
+    
     def __init__(self):
         self.name = "Bug Analysis Agent"
         logger.info(f"{self.name} initialized")
     
     def analyze_bug(self, feedback: Dict) -> Dict:
         """Extract technical details from bug report"""
-        text = feedback.get('review_text') or feedback.get('body', '')
+        text = feedback_text(feedback)
+        text_lower = feedback_text_lower(feedback)
+        hits = feedback_hits(feedback)
+        found = bug_report_extractor.extract(text, text_lower)
         
         analysis = {
-            'platform': self._extract_platform(feedback, text),
-            'device': self._extract_device(text),
-            'os_version': self._extract_os_version(text),
+            'platform': self._extract_platform(feedback, hits),
+            'device': self._extract_device(found),
+            'os_version': self._extract_os_version(found),
             'app_version': feedback.get('app_version', 'Unknown'),
-            'severity': self._assess_severity(text, feedback.get('rating')),
-            'steps_to_reproduce': self._extract_steps(text),
-            'error_message': self._extract_error_message(text),
-            'impact': self._assess_impact(text)
+            'severity': self._assess_severity(hits, feedback.get('rating')),
+            'steps_to_reproduce': self._extract_steps(text, text_lower, found),
+            'error_message': self._extract_error_message(found),
+            'impact': self._assess_impact(hits)
         }
         
         return analysis
     
-    def _extract_platform(self, feedback: Dict, text: str) -> str:
+    def _extract_platform(self, feedback: Dict, hits: KeywordHits) -> str:
         """Extract platform information"""
         platform = feedback.get('platform', '')
         if platform:
             return platform
         
-        text_lower = text.lower()
-        if 'android' in text_lower:
+        if hits.any('bug.platform.android'):
             return 'Android'
-        elif 'ios' in text_lower or 'iphone' in text_lower or 'ipad' in text_lower:
+        elif hits.any('bug.platform.ios'):
             return 'iOS'
         
         return 'Unknown'
     
-    def _extract_device(self, text: str) -> str:
+    def _extract_device(self, found: Dict[str, Tuple[int, str]]) -> str:
         """Extract device model from text"""
-        # Common device patterns
-        device_patterns = [
-            r'(iPhone \d+\s*Pro\s*Max|iPhone \d+\s*Pro|iPhone \d+)',
-            r'(iPad Pro|iPad Air|iPad Mini|iPad)',
-            r'(Samsung Galaxy [A-Z]\d+)',
-            r'(Pixel \d+\s*Pro|Pixel \d+)',
-            r'(OnePlus \d+)',
-            r'(Xiaomi [A-Za-z0-9\s]+)'
-        ]
-        
-        for pattern in device_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                return match.group(1)
+        if 'device' in found:
+            return found['device'][1]
         
         return 'Unknown'
     
-    def _extract_os_version(self, text: str) -> str:
+    def _extract_os_version(self, found: Dict[str, Tuple[int, str]]) -> str:
         """Extract OS version from text"""
-        # Android version pattern
-        android_match = re.search(r'Android\s+(\d+(?:\.\d+)?)', text, re.IGNORECASE)
-        if android_match:
-            return f"Android {android_match.group(1)}"
-        
-        # iOS version pattern
-        ios_match = re.search(r'iOS\s+(\d+(?:\.\d+)?)', text, re.IGNORECASE)
-        if ios_match:
-            return f"iOS {ios_match.group(1)}"
-        
-        # iPadOS version pattern
-        ipad_match = re.search(r'iPadOS\s+(\d+(?:\.\d+)?)', text, re.IGNORECASE)
-        if ipad_match:
-            return f"iPadOS {ipad_match.group(1)}"
+        if 'os_version' in found:
+            index, version = found['os_version']
+            return f"{self.OS_NAMES[index]} {version}"
         
         return 'Unknown'
     
-    def _assess_severity(self, text: str, rating: Optional[int]) -> str:
+    def _assess_severity(self, hits: KeywordHits, rating: Optional[int]) -> str:
         """Assess bug severity"""
-        text_lower = text.lower()
-        
         # Critical indicators
-        critical_keywords = [
-            'data loss', 'deleted', 'lost', 'crash', 'won\'t open',
-            'can\'t login', 'urgent', 'critical', 'all my data'
-        ]
-        
-        # High severity indicators
-        high_keywords = [
-            'not working', 'broken', 'fail', 'error', 'constant',
-            'every time', 'always', 'unusable'
-        ]
-        
-        if any(keyword in text_lower for keyword in critical_keywords):
+        if hits.any('bug.severity.critical'):
             return 'Critical'
         
         if rating and rating == 1:
             return 'High'
         
-        if any(keyword in text_lower for keyword in high_keywords):
+        # High severity indicators
+        if hits.any('bug.severity.high'):
             return 'High'
         
         return 'Medium'
     
-    def _extract_steps(self, text: str) -> str:
+    def _extract_steps(self, text: str, text_lower: str, found: Dict[str, Tuple[int, str]]) -> str:
         """Extract steps to reproduce"""
         # Look for numbered steps or sequential actions
-        steps_pattern = r'(?:steps?|reproduce|how to)[\s:]+(.+?)(?:\.|$)'
-        match = re.search(steps_pattern, text, re.IGNORECASE | re.DOTALL)
-        
-        if match:
-            return match.group(1).strip()
+        if 'steps' in found:
+            return found['steps'][1].strip()
         
         # Look for action sequences
         action_words = ['open', 'click', 'select', 'try', 'upload', 'download']
-        sentences = text.split('.')
-        steps = [s.strip() for s in sentences if any(word in s.lower() for word in action_words)]
+        sentences = zip(text.split('.'), text_lower.split('.'))
+        steps = [s.strip() for s, s_lower in sentences if any(word in s_lower for word in action_words)]
         
         if steps:
             return ' -> '.join(steps[:3])  # Return first 3 steps
         
         return 'Not specified'
     
-    def _extract_error_message(self, text: str) -> str:
+    def _extract_error_message(self, found: Dict[str, Tuple[int, str]]) -> str:
         """Extract error messages from text"""
-        # Look for quoted error messages
-        error_patterns = [
-            r'["\']([^"\']*error[^"\']*)["\']',
-            r'error[:\s]+([^.]+)',
-            r'message[:\s]+([^.]+)'
-        ]
-        
-        for pattern in error_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                return match.group(1).strip()
+        if 'error_message' in found:
+            return found['error_message'][1].strip()
         
         return 'None'
     
-    def _assess_impact(self, text: str) -> str:
+    def _assess_impact(self, hits: KeywordHits) -> str:
         """Assess user impact"""
-        text_lower = text.lower()
-        
-        high_impact = [
-            'unusable', 'can\'t use', 'lost data', 'months of work',
-            'critical', 'urgent', 'important'
-        ]
-        
-        if any(keyword in text_lower for keyword in high_impact):
+        if hits.any('bug.impact.high'):
             return 'High - Blocking user workflow'
         
         return 'Medium - Degraded user experience'
     
     def analyze_batch(self, feedback_items: list) -> list:
-        """Analyze a batch of bug reports"""
-        results = []
+        """Analyze the bug reports of a batch in place"""
+        analyzed = 0
         for item in feedback_items:
             if item.get('category') == 'Bug':
-                analysis = self.analyze_bug(item)
-                results.append({
-                    **item,
-                    'technical_analysis': analysis
-                })
-            else:
-                results.append(item)
+                item['technical_analysis'] = self.analyze_bug(item)
+                analyzed += 1
         
-        logger.info(f"Analyzed {sum(1 for r in results if 'technical_analysis' in r)} bug reports")
-        return results
+        logger.info(f"Analyzed {analyzed} bug reports")
+        return feedback_items
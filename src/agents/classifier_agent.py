@@ -1,6 +1,7 @@
 import logging
-from typing import Dict, Tuple
-import re
+from typing import Dict, List, Optional, Tuple
+from src.agents.keyword_matcher import LEXICONS, KeywordHits, keyword_matcher
+from src.models.feedback_record import feedback_text, feedback_text_lower, feedback_tokens
 
 logger = logging.getLogger(__name__)
 
@@ -14,55 +15,38 @@ class FeedbackClassifierAgent:
         self.name = "Feedback Classifier Agent"
         logger.info(f"{self.name} initialized")
         
-        # Keywords for classification
-        self.bug_keywords = [
-            'crash', 'bug', 'error', 'broken', 'not working', 'issue', 'problem',
-            'fail', 'freeze', 'slow', 'lag', 'glitch', 'stuck', 'won\'t', 'can\'t',
-            'doesn\'t work', 'stopped working', 'data loss', 'deleted', 'missing'
-        ]
-        
-        self.feature_keywords = [
-            'feature', 'request', 'add', 'would love', 'please add', 'suggestion',
-            'improve', 'enhancement', 'would be nice', 'missing', 'need', 'want',
-            'integration', 'support for', 'ability to'
-        ]
-        
-        self.praise_keywords = [
-            'love', 'amazing', 'great', 'excellent', 'perfect', 'best', 'awesome',
-            'fantastic', 'wonderful', 'thank you', 'appreciate', 'outstanding',
-            'brilliant', 'superb', 'incredible'
-        ]
-        
-        self.complaint_keywords = [
-            'expensive', 'price', 'cost', 'poor', 'bad', 'terrible', 'worst',
-            'disappointed', 'frustrating', 'annoying', 'unacceptable', 'no response',
-            'customer service', 'support'
-        ]
-        
-        self.spam_keywords = [
-            'buy', 'cheap', 'www.', 'http', 'click here', 'limited time',
-            'guaranteed', 'free money', 'winner'
-        ]
+        # Keywords for classification (shared with the keyword matcher)
+        self.bug_keywords = LEXICONS['classifier.bug']
+        self.feature_keywords = LEXICONS['classifier.feature']
+        self.praise_keywords = LEXICONS['classifier.praise']
+        self.complaint_keywords = LEXICONS['classifier.complaint']
+        self.spam_keywords = LEXICONS['classifier.spam']
     
-    def classify_feedback(self, text: str, rating: int = None) -> Tuple[str, float]:
+    def classify_feedback(self, text: str, rating: int = None, hits: Optional[KeywordHits] = None,
+                          tokens: Optional[List[str]] = None) -> Tuple[str, float]:
         """
         Classify feedback text into a category
         
+        Args:
+            hits: Precomputed keyword hits for the text (scanned here if omitted)
+            tokens: Precomputed `text.split()` (split here if omitted)
+        
         Returns:
             Tuple of (category, confidence_score)
         """
-        text_lower = text.lower()
+        if hits is None:
+            hits = keyword_matcher.scan(text.lower())
         
         # Check for spam first
-        spam_score = self._calculate_score(text_lower, self.spam_keywords)
-        if spam_score > 0.3 or self._is_gibberish(text):
+        spam_score = self._calculate_score(hits, 'classifier.spam')
+        if spam_score > 0.3 or self._is_gibberish(text, tokens):
             return 'Spam', spam_score
         
         # Calculate scores for each category
-        bug_score = self._calculate_score(text_lower, self.bug_keywords)
-        feature_score = self._calculate_score(text_lower, self.feature_keywords)
-        praise_score = self._calculate_score(text_lower, self.praise_keywords)
-        complaint_score = self._calculate_score(text_lower, self.complaint_keywords)
+        bug_score = self._calculate_score(hits, 'classifier.bug')
+        feature_score = self._calculate_score(hits, 'classifier.feature')
+        praise_score = self._calculate_score(hits, 'classifier.praise')
+        complaint_score = self._calculate_score(hits, 'classifier.complaint')
         
         # Adjust scores based on rating if available
         if rating is not None:
@@ -86,15 +70,14 @@ class FeedbackClassifierAgent:
         logger.debug(f"Classified as {category} with confidence {confidence:.2f}")
         return category, confidence
     
-    def _calculate_score(self, text: str, keywords: list) -> float:
+    def _calculate_score(self, hits: KeywordHits, lexicon: str) -> float:
         """Calculate score based on keyword matches"""
-        matches = sum(1 for keyword in keywords if keyword in text)
-        return min(matches / len(keywords), 1.0)
+        return min(hits.count(lexicon) / len(LEXICONS[lexicon]), 1.0)
     
-    def _is_gibberish(self, text: str) -> bool:
+    def _is_gibberish(self, text: str, tokens: Optional[List[str]] = None) -> bool:
         """Check if text is gibberish/random characters"""
         # Check for excessive consonants or random patterns
-        words = text.split()
+        words = tokens if tokens is not None else text.split()
         if len(words) < 3:
             return False
         
@@ -107,18 +90,16 @@ class FeedbackClassifierAgent:
         return any(char in 'aeiouAEIOU' for char in word)
     
     def classify_batch(self, feedback_items: list) -> list:
-        """Classify a batch of feedback items"""
-        results = []
+        """Classify a batch of feedback items in place"""
         for item in feedback_items:
-            text = item.get('review_text') or item.get('body', '')
-            rating = item.get('rating')
-            category, confidence = self.classify_feedback(text, rating)
+            hits = keyword_matcher.scan(feedback_text_lower(item))
+            category, confidence = self.classify_feedback(
+                feedback_text(item), item.get('rating'), hits, feedback_tokens(item)
+            )
             
-            results.append({
-                **item,
-                'category': category,
-                'confidence': confidence
-            })
+            item['category'] = category
+            item['confidence'] = confidence
+            item['keyword_hits'] = hits
         
-        logger.info(f"Classified {len(results)} feedback items")
-        return results
+        logger.info(f"Classified {len(feedback_items)} feedback items")
+        return feedback_items
@@ -1,6 +1,11 @@
+import csv
+import io
 import pandas as pd
 import logging
-from typing import Dict, List
+from typing import BinaryIO, Dict, Iterator, List, Optional, Union
+from src.agents.feedback_ingest import FeedbackIngestor
+from src.agents.source_adapters import SourceSpec, source_adapter
+from src.models.feedback_record import FeedbackRecord
 
 logger = logging.getLogger(__name__)
 
@@ -8,9 +13,16 @@ logger = logging.getLogger(__name__)
 class CSVReaderAgent:
     """Agent responsible for reading and parsing feedback data from CSV files"""
     
-    def __init__(self):
+    # Columns every source file must have
+    REQUIRED_COLUMNS = {
+        'review': ['review_id', 'review_text'],
+        'email': ['email_id', 'body']
+    }
+    
+    def __init__(self, ingestor: Optional[FeedbackIngestor] = None):
         self.name = "CSV Reader Agent"
-        logger.info(f"{self.name} initialized")
+        self.ingestor = ingestor if ingestor is not None else FeedbackIngestor()
+        logger.info(f"{self.name} initialized ({self.ingestor.engine} CSV engine)")
     
     def read_app_reviews(self, file_path: str) -> List[Dict]:
         """Read app store reviews from CSV file"""
@@ -40,3 +52,162 @@ class CSVReaderAgent:
             'reviews': self.read_app_reviews(reviews_path),
             'emails': self.read_support_emails(emails_path)
         }
+    
+    def read_feedback_records(self, reviews_path: str, emails_path: str) -> List[FeedbackRecord]:
+        """Read all feedback sources concurrently as compact records, reviews first"""
+        try:
+            reviews_df, emails_df = self.ingestor.read_frames(reviews_path, emails_path)
+            reviews = FeedbackRecord.from_frame(reviews_df, 'review')
+            emails = FeedbackRecord.from_frame(emails_df, 'email')
+            logger.info(f"Read {len(reviews)} app store reviews and {len(emails)} support emails as records")
+            return reviews + emails
+        except Exception as e:
+            logger.error(f"Error reading feedback records: {e}")
+            raise
+    
+    def check_header(self, file: BinaryIO, source_type: str) -> List[str]:
+        """
+        Read the header line of a seekable binary CSV and rewind it
+        
+        Returns:
+            Required columns missing from the header
+        
+        Raises:
+            ValueError: If the header is empty or not valid UTF-8 CSV
+        """
+        columns = {column.strip() for column in self.read_header(file)}
+        return [column for column in self.REQUIRED_COLUMNS[source_type] if column not in columns]
+    
+    def read_header(self, file: BinaryIO) -> List[str]:
+        """
+        Column names from the first line of a seekable binary CSV, rewinding it
+        
+        Raises:
+            ValueError: If the header is empty or not valid UTF-8 CSV
+        """
+        first_line = file.readline()
+        file.seek(0)
+        
+        try:
+            header = next(csv.reader(io.StringIO(first_line.decode('utf-8-sig'))), [])
+        except (UnicodeDecodeError, csv.Error) as e:
+            raise ValueError(f"Unreadable CSV header: {e}") from e
+        
+        if not header:
+            raise ValueError("CSV file is empty")
+        return header
+    
+    def complete_rows_end(self, file_path: str, start: int = 0) -> int:
+        """
+        Byte offset just past the last complete CSV record, so a row still being appended is left for later
+        
+        Records are delimited by the CSV parser, so a quoted field spanning
+        lines never ends a record early. `start` is 0 or an offset returned
+        earlier (a record boundary); only the bytes after it are scanned.
+        """
+        with open(file_path, 'rb') as f:
+            f.seek(start)
+            lines = _CsvLines(f, start)
+            end = start
+            for _ in csv.reader(lines):
+                # A record returned only at the end of the data lacks its newline or closing quote
+                if not lines.exhausted and lines.newline_terminated:
+                    end = lines.offset
+        return end
+    
+    def iter_records_between(self, file_path: str, source_type: str, start: int, end: int,
+                             chunksize: int) -> Iterator[List[FeedbackRecord]]:
+        """
+        Read the rows stored between two byte offsets of a CSV file in chunks
+        
+        `start` is 0 or the offset where an earlier read stopped (a row boundary);
+        column names always come from the file's header line.
+        """
+        try:
+            with open(file_path, 'rb') as f:
+                header = self.read_header(f)
+                if start == 0:
+                    start = len(f.readline())
+                    f.seek(0)
+                if end <= start:
+                    return
+                
+                f.seek(start)
+                rows = io.BufferedReader(_ByteRange(f, end - start))
+                for df in self.ingestor.iter_frames(rows, source_type, chunksize, names=header):
+                    yield FeedbackRecord.from_frame(df, source_type)
+        except Exception as e:
+            logger.error(f"Error reading {source_type} records from {file_path} at byte {start}: {e}")
+            raise
+    
+    def iter_feedback_records(self, reviews_source: Union[str, BinaryIO], emails_source: Union[str, BinaryIO],
+                              chunksize: int) -> Iterator[List[FeedbackRecord]]:
+        """
+        Read all feedback sources as chunks of at most `chunksize` records, reviews first
+        
+        Sources are file paths or binary file objects (e.g. an upload's spooled file),
+        parsed incrementally without reading them whole.
+        """
+        for file_path, source_type in ((reviews_source, 'review'), (emails_source, 'email')):
+            try:
+                for df in self.ingestor.iter_frames(file_path, source_type, chunksize):
+                    yield FeedbackRecord.from_frame(df, source_type)
+            except Exception as e:
+                logger.error(f"Error streaming {source_type} records from {file_path}: {e}")
+                raise
+    
+    def iter_sources(self, sources: List[SourceSpec], chunksize: int) -> Iterator[List[FeedbackRecord]]:
+        """
+        Read feedback from declared sources (CSV, JSON Lines or Parquet, optionally compressed) in order
+        
+        Each source's columns are mapped to the record fields and its filters
+        applied by the adapter for its format, while reading.
+        """
+        for spec in sources:
+            try:
+                for df in source_adapter(spec, self.ingestor).iter_frames(spec, chunksize):
+                    yield FeedbackRecord.from_frame(df, spec.source_type)
+            except Exception as e:
+                logger.error(f"Error reading {spec}: {e}")
+                raise
+
+
+class _ByteRange(io.RawIOBase):
+    """Read-only view of the next `length` bytes of a binary file"""
+    
+    def __init__(self, file: BinaryIO, length: int):
+        self._file = file
+        self._remaining = length
+    
+    def readable(self) -> bool:
+        return True
+    
+    def readinto(self, buffer) -> int:
+        if self._remaining <= 0:
+            return 0
+        data = self._file.read(min(len(buffer), self._remaining))
+        buffer[:len(data)] = data
+        self._remaining -= len(data)
+        return len(data)
+
+
+class _CsvLines:
+    """Lines of a binary file decoded for csv.reader, tracking the byte offset after the last line read"""
+    
+    def __init__(self, file: BinaryIO, offset: int):
+        self._file = file
+        self.offset = offset
+        self.newline_terminated = True
+        self.exhausted = False
+    
+    def __iter__(self) -> Iterator[str]:
+        return self
+    
+    def __next__(self) -> str:
+        line = self._file.readline()
+        if not line:
+            self.exhausted = True
+            raise StopIteration
+        self.offset += len(line)
+        self.newline_terminated = line.endswith(b'\n')
+        return line.decode('utf-8', errors='replace')
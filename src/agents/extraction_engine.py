@@ -0,0 +1,148 @@
+import hashlib
+import json
+import logging
+import re
+from typing import Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+# Pattern families used by BugAnalyzerAgent. Each pattern has exactly one
+# capturing group and patterns are listed in priority order: the first
+# pattern that matches anywhere in the text wins its family.
+BUG_REPORT_PATTERNS: Dict[str, List[str]] = {
+    'device': [
+        r'(iPhone \d+\s*Pro\s*Max|iPhone \d+\s*Pro|iPhone \d+)',
+        r'(iPad Pro|iPad Air|iPad Mini|iPad)',
+        r'(Samsung Galaxy [A-Z]\d+)',
+        r'(Pixel \d+\s*Pro|Pixel \d+)',
+        r'(OnePlus \d+)',
+        r'(Xiaomi [A-Za-z0-9\s]+)'
+    ],
+    'os_version': [
+        r'Android\s+(\d+(?:\.\d+)?)',
+        r'iOS\s+(\d+(?:\.\d+)?)',
+        r'iPadOS\s+(\d+(?:\.\d+)?)'
+    ],
+    'error_message': [
+        r'["\']([^"\']*error[^"\']*)["\']',
+        r'error[:\s]+([^.]+)',
+        r'message[:\s]+([^.]+)'
+    ],
+    'steps': [
+        r'(?s:(?:steps?|reproduce|how to)[\s:]+(.+?)(?:\.|$))'
+    ]
+}
+
+# Lowercase literals that every BUG_REPORT_PATTERNS match starts with
+BUG_REPORT_ANCHORS = [
+    'iphone', 'ipad', 'samsung galaxy', 'pixel', 'oneplus', 'xiaomi',
+    'android', 'ios', '"', "'", 'error', 'message', 'step', 'reproduce', 'how to'
+]
+
+# Pattern families used by FeedbackService.analyze_bug
+SERVICE_BUG_PATTERNS: Dict[str, List[str]] = {
+    'device': [
+        r'(iPhone \d+\s*Pro\s*Max|iPhone \d+\s*Pro|iPhone \d+)',
+        r'(Samsung Galaxy [A-Z]\d+)',
+        r'(Pixel \d+)',
+    ]
+}
+
+# Lowercase literals that every SERVICE_BUG_PATTERNS match starts with
+SERVICE_BUG_ANCHORS = ['iphone', 'samsung galaxy', 'pixel']
+
+# Digest of every pattern family; changes whenever a pattern changes
+PATTERN_VERSION = hashlib.blake2b(
+    json.dumps([BUG_REPORT_PATTERNS, SERVICE_BUG_PATTERNS], sort_keys=True).encode(), digest_size=8
+).hexdigest()
+
+# First plain capturing group of a pattern: "(" not escaped and not "(?"
+_CAPTURE_GROUP = re.compile(r'(?<!\\)\((?!\?)')
+
+
+class ExtractionEngine:
+    """Extracts several regex families from a text in a single scan"""
+
+    def __init__(self, families: Dict[str, List[str]], anchors: List[str], flags: int = re.IGNORECASE):
+        """
+        Args:
+            families: Family name -> patterns in priority order, one capturing group each
+            anchors: Lowercase literals that every pattern match starts with
+            flags: Regex flags applied to every pattern
+        """
+        self.families = families
+
+        # One optional lookahead per pattern, with its capturing group renamed
+        # to "f<family index>_<pattern index>", so every pattern is tried at a
+        # position without consuming text another pattern needs
+        self._groups: Dict[str, Tuple[str, int]] = {}
+        lookaheads = []
+        for family_index, (family, patterns) in enumerate(families.items()):
+            for index, pattern in enumerate(patterns):
+                group = f"f{family_index}_{index}"
+                named, count = _CAPTURE_GROUP.subn(f'(?P<{group}>', pattern, count=1)
+                if not count:
+                    raise ValueError(f"Pattern for '{family}' has no capturing group: {pattern}")
+                self._groups[group] = (family, index)
+                lookaheads.append(f'(?:(?={named})|)')
+
+        # Only report positions where at least one pattern matched
+        gate = '(?!)'
+        for group in reversed(list(self._groups)):
+            gate = f'(?({group})|{gate})'
+
+        self._pattern = re.compile(''.join(lookaheads) + gate, flags)
+
+        # Case-sensitive zero-width search for anchors in the lowercased text,
+        # so the full pattern is only tried where a match can start
+        first_chars = ''.join(sorted({anchor[0] for anchor in anchors}))
+        self._anchors = re.compile(
+            f"(?=[{re.escape(first_chars)}])(?=(?:{'|'.join(re.escape(anchor) for anchor in anchors)}))"
+        )
+        logger.info(f"Extraction engine compiled: {len(self._groups)} patterns in {len(families)} families")
+
+    def extract(self, text: str, text_lower: Optional[str] = None) -> Dict[str, Tuple[int, str]]:
+        """
+        Scan a text once for every pattern family
+
+        Args:
+            text_lower: Precomputed `text.lower()` (lowercased here if omitted)
+
+        Returns:
+            Dict of family -> (pattern index, captured text) for the families
+            found, using the highest-priority pattern's leftmost match
+        """
+        found: Dict[str, Tuple[int, str]] = {}
+        for match in self._matches(text, text_lower):
+            for group, value in match.groupdict().items():
+                if value is None:
+                    continue
+                family, index = self._groups[group]
+                if family not in found or index < found[family][0]:
+                    found[family] = (index, value)
+
+            # Nothing can beat the top pattern of every family
+            if len(found) == len(self.families) and not any(index for index, _ in found.values()):
+                break
+
+        return found
+
+    def _matches(self, text: str, text_lower: Optional[str] = None) -> Iterator[re.Match]:
+        """Full-pattern matches at the anchor positions of a text"""
+        if text_lower is None:
+            text_lower = text.lower()
+        if len(text_lower) != len(text):
+            # Lowercasing moved offsets; try every position instead
+            yield from self._pattern.finditer(text)
+            return
+
+        for anchor in self._anchors.finditer(text_lower):
+            match = self._pattern.match(text, anchor.start())
+            if match:
+                yield match
+
+
+# Shared engines, compiled once at import time
+bug_report_extractor = ExtractionEngine(BUG_REPORT_PATTERNS, BUG_REPORT_ANCHORS)
+service_bug_extractor = ExtractionEngine(SERVICE_BUG_PATTERNS, SERVICE_BUG_ANCHORS)
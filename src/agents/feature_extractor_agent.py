@@ -1,6 +1,8 @@
 import logging
 import re
 from typing import Dict
+from src.agents.keyword_matcher import KeywordHits, feedback_hits
+from src.models.feedback_record import feedback_text_lower
 
 logger = logging.getLogger(__name__)
 
@@ -8,44 +10,36 @@ logger = logging.getLogger(__name__)
 class FeatureExtractorAgent:
     """Agent responsible for extracting feature requests and estimating impact"""
     
+    # Known features, matched in this order against the `feature.*` lexicons
+    FEATURES = [
+        'calendar integration', 'offline mode', 'dark mode', 'export functionality',
+        'widget support', 'biometric auth', 'cloud integration', 'search improvements',
+        'collaboration', 'templates'
+    ]
+    
     def __init__(self):
         self.name = "Feature Extractor Agent"
         logger.info(f"{self.name} initialized")
     
     def extract_feature(self, feedback: Dict) -> Dict:
         """Extract feature request details"""
-        text = feedback.get('review_text') or feedback.get('body', '')
+        text_lower = feedback_text_lower(feedback)
+        hits = feedback_hits(feedback)
         
         extraction = {
-            'requested_feature': self._identify_feature(text),
-            'user_benefit': self._extract_benefit(text),
-            'estimated_demand': self._estimate_demand(feedback),
-            'implementation_complexity': self._estimate_complexity(text),
-            'similar_requests': 0  # Would be calculated by comparing with other requests
+            'requested_feature': self._identify_feature(text_lower, hits),
+            'user_benefit': self._extract_benefit(text_lower),
+            'estimated_demand': self._estimate_demand(feedback, hits),
+            'implementation_complexity': self._estimate_complexity(hits),
+            'similar_requests': feedback.get('similar_requests', 0)
         }
         
         return extraction
     
-    def _identify_feature(self, text: str) -> str:
+    def _identify_feature(self, text_lower: str, hits: KeywordHits) -> str:
         """Identify the requested feature"""
-        text_lower = text.lower()
-        
-        # Common feature patterns
-        feature_patterns = {
-            'calendar integration': ['calendar', 'google calendar', 'outlook', 'scheduling'],
-            'offline mode': ['offline', 'without internet', 'no connectivity'],
-            'dark mode': ['dark mode', 'dark theme', 'night mode', 'oled'],
-            'export functionality': ['export', 'pdf', 'csv', 'download'],
-            'widget support': ['widget', 'home screen', 'quick access'],
-            'biometric auth': ['biometric', 'face id', 'fingerprint', 'touch id'],
-            'cloud integration': ['google drive', 'dropbox', 'cloud storage', 'onedrive'],
-            'search improvements': ['search', 'find', 'filter', 'advanced search'],
-            'collaboration': ['share', 'collaborate', 'team', 'multi-user'],
-            'templates': ['template', 'recurring', 'preset']
-        }
-        
-        for feature, keywords in feature_patterns.items():
-            if any(keyword in text_lower for keyword in keywords):
+        for feature in self.FEATURES:
+            if hits.any(f'feature.{feature}'):
                 return feature
         
         # Extract from common request patterns
@@ -62,10 +56,8 @@ class FeatureExtractorAgent:
         
         return 'Feature request (details in description)'
     
-    def _extract_benefit(self, text: str) -> str:
+    def _extract_benefit(self, text_lower: str) -> str:
         """Extract user benefit from feature request"""
-        text_lower = text.lower()
-        
         # Look for benefit indicators
         benefit_patterns = [
             r'(?:would|will)\s+(?:make|be|help)([^.!?]+)',
@@ -80,19 +72,12 @@ class FeatureExtractorAgent:
         
         return 'Improved user experience'
     
-    def _estimate_demand(self, feedback: Dict) -> str:
+    def _estimate_demand(self, feedback: Dict, hits: KeywordHits) -> str:
         """Estimate user demand for feature"""
         rating = feedback.get('rating', 3)
-        text = feedback.get('review_text') or feedback.get('body', '')
-        text_lower = text.lower()
         
         # High demand indicators
-        high_demand_keywords = [
-            'really need', 'must have', 'essential', 'critical',
-            'many users', 'everyone', 'all users'
-        ]
-        
-        if any(keyword in text_lower for keyword in high_demand_keywords):
+        if hits.any('feature.demand.high'):
             return 'High'
         
         if rating >= 4:
@@ -100,42 +85,25 @@ class FeatureExtractorAgent:
         
         return 'Medium'
     
-    def _estimate_complexity(self, text: str) -> str:
+    def _estimate_complexity(self, hits: KeywordHits) -> str:
         """Estimate implementation complexity"""
-        text_lower = text.lower()
-        
         # Complex features
-        complex_keywords = [
-            'integration', 'sync', 'real-time', 'collaboration',
-            'multi-user', 'cloud', 'api'
-        ]
-        
-        # Simple features
-        simple_keywords = [
-            'button', 'color', 'theme', 'font', 'icon',
-            'notification', 'reminder'
-        ]
-        
-        if any(keyword in text_lower for keyword in complex_keywords):
+        if hits.any('feature.complexity.high'):
             return 'High'
         
-        if any(keyword in text_lower for keyword in simple_keywords):
+        # Simple features
+        if hits.any('feature.complexity.low'):
             return 'Low'
         
         return 'Medium'
     
     def extract_batch(self, feedback_items: list) -> list:
-        """Extract features from a batch of feedback"""
-        results = []
+        """Extract the feature requests of a batch in place"""
+        extracted = 0
         for item in feedback_items:
             if item.get('category') == 'Feature Request':
-                extraction = self.extract_feature(item)
-                results.append({
-                    **item,
-                    'feature_analysis': extraction
-                })
-            else:
-                results.append(item)
+                item['feature_analysis'] = self.extract_feature(item)
+                extracted += 1
         
-        logger.info(f"Extracted {sum(1 for r in results if 'feature_analysis' in r)} feature requests")
-        return results
+        logger.info(f"Extracted {extracted} feature requests")
+        return feedback_items
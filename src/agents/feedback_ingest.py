@@ -0,0 +1,304 @@
+import csv
+import io
+import logging
+import operator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.csv as pacsv
+except ImportError:  # the pandas C engine is used instead
+    pa = None
+    pc = None
+    pacsv = None
+
+from src.models.feedback_record import SOURCE_COLUMNS
+
+logger = logging.getLogger(__name__)
+
+# Column dtypes per source; low-cardinality columns are categoricals, the rest text
+SOURCE_DTYPES = {
+    'review': {
+        'review_id': 'str',
+        'review_text': 'str',
+        'platform': 'category',
+        'rating': 'float',
+        'user_name': 'str',
+        'date': 'str',
+        'app_version': 'category'
+    },
+    'email': {
+        'email_id': 'str',
+        'subject': 'str',
+        'body': 'str',
+        'sender_email': 'str',
+        'timestamp': 'str'
+    }
+}
+
+# Bytes per block handed to the pyarrow CSV reader's threads
+_BLOCK_SIZE = 1024 * 1024
+
+# Bytes read at a time when looking for a compressed file's header line
+_HEADER_BLOCK_SIZE = 64 * 1024
+
+# Row filter operators, applied to pandas Series and pyarrow expressions alike
+FILTER_OPS = {
+    '==': operator.eq,
+    '!=': operator.ne,
+    '<': operator.lt,
+    '<=': operator.le,
+    '>': operator.gt,
+    '>=': operator.ge
+}
+
+# Values read as missing, matching the pandas parser's defaults
+_PYARROW_NULLS = ['', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan', '1.#IND', '1.#QNAN',
+                  '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a', 'nan', 'null']
+
+# pyarrow column type for each SOURCE_DTYPES dtype
+_PYARROW_TYPES = {
+    'str': pa.string(),
+    'float': pa.float64(),
+    'category': pa.dictionary(pa.int32(), pa.string())
+} if pa is not None else {}
+
+FeedbackSource = Union[str, BinaryIO]
+
+# Row filter: (column, operator, value), e.g. ('date', '>', '2024-01-20')
+Filter = Tuple[str, str, Any]
+
+
+class FeedbackIngestor:
+    """
+    Reads feedback CSVs into typed DataFrames holding only the columns the pipeline uses
+
+    The multithreaded pyarrow CSV reader is used when pyarrow is installed
+    (falling back to the pandas C engine), with explicit dtypes: text
+    columns as strings, platform and app_version as categoricals.
+    Local files can be memory-mapped instead of read through buffers.
+    """
+
+    def __init__(self, engine: str = 'auto', memory_map: bool = False):
+        """
+        Args:
+            engine: "pyarrow", "c" or "auto" (pyarrow when installed)
+            memory_map: Memory-map local files instead of reading them through buffers
+        """
+        if engine == 'auto':
+            engine = 'pyarrow' if pacsv is not None else 'c'
+        if engine == 'pyarrow' and pacsv is None:
+            logger.warning("pyarrow is not installed, reading CSVs with the pandas C engine")
+            engine = 'c'
+
+        self.engine = engine
+        self.memory_map = memory_map
+
+    def read_frame(self, source: FeedbackSource, source_type: str, columns: Optional[Dict[str, str]] = None,
+                   compression: Optional[str] = None, filters: Optional[List[Filter]] = None) -> pd.DataFrame:
+        """
+        Read a whole feedback file (path or binary file object)
+
+        Args:
+            source: Path or binary file object
+            source_type: "review" or "email"
+            columns: Source column -> canonical column to read (the canonical columns if None)
+            compression: "gzip" or "zstd" for compressed files
+            filters: (column, op, value) row filters on canonical columns
+        """
+        columns = columns or canonical_columns(source_type)
+        if self.engine == 'pyarrow':
+            options = self._pyarrow_options(source_type, _header(source, compression), columns)
+            with self._open(source, compression) as stream:
+                table = pacsv.read_csv(stream, **options)
+            return to_frame(filter_table(table.rename_columns([columns[c] for c in table.column_names]), filters))
+
+        df = pd.read_csv(source, compression=compression, **self._pandas_options(source, source_type, columns))
+        return filter_frame(df.rename(columns=columns), filters)
+
+    def read_frames(self, reviews_source: FeedbackSource,
+                    emails_source: FeedbackSource) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """Read the reviews and emails files concurrently"""
+        with ThreadPoolExecutor(max_workers=2, thread_name_prefix="feedback-ingest") as pool:
+            reviews = pool.submit(self.read_frame, reviews_source, 'review')
+            emails = pool.submit(self.read_frame, emails_source, 'email')
+            return reviews.result(), emails.result()
+
+    def iter_frames(self, source: FeedbackSource, source_type: str, chunksize: int,
+                    names: Optional[List[str]] = None, columns: Optional[Dict[str, str]] = None,
+                    compression: Optional[str] = None,
+                    filters: Optional[List[Filter]] = None) -> Iterator[pd.DataFrame]:
+        """
+        Read a feedback file in DataFrames of at most `chunksize` rows
+
+        Args:
+            source: Path or binary file object
+            source_type: "review" or "email"
+            chunksize: Rows per DataFrame
+            names: Column names when the source has no header line (e.g. a read resumed mid-file)
+            columns, compression, filters: As for `read_frame`
+        """
+        columns = columns or canonical_columns(source_type)
+        if self.engine != 'pyarrow':
+            options = self._pandas_options(source, source_type, columns)
+            if names is not None:
+                options.update(header=None, names=names)
+            with pd.read_csv(source, chunksize=chunksize, compression=compression, **options) as reader:
+                yield from rechunk((filter_frame(df.rename(columns=columns), filters) for df in reader), chunksize)
+            return
+
+        header = names or _header(source, compression)
+        options = self._pyarrow_options(source_type, header, columns, _BLOCK_SIZE, names is not None)
+        with self._open(source, compression) as stream:
+            tables = (
+                pa.Table.from_batches([batch]).rename_columns([columns[c] for c in batch.schema.names])
+                for batch in pacsv.open_csv(stream, **options)
+            )
+            yield from rechunk((to_frame(filter_table(table, filters)) for table in tables), chunksize)
+
+    def _open(self, source: FeedbackSource, compression: Optional[str] = None):
+        """Input stream for pyarrow: a memory map or an OS file for paths, the caller's file object left open"""
+        if not isinstance(source, str):
+            if compression is not None:
+                raise ValueError("Compressed feedback must be read from a file path")
+            return nullcontext(source)
+        if compression is not None:
+            return pa.input_stream(source, compression=compression)
+        if self.memory_map:
+            return pa.memory_map(source, 'r')
+        return pa.OSFile(source, 'r')
+
+    def _pyarrow_options(self, source_type: str, header: List[str], columns: Dict[str, str],
+                         block_size: Optional[int] = None, headerless: bool = False) -> Dict:
+        """pyarrow CSV read, parse and convert options for the mapped columns present in the header"""
+        read_options = pacsv.ReadOptions(use_threads=True, column_names=header if headerless else None)
+        if block_size is not None:
+            read_options.block_size = block_size
+
+        included = [column for column in header if column in columns]
+        dtypes = SOURCE_DTYPES[source_type]
+        convert_options = pacsv.ConvertOptions(
+            column_types={
+                column: _PYARROW_TYPES[dtypes[columns[column]]] for column in included if columns[column] in dtypes
+            },
+            include_columns=included,
+            null_values=_PYARROW_NULLS,
+            strings_can_be_null=True
+        )
+        return {
+            'read_options': read_options,
+            'parse_options': pacsv.ParseOptions(newlines_in_values=True),
+            'convert_options': convert_options
+        }
+
+    def _pandas_options(self, source: FeedbackSource, source_type: str, columns: Dict[str, str]) -> Dict:
+        """pandas C engine options for the mapped columns of a source"""
+        dtypes = SOURCE_DTYPES[source_type]
+        return {
+            'usecols': lambda column: column in columns,
+            'dtype': {
+                column: dtypes[canonical] for column, canonical in columns.items()
+                if dtypes.get(canonical, 'float') != 'float'
+            },
+            'memory_map': self.memory_map and isinstance(source, str)
+        }
+
+
+def canonical_columns(source_type: str) -> Dict[str, str]:
+    """Identity mapping of a source type's canonical CSV columns"""
+    return {column: column for column in SOURCE_COLUMNS[source_type]}
+
+
+def rechunk(frames: Iterable[pd.DataFrame], chunksize: int) -> Iterator[pd.DataFrame]:
+    """Regroup DataFrames of any size into DataFrames of `chunksize` rows (the last one may be smaller)"""
+    pending: List[pd.DataFrame] = []
+    pending_rows = 0
+    for df in frames:
+        if not len(df):
+            continue
+        pending.append(df)
+        pending_rows += len(df)
+        while pending_rows >= chunksize:
+            frame = pd.concat(pending, ignore_index=True) if len(pending) > 1 else pending[0]
+            yield frame.iloc[:chunksize].reset_index(drop=True)
+            pending_rows -= chunksize
+            pending = [frame.iloc[chunksize:]] if pending_rows else []
+
+    if pending_rows:
+        yield pd.concat(pending, ignore_index=True) if len(pending) > 1 else pending[0].reset_index(drop=True)
+
+
+def filter_table(table, filters: Optional[List[Filter]]):
+    """Rows of a pyarrow table matching every (column, op, value) filter"""
+    if not filters:
+        return table
+    mask = None
+    for column, op, value in filters:
+        condition = FILTER_OPS[op](pc.field(column), value)
+        mask = condition if mask is None else mask & condition
+    return table.filter(mask)
+
+
+def filter_frame(df: pd.DataFrame, filters: Optional[List[Filter]]) -> pd.DataFrame:
+    """Rows of a DataFrame matching every (column, op, value) filter"""
+    if not filters:
+        return df
+    mask = np.ones(len(df), dtype=bool)
+    for column, op, value in filters:
+        mask &= FILTER_OPS[op](df[column], value).fillna(False).to_numpy(dtype=bool)
+    return df[mask].reset_index(drop=True)
+
+
+def check_filters(filters: Optional[List[Filter]]):
+    """
+    Check every filter uses a supported operator
+
+    Raises:
+        ValueError: On an unknown operator
+    """
+    for column, op, value in filters or []:
+        if op not in FILTER_OPS:
+            raise ValueError(f"Unknown filter operator '{op}' on {column} (expected one of: {', '.join(FILTER_OPS)})")
+
+
+def _header(source: FeedbackSource, compression: Optional[str] = None) -> List[str]:
+    """Column names on the first line of a CSV path or seekable binary file (left at its position)"""
+    if isinstance(source, str):
+        with pa.input_stream(source, compression=compression) if compression else open(source, 'rb') as f:
+            first_line = _read_line(f)
+    else:
+        position = source.tell()
+        first_line = source.readline()
+        source.seek(position)
+    return next(csv.reader(io.StringIO(first_line.decode('utf-8-sig'))), [])
+
+
+def _read_line(stream) -> bytes:
+    """First line of a binary stream, read in blocks (compressed streams have no readline)"""
+    data = b''
+    while b'\n' not in data:
+        block = stream.read(_HEADER_BLOCK_SIZE)
+        if not block:
+            break
+        data += block
+    return data.split(b'\n', 1)[0]
+
+
+def to_frame(table) -> pd.DataFrame:
+    """DataFrame from a pyarrow table, with missing text as NaN and whole ratings as integers, like the pandas parser"""
+    df = table.to_pandas()
+    for column in df.columns:
+        if df[column].dtype == object:
+            df[column] = df[column].where(df[column].notna(), np.nan)
+
+    if 'rating' in df.columns:
+        rating = df['rating']
+        if len(rating) and not rating.isna().any() and (rating == rating.round()).all():
+            df['rating'] = rating.astype('int64')
+    return df
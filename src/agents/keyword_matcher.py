@@ -0,0 +1,230 @@
+import hashlib
+import json
+import logging
+from collections import deque
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+from src.models.feedback_record import feedback_text_lower
+
+logger = logging.getLogger(__name__)
+
+
+# All keyword lexicons used by the agents and the feedback service.
+# Keys are "<owner>.<lexicon>" and every keyword is lowercase, so a
+# single scan over the lowercased text answers every `kw in text` check.
+LEXICONS: Dict[str, List[str]] = {
+    # FeedbackClassifierAgent
+    'classifier.bug': [
+        'crash', 'bug', 'error', 'broken', 'not working', 'issue', 'problem',
+        'fail', 'freeze', 'slow', 'lag', 'glitch', 'stuck', 'won\'t', 'can\'t',
+        'doesn\'t work', 'stopped working', 'data loss', 'deleted', 'missing'
+    ],
+    'classifier.feature': [
+        'feature', 'request', 'add', 'would love', 'please add', 'suggestion',
+        'improve', 'enhancement', 'would be nice', 'missing', 'need', 'want',
+        'integration', 'support for', 'ability to'
+    ],
+    'classifier.praise': [
+        'love', 'amazing', 'great', 'excellent', 'perfect', 'best', 'awesome',
+        'fantastic', 'wonderful', 'thank you', 'appreciate', 'outstanding',
+        'brilliant', 'superb', 'incredible'
+    ],
+    'classifier.complaint': [
+        'expensive', 'price', 'cost', 'poor', 'bad', 'terrible', 'worst',
+        'disappointed', 'frustrating', 'annoying', 'unacceptable', 'no response',
+        'customer service', 'support'
+    ],
+    'classifier.spam': [
+        'buy', 'cheap', 'www.', 'http', 'click here', 'limited time',
+        'guaranteed', 'free money', 'winner'
+    ],
+
+    # BugAnalyzerAgent
+    'bug.platform.android': ['android'],
+    'bug.platform.ios': ['ios', 'iphone', 'ipad'],
+    'bug.severity.critical': [
+        'data loss', 'deleted', 'lost', 'crash', 'won\'t open',
+        'can\'t login', 'urgent', 'critical', 'all my data'
+    ],
+    'bug.severity.high': [
+        'not working', 'broken', 'fail', 'error', 'constant',
+        'every time', 'always', 'unusable'
+    ],
+    'bug.impact.high': [
+        'unusable', 'can\'t use', 'lost data', 'months of work',
+        'critical', 'urgent', 'important'
+    ],
+
+    # FeatureExtractorAgent (feature lexicons are checked in declaration order)
+    'feature.calendar integration': ['calendar', 'google calendar', 'outlook', 'scheduling'],
+    'feature.offline mode': ['offline', 'without internet', 'no connectivity'],
+    'feature.dark mode': ['dark mode', 'dark theme', 'night mode', 'oled'],
+    'feature.export functionality': ['export', 'pdf', 'csv', 'download'],
+    'feature.widget support': ['widget', 'home screen', 'quick access'],
+    'feature.biometric auth': ['biometric', 'face id', 'fingerprint', 'touch id'],
+    'feature.cloud integration': ['google drive', 'dropbox', 'cloud storage', 'onedrive'],
+    'feature.search improvements': ['search', 'find', 'filter', 'advanced search'],
+    'feature.collaboration': ['share', 'collaborate', 'team', 'multi-user'],
+    'feature.templates': ['template', 'recurring', 'preset'],
+    'feature.demand.high': [
+        'really need', 'must have', 'essential', 'critical',
+        'many users', 'everyone', 'all users'
+    ],
+    'feature.complexity.high': [
+        'integration', 'sync', 'real-time', 'collaboration',
+        'multi-user', 'cloud', 'api'
+    ],
+    'feature.complexity.low': [
+        'button', 'color', 'theme', 'font', 'icon',
+        'notification', 'reminder'
+    ],
+
+    # TicketCreatorAgent
+    'ticket.issue': [
+        'crash', 'login', 'slow', 'performance', 'data', 'loss', 'deleted',
+        'sync', 'battery', 'notification', 'attach', 'upload'
+    ],
+    'ticket.complaint.high': ['no response', 'customer service'],
+
+    # FeedbackService
+    'service.bug': [
+        'crash', 'bug', 'error', 'broken', 'not working', 'issue',
+        'fail', 'freeze', 'slow', 'lag', 'data loss'
+    ],
+    'service.feature': [
+        'feature', 'request', 'add', 'would love', 'please add',
+        'suggestion', 'improve', 'need', 'want', 'integration'
+    ],
+    'service.praise': [
+        'love', 'amazing', 'great', 'excellent', 'perfect',
+        'best', 'awesome', 'fantastic', 'thank you'
+    ],
+    'service.complaint': [
+        'expensive', 'price', 'poor', 'bad', 'terrible',
+        'disappointed', 'frustrating', 'customer service'
+    ],
+    'service.spam': ['buy', 'cheap', 'www.', 'http', 'click here', 'guaranteed'],
+    'service.platform.android': ['android'],
+    'service.platform.ios': ['ios', 'iphone'],
+    'service.severity.critical': ['data loss', 'deleted', 'lost', 'crash', 'won\'t open', 'can\'t login'],
+    'service.feature.calendar integration': ['calendar', 'google calendar', 'outlook'],
+    'service.feature.offline mode': ['offline', 'without internet'],
+    'service.feature.dark mode': ['dark mode', 'dark theme', 'night mode'],
+    'service.feature.export functionality': ['export', 'pdf', 'csv'],
+    'service.feature.widget support': ['widget', 'home screen'],
+    'service.feature.biometric auth': ['biometric', 'face id', 'fingerprint'],
+    'service.demand.high': ['really need', 'must have', 'essential', 'critical'],
+}
+
+# Digest of every lexicon; changes whenever a keyword is added, removed or moved
+LEXICON_VERSION = hashlib.blake2b(json.dumps(LEXICONS, sort_keys=True).encode(), digest_size=8).hexdigest()
+
+
+class KeywordHits:
+    """Every keyword hit found in one text, grouped by lexicon"""
+
+    __slots__ = ('hits', '_by_lexicon')
+
+    def __init__(self, hits: List[Tuple[str, str, int]]):
+        self.hits = hits
+        self._by_lexicon: Dict[str, Set[str]] = {}
+        for lexicon, keyword, _ in hits:
+            self._by_lexicon.setdefault(lexicon, set()).add(keyword)
+
+    def __iter__(self) -> Iterator[Tuple[str, str, int]]:
+        return iter(self.hits)
+
+    def __len__(self) -> int:
+        return len(self.hits)
+
+    def keywords(self, lexicon: str) -> Set[str]:
+        """Distinct keywords of a lexicon found in the text"""
+        return self._by_lexicon.get(lexicon, set())
+
+    def count(self, lexicon: str) -> int:
+        """Number of distinct keywords of a lexicon found in the text"""
+        return len(self._by_lexicon.get(lexicon, ()))
+
+    def any(self, *lexicons: str) -> bool:
+        """Check if any keyword of the given lexicons was found"""
+        return any(lexicon in self._by_lexicon for lexicon in lexicons)
+
+    def contains(self, lexicon: str, keyword: str) -> bool:
+        """Check if a specific keyword of a lexicon was found"""
+        return keyword in self._by_lexicon.get(lexicon, ())
+
+
+class KeywordMatcher:
+    """Aho-Corasick automaton matching every lexicon in one pass over the text"""
+
+    def __init__(self, lexicons: Dict[str, List[str]]):
+        self.lexicons = lexicons
+
+        # keyword -> lexicons it belongs to
+        owners: Dict[str, List[str]] = {}
+        for lexicon, keywords in lexicons.items():
+            for keyword in keywords:
+                if lexicon not in owners.setdefault(keyword, []):
+                    owners[keyword].append(lexicon)
+
+        # Build the trie
+        goto: List[Dict[str, int]] = [{}]
+        outputs: List[List[str]] = [[]]
+        for keyword in owners:
+            state = 0
+            for char in keyword:
+                if char not in goto[state]:
+                    goto.append({})
+                    outputs.append([])
+                    goto[state][char] = len(goto) - 1
+                state = goto[state][char]
+            outputs[state].append(keyword)
+
+        # Resolve failure links breadth-first and fold them into a full
+        # transition table so scanning never walks the failure chain
+        fail = [0] * len(goto)
+        delta: List[Dict[str, int]] = [dict(goto[0])] + [None] * (len(goto) - 1)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            delta[state] = {**delta[fail[state]], **goto[state]}
+            outputs[state] = outputs[state] + outputs[fail[state]]
+            for char, child in goto[state].items():
+                fail[child] = delta[fail[state]].get(char, 0)
+                queue.append(child)
+
+        self._delta = delta
+        self._outputs = [
+            tuple((lexicon, keyword, len(keyword) - 1) for keyword in out for lexicon in owners[keyword])
+            for out in outputs
+        ]
+
+        logger.info(f"Keyword matcher built: {len(owners)} keywords, {len(goto)} states, {len(lexicons)} lexicons")
+
+    def scan(self, text: str) -> KeywordHits:
+        """Return every (lexicon, keyword, offset) hit in an already lowercased text"""
+        delta = self._delta
+        outputs = self._outputs
+        hits = []
+        state = 0
+        for index, char in enumerate(text):
+            state = delta[state].get(char, 0)
+            if outputs[state]:
+                for lexicon, keyword, tail in outputs[state]:
+                    hits.append((lexicon, keyword, index - tail))
+        return KeywordHits(hits)
+
+    def scan_text(self, text: Optional[str]) -> KeywordHits:
+        """Lowercase a raw text and scan it"""
+        return self.scan((text or '').lower())
+
+
+# Shared matcher, compiled once at import time from all lexicons
+keyword_matcher = KeywordMatcher(LEXICONS)
+
+
+def feedback_hits(feedback: Dict) -> KeywordHits:
+    """Reuse the keyword hits attached to a feedback item, scanning only if missing"""
+    hits = feedback.get('keyword_hits')
+    if hits is None:
+        hits = keyword_matcher.scan(feedback_text_lower(feedback))
+    return hits
@@ -0,0 +1,208 @@
+import asyncio
+import json
+import logging
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+from openai import AsyncOpenAI
+
+from src.agents.classifier_agent import FeedbackClassifierAgent
+from src.models.feedback_record import feedback_text
+
+logger = logging.getLogger(__name__)
+
+_SYSTEM_PROMPT = (
+    "You classify app feedback. Each input item has an id, a text and, for store reviews, a 1-5 rating. "
+    "Return one result per item with its id, exactly one category from: {categories}, and a confidence "
+    "between 0 and 1. Spam is promotional, abusive or meaningless text."
+)
+
+
+class LLMClassifierAgent:
+    """
+    Agent classifying feedback with an LLM, many items per structured-output request
+
+    Every item is first classified by the keyword classifier, which also
+    records the keyword hits later stages use. Items are then packed into
+    requests of `batch_size`, at most `max_concurrency` of them in flight at
+    once, and each valid result replaces the keyword classification. An item
+    whose result is missing or malformed, or whose whole request failed,
+    keeps its keyword classification.
+    """
+
+    CATEGORIES = FeedbackClassifierAgent.CATEGORIES
+
+    def __init__(self, api_key: str, model: str, batch_size: int = 50, max_concurrency: int = 4,
+                 max_text_chars: int = 1000, base_url: Optional[str] = None, timeout_seconds: float = 60,
+                 fallback: Optional[FeedbackClassifierAgent] = None):
+        """
+        Args:
+            api_key: OpenAI API key
+            model: Chat model to classify with
+            batch_size: Feedback items per request
+            max_concurrency: Requests in flight at once
+            max_text_chars: Characters of each feedback text sent to the model
+            base_url: API base URL (the OpenAI API if None)
+            timeout_seconds: Timeout of each request
+            fallback: Keyword classifier used first and for items the model did not classify
+        """
+        if batch_size < 1 or max_concurrency < 1:
+            raise ValueError("batch_size and max_concurrency must be at least 1")
+
+        self.name = "LLM Classifier Agent"
+        self.api_key = api_key
+        self.model = model
+        self.batch_size = batch_size
+        self.max_concurrency = max_concurrency
+        self.max_text_chars = max_text_chars
+        self.base_url = base_url
+        self.timeout_seconds = timeout_seconds
+        self.fallback = fallback if fallback is not None else FeedbackClassifierAgent()
+
+        self.requests = 0
+        self.failed_requests = 0
+        self.classified = 0
+        self.fallbacks = 0
+        logger.info(f"{self.name} initialized with {model}")
+
+    def classify_batch(self, feedback_items: list) -> list:
+        """Classify a batch of feedback items in place (runs its own event loop; call it from a worker thread)"""
+        return asyncio.run(self.classify_batch_async(feedback_items))
+
+    async def classify_batch_async(self, feedback_items: list) -> list:
+        """Classify a batch of feedback items in place, fanning the requests out concurrently"""
+        self.fallback.classify_batch(feedback_items)
+        if not feedback_items:
+            return feedback_items
+
+        batches = [
+            feedback_items[start:start + self.batch_size]
+            for start in range(0, len(feedback_items), self.batch_size)
+        ]
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        # The client's connection pool belongs to this event loop, so it lives for one call
+        http_client = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=self.max_concurrency),
+            timeout=httpx.Timeout(self.timeout_seconds)
+        )
+        async with http_client:
+            client = AsyncOpenAI(api_key=self.api_key, base_url=self.base_url, http_client=http_client, max_retries=0)
+            labels = await asyncio.gather(*(self._classify_request(client, semaphore, batch) for batch in batches))
+
+        classified = 0
+        for batch, batch_labels in zip(batches, labels):
+            for index, label in batch_labels.items():
+                batch[index]['category'], batch[index]['confidence'] = label
+                classified += 1
+
+        self.classified += classified
+        self.fallbacks += len(feedback_items) - classified
+        logger.info(f"LLM classified {classified} of {len(feedback_items)} feedback items in {len(batches)} requests")
+        return feedback_items
+
+    async def _classify_request(self, client: AsyncOpenAI, semaphore: asyncio.Semaphore,
+                                batch: List[Dict]) -> Dict[int, Tuple[str, float]]:
+        """(category, confidence) by position in the batch for every item the model classified validly"""
+        payload = [
+            {'id': index, 'text': feedback_text(item)[:self.max_text_chars], 'rating': _rating(item.get('rating'))}
+            for index, item in enumerate(batch)
+        ]
+
+        async with semaphore:
+            self.requests += 1
+            try:
+                response = await client.chat.completions.create(
+                    model=self.model,
+                    messages=[
+                        {'role': 'system', 'content': _SYSTEM_PROMPT.format(categories=', '.join(self.CATEGORIES))},
+                        {'role': 'user', 'content': json.dumps(payload, ensure_ascii=False)}
+                    ],
+                    response_format=self._response_format(),
+                    temperature=0
+                )
+                content = response.choices[0].message.content
+            except Exception as e:
+                self.failed_requests += 1
+                logger.warning(f"LLM classification of {len(batch)} items failed, keeping keyword labels: {e}")
+                return {}
+
+        return self.parse_response(content, len(batch))
+
+    def parse_response(self, content: Optional[str], count: int) -> Dict[int, Tuple[str, float]]:
+        """
+        Valid results of a response for a batch of `count` items
+
+        Only results with a known id, a known category and a numeric
+        confidence in [0, 1] are kept; the first result for an id wins.
+        """
+        try:
+            results = json.loads(content)['results']
+        except (TypeError, ValueError, KeyError) as e:
+            logger.warning(f"Unparseable LLM classification response: {e}")
+            return {}
+        if not isinstance(results, list):
+            return {}
+
+        labels = {}
+        for result in results:
+            if not isinstance(result, dict):
+                continue
+            index = result.get('id')
+            category = result.get('category')
+            confidence = result.get('confidence')
+            if (
+                isinstance(index, int) and not isinstance(index, bool) and 0 <= index < count
+                and index not in labels and category in self.CATEGORIES
+                and isinstance(confidence, (int, float)) and not isinstance(confidence, bool)
+                and 0 <= confidence <= 1
+            ):
+                labels[index] = (category, float(confidence))
+        return labels
+
+    def _response_format(self) -> Dict:
+        """Strict JSON schema of a classification response"""
+        return {
+            'type': 'json_schema',
+            'json_schema': {
+                'name': 'feedback_classification',
+                'strict': True,
+                'schema': {
+                    'type': 'object',
+                    'properties': {
+                        'results': {
+                            'type': 'array',
+                            'items': {
+                                'type': 'object',
+                                'properties': {
+                                    'id': {'type': 'integer'},
+                                    'category': {'type': 'string', 'enum': list(self.CATEGORIES)},
+                                    'confidence': {'type': 'number'}
+                                },
+                                'required': ['id', 'category', 'confidence'],
+                                'additionalProperties': False
+                            }
+                        }
+                    },
+                    'required': ['results'],
+                    'additionalProperties': False
+                }
+            }
+        }
+
+    def stats(self) -> Dict:
+        """Request and fallback counters"""
+        return {
+            'requests': self.requests,
+            'failed_requests': self.failed_requests,
+            'classified': self.classified,
+            'fallbacks': self.fallbacks
+        }
+
+
+def _rating(value) -> Optional[int]:
+    """Rating as a JSON-safe int (None when missing)"""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
@@ -0,0 +1,213 @@
+import logging
+import os
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as pads
+    import pyarrow.json as pajson
+except ImportError:  # JSON Lines falls back to pandas; Parquet needs pyarrow
+    pa = None
+    pads = None
+    pajson = None
+
+from src.agents.feedback_ingest import (
+    FILTER_OPS, SOURCE_DTYPES, Filter, FeedbackIngestor, check_filters, filter_frame, filter_table, rechunk, to_frame
+)
+from src.models.feedback_record import SOURCE_COLUMNS
+
+logger = logging.getLogger(__name__)
+
+# File extension -> compression codec
+_COMPRESSIONS = {'.gz': 'gzip', '.gzip': 'gzip', '.zst': 'zstd', '.zstd': 'zstd'}
+
+# File extension (after any compression extension) -> source format
+_FORMATS = {
+    '.csv': 'csv',
+    '.jsonl': 'jsonl',
+    '.ndjson': 'jsonl',
+    '.json': 'jsonl',
+    '.parquet': 'parquet',
+    '.pq': 'parquet'
+}
+
+# Bytes per block handed to the pyarrow JSON reader's threads
+_JSON_BLOCK_SIZE = 1024 * 1024
+
+
+class SourceSpec:
+    """
+    Declarative feedback source: where it is, how it is stored and how its columns map to FeedbackItem fields
+
+    Columns default to the CSV conventions (`review_id`/`review_text`,
+    `email_id`/`body`, ...); `columns` overrides any of them by FeedbackItem
+    field name, e.g. {'text': 'content', 'rating': 'stars'}. Only mapped
+    columns are read, and `filters` are applied while reading, before any
+    record is built.
+    """
+
+    def __init__(self, path: str, source_type: str, format: Optional[str] = None, compression: Optional[str] = None,
+                 columns: Optional[Dict[str, str]] = None, filters: Optional[List[Filter]] = None):
+        """
+        Args:
+            path: Source file
+            source_type: "review" or "email"
+            format: "csv", "jsonl" or "parquet" (from the file extension if None)
+            compression: "gzip" or "zstd" for CSV and JSON Lines (from the file extension if None)
+            columns: FeedbackItem field -> source column, for fields not named by the CSV conventions
+            filters: (field, op, value) row filters on FeedbackItem fields, e.g. ('date', '>', '2024-01-20')
+
+        Raises:
+            ValueError: On an unknown source type, format, field or filter operator
+        """
+        if source_type not in SOURCE_COLUMNS:
+            raise ValueError(f"Unknown source type '{source_type}' (expected one of: {', '.join(SOURCE_COLUMNS)})")
+
+        inferred_format, inferred_compression = _infer_storage(path)
+        self.path = path
+        self.source_type = source_type
+        self.format = format or inferred_format
+        self.compression = compression if compression is not None else inferred_compression
+        self.columns = dict(columns or {})
+        self.filters = list(filters or [])
+
+        if self.format not in SOURCE_ADAPTERS:
+            raise ValueError(f"Unknown format for {path} (expected one of: {', '.join(SOURCE_ADAPTERS)})")
+        fields = self.fields()
+        for field in list(self.columns) + [field for field, _, _ in self.filters]:
+            if field not in fields:
+                raise ValueError(f"Unknown {source_type} field '{field}' (expected one of: {', '.join(fields)})")
+        check_filters(self.filters)
+
+    def fields(self) -> Dict[str, str]:
+        """FeedbackItem field -> canonical column for this source type"""
+        return {field: column for column, field in SOURCE_COLUMNS[self.source_type].items()}
+
+    def column_map(self) -> Dict[str, str]:
+        """Source column -> canonical column for every column to read"""
+        fields = self.fields()
+        renamed = {fields[field]: column for field, column in self.columns.items()}
+        return {renamed.get(canonical, canonical): canonical for canonical in SOURCE_COLUMNS[self.source_type]}
+
+    def canonical_filters(self) -> List[Filter]:
+        """Filters on canonical column names"""
+        fields = self.fields()
+        return [(fields[field], op, value) for field, op, value in self.filters]
+
+    def source_filters(self) -> List[Filter]:
+        """Filters on source column names"""
+        fields = self.fields()
+        sources = {canonical: column for column, canonical in self.column_map().items()}
+        return [(sources[fields[field]], op, value) for field, op, value in self.filters]
+
+    def __repr__(self) -> str:
+        return f"SourceSpec({self.source_type} {self.format} {self.path!r})"
+
+
+class CsvSourceAdapter:
+    """Plain, gzip or zstd CSV through the typed CSV ingestor"""
+
+    def __init__(self, ingestor: FeedbackIngestor):
+        self.ingestor = ingestor
+
+    def iter_frames(self, spec: SourceSpec, chunksize: int) -> Iterator[pd.DataFrame]:
+        return self.ingestor.iter_frames(
+            spec.path, spec.source_type, chunksize, columns=spec.column_map(),
+            compression=spec.compression, filters=spec.canonical_filters()
+        )
+
+
+class JsonLinesSourceAdapter:
+    """Plain, gzip or zstd JSON Lines, parsed block by block with pyarrow (pandas without it)"""
+
+    def __init__(self, ingestor: FeedbackIngestor):
+        self.ingestor = ingestor
+
+    def iter_frames(self, spec: SourceSpec, chunksize: int) -> Iterator[pd.DataFrame]:
+        columns = spec.column_map()
+        filters = spec.canonical_filters()
+
+        if pajson is None or self.ingestor.engine != 'pyarrow':
+            with pd.read_json(spec.path, lines=True, chunksize=chunksize, compression=spec.compression,
+                              dtype=False, convert_dates=False) as reader:
+                frames = (_project_frame(df, columns) for df in reader)
+                yield from rechunk((filter_frame(df, filters) for df in frames), chunksize)
+            return
+
+        # Text fields stay strings (ISO dates would otherwise become timestamps); IDs and numbers are inferred
+        dtypes = SOURCE_DTYPES[spec.source_type]
+        id_column = spec.fields()['source_id']
+        text_columns = [
+            column for column, canonical in columns.items()
+            if dtypes.get(canonical) == 'str' and canonical != id_column
+        ]
+        parse_options = pajson.ParseOptions(
+            explicit_schema=pa.schema([(column, pa.string()) for column in text_columns])
+        )
+
+        with pa.input_stream(spec.path, compression=spec.compression) as stream:
+            reader = pajson.open_json(
+                stream, read_options=pajson.ReadOptions(block_size=_JSON_BLOCK_SIZE), parse_options=parse_options
+            )
+            tables = (_project_table(pa.Table.from_batches([batch]), columns) for batch in reader)
+            yield from rechunk((to_frame(filter_table(table, filters)) for table in tables), chunksize)
+
+
+class ParquetSourceAdapter:
+    """Parquet read through a pyarrow dataset, so projection and filters skip columns and row groups"""
+
+    def __init__(self, ingestor: FeedbackIngestor):
+        self.ingestor = ingestor
+
+    def iter_frames(self, spec: SourceSpec, chunksize: int) -> Iterator[pd.DataFrame]:
+        if pads is None:
+            raise ValueError("Parquet sources require pyarrow (pip install pyarrow)")
+
+        columns = spec.column_map()
+        dataset = pads.dataset(spec.path, format='parquet')
+        present = [column for column in dataset.schema.names if column in columns]
+
+        expression = None
+        for column, op, value in spec.source_filters():
+            condition = FILTER_OPS[op](pads.field(column), value)
+            expression = condition if expression is None else expression & condition
+
+        batches = dataset.to_batches(columns=present, filter=expression, batch_size=chunksize)
+        tables = (_project_table(pa.Table.from_batches([batch]), columns) for batch in batches)
+        yield from rechunk((to_frame(table) for table in tables), chunksize)
+
+
+# Source format -> adapter class
+SOURCE_ADAPTERS = {
+    'csv': CsvSourceAdapter,
+    'jsonl': JsonLinesSourceAdapter,
+    'parquet': ParquetSourceAdapter
+}
+
+
+def source_adapter(spec: SourceSpec, ingestor: FeedbackIngestor):
+    """Adapter reading a source's format"""
+    return SOURCE_ADAPTERS[spec.format](ingestor)
+
+
+def _infer_storage(path: str) -> Tuple[Optional[str], Optional[str]]:
+    """(format, compression) from a file name such as reviews.jsonl.gz"""
+    root, extension = os.path.splitext(path.lower())
+    compression = _COMPRESSIONS.get(extension)
+    if compression is not None:
+        root, extension = os.path.splitext(root)
+    return _FORMATS.get(extension), compression
+
+
+def _project_table(table, columns: Dict[str, str]):
+    """Mapped columns of a pyarrow table, under their canonical names"""
+    present = [column for column in table.column_names if column in columns]
+    return table.select(present).rename_columns([columns[column] for column in present])
+
+
+def _project_frame(df: pd.DataFrame, columns: Dict[str, str]) -> pd.DataFrame:
+    """Mapped columns of a DataFrame, under their canonical names"""
+    present = [column for column in df.columns if column in columns]
+    return df[present].rename(columns=columns)
@@ -1,7 +1,11 @@
 import logging
-import pandas as pd
+import threading
 from datetime import datetime
-from typing import Dict, List
+from typing import Dict, List, Optional
+from src.agents.keyword_matcher import KeywordHits, feedback_hits
+from src.models.feedback_record import feedback_text
+from src.services.ticket_export import write_tickets
+from src.services.ticket_ids import TicketIdAllocator
 
 logger = logging.getLogger(__name__)
 
@@ -9,21 +13,44 @@ logger = logging.getLogger(__name__)
 class TicketCreatorAgent:
     """Agent responsible for creating structured tickets"""
     
-    def __init__(self):
+    def __init__(self, id_allocator: Optional[TicketIdAllocator] = None):
+        """
+        Args:
+            id_allocator: Durable source of ticket numbers (numbers count up from 1000 in this instance if None)
+        """
         self.name = "Ticket Creator Agent"
         logger.info(f"{self.name} initialized")
+        self.id_allocator = id_allocator
         self.ticket_counter = 1000
+        self._counter_lock = threading.Lock()
+    
+    def reserve_numbers(self, count: int) -> int:
+        """
+        Reserve `count` consecutive ticket numbers, safely across threads
+        
+        Returns:
+            The first of the reserved numbers
+        """
+        if self.id_allocator is not None:
+            return self.id_allocator.reserve(count)
+        
+        with self._counter_lock:
+            first = self.ticket_counter + 1
+            self.ticket_counter += count
+            return first
     
     def create_ticket(self, feedback: Dict) -> Dict:
         """Create a structured ticket from feedback"""
-        self.ticket_counter += 1
+        number = self.reserve_numbers(1)
         
         category = feedback.get('category', 'Unknown')
         source_type = 'review' if 'review_id' in feedback else 'email'
         source_id = feedback.get('review_id') or feedback.get('email_id')
+        duplicates = feedback.get('duplicates', [])
+        member_source_ids = [source_id] + [d.get('review_id') or d.get('email_id') for d in duplicates]
         
         ticket = {
-            'ticket_id': f"TICK-{self.ticket_counter}",
+            'ticket_id': f"TICK-{number}",
             'source_id': source_id,
             'source_type': source_type,
             'category': category,
@@ -34,7 +61,10 @@ class TicketCreatorAgent:
             'created_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
             'assigned_to': self._assign_team(category),
             'tags': self._generate_tags(feedback),
-            'metadata': self._extract_metadata(feedback)
+            'metadata': self._extract_metadata(feedback),
+            'confidence': feedback.get('confidence', 0),
+            'similar_requests': len(duplicates),
+            'member_source_ids': ', '.join(map(str, member_source_ids))
         }
         
         return ticket
@@ -48,8 +78,7 @@ class TicketCreatorAgent:
             platform = analysis.get('platform', 'Unknown')
             
             # Extract key issue from text
-            text = feedback.get('review_text') or feedback.get('body', '')
-            issue = self._extract_key_issue(text)
+            issue = self._extract_key_issue(feedback_hits(feedback))
             
             return f"[BUG] {issue} on {platform}"
         
@@ -68,33 +97,33 @@ class TicketCreatorAgent:
         else:
             return f"[{category.upper()}] User feedback"
     
-    def _extract_key_issue(self, text: str) -> str:
+    def _extract_key_issue(self, hits: KeywordHits) -> str:
         """Extract key issue from bug report"""
-        text_lower = text.lower()
+        found = hits.keywords('ticket.issue')
         
         # Common issue patterns
-        if 'crash' in text_lower:
+        if 'crash' in found:
             return 'App crashes'
-        elif 'login' in text_lower:
+        elif 'login' in found:
             return 'Login issue'
-        elif 'slow' in text_lower or 'performance' in text_lower:
+        elif 'slow' in found or 'performance' in found:
             return 'Performance issue'
-        elif 'data' in text_lower and ('loss' in text_lower or 'deleted' in text_lower):
+        elif 'data' in found and ('loss' in found or 'deleted' in found):
             return 'Data loss'
-        elif 'sync' in text_lower:
+        elif 'sync' in found:
             return 'Sync failure'
-        elif 'battery' in text_lower:
+        elif 'battery' in found:
             return 'Battery drain'
-        elif 'notification' in text_lower:
+        elif 'notification' in found:
             return 'Notification issue'
-        elif 'attach' in text_lower or 'upload' in text_lower:
+        elif 'attach' in found or 'upload' in found:
             return 'File attachment issue'
         
         return 'Application error'
     
     def _generate_description(self, feedback: Dict) -> str:
         """Generate detailed ticket description"""
-        text = feedback.get('review_text') or feedback.get('body', '')
+        text = feedback_text(feedback)
         category = feedback.get('category')
         
         description = f"**Original Feedback:**\n{text}\n\n"
@@ -164,8 +193,7 @@ class TicketCreatorAgent:
         
         elif category == 'Complaint':
             # Check if it's about support response
-            text = (feedback.get('review_text') or feedback.get('body', '')).lower()
-            if 'no response' in text or 'customer service' in text:
+            if feedback_hits(feedback).any('ticket.complaint.high'):
                 return 'High'
             return 'Medium'
         
@@ -227,7 +255,7 @@ class TicketCreatorAgent:
         return tickets
     
     def save_tickets_to_csv(self, tickets: List[Dict], output_path: str):
-        """Save tickets to CSV file"""
-        df = pd.DataFrame(tickets)
-        df.to_csv(output_path, index=False)
+        """Save tickets to CSV file, row by row"""
+        with open(output_path, 'wb') as f:
+            write_tickets([tickets], f, 'csv')
         logger.info(f"Saved {len(tickets)} tickets to {output_path}")
@@ -9,6 +9,39 @@ class Settings:
         self.openai_api_key = os.getenv("OPENAI_API_KEY", "")
         self.model_name = os.getenv("MODEL_NAME", "gpt-4o-mini")
         
+        # Pooled HTTP client shared by every LLM call
+        self.llm_max_connections = int(os.getenv("LLM_MAX_CONNECTIONS", "100"))
+        self.llm_max_keepalive_connections = int(os.getenv("LLM_MAX_KEEPALIVE_CONNECTIONS", "20"))
+        self.llm_keepalive_expiry_seconds = float(os.getenv("LLM_KEEPALIVE_EXPIRY_SECONDS", "60"))
+        self.llm_timeout_seconds = float(os.getenv("LLM_TIMEOUT_SECONDS", "60"))
+        self.llm_connect_timeout_seconds = float(os.getenv("LLM_CONNECT_TIMEOUT_SECONDS", "5"))
+        
+        # LLM call resilience: overall deadline, jittered retries, hedging (0 = off) and circuit breaker
+        self.llm_deadline_seconds = float(os.getenv("LLM_DEADLINE_SECONDS", "30"))
+        self.llm_max_attempts = int(os.getenv("LLM_MAX_ATTEMPTS", "3"))
+        self.llm_backoff_base_seconds = float(os.getenv("LLM_BACKOFF_BASE_SECONDS", "0.2"))
+        self.llm_backoff_max_seconds = float(os.getenv("LLM_BACKOFF_MAX_SECONDS", "2"))
+        self.llm_hedge_percentile = float(os.getenv("LLM_HEDGE_PERCENTILE", "0"))
+        self.llm_breaker_failure_rate = float(os.getenv("LLM_BREAKER_FAILURE_RATE", "0.5"))
+        self.llm_breaker_window = int(os.getenv("LLM_BREAKER_WINDOW", "20"))
+        self.llm_breaker_min_calls = int(os.getenv("LLM_BREAKER_MIN_CALLS", "10"))
+        self.llm_breaker_open_seconds = float(os.getenv("LLM_BREAKER_OPEN_SECONDS", "30"))
+        
+        # Upstream rate limits (0 = unlimited): requests queue fairly for the budget, waiting at most max_wait
+        self.llm_requests_per_minute = float(os.getenv("LLM_REQUESTS_PER_MINUTE", "500"))
+        self.llm_tokens_per_minute = float(os.getenv("LLM_TOKENS_PER_MINUTE", "200000"))
+        self.llm_expected_output_tokens = int(os.getenv("LLM_EXPECTED_OUTPUT_TOKENS", "256"))
+        self.llm_rate_limit_max_wait_seconds = float(os.getenv("LLM_RATE_LIMIT_MAX_WAIT_SECONDS", "10"))
+        self.llm_rate_limit_max_queue = int(os.getenv("LLM_RATE_LIMIT_MAX_QUEUE", "100"))
+        
+        # Chat response cache: in-memory LRU tier, plus an on-disk tier when a path is set
+        self.llm_cache_enabled = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+        self.llm_cache_ttl_seconds = float(os.getenv("LLM_CACHE_TTL_SECONDS", "3600"))
+        self.llm_cache_max_entries = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "1000"))
+        self.llm_cache_max_mb = float(os.getenv("LLM_CACHE_MAX_MB", "16"))
+        self.llm_cache_db_path = os.getenv("LLM_CACHE_DB_PATH", "")
+        self.llm_cache_max_disk_entries = int(os.getenv("LLM_CACHE_MAX_DISK_ENTRIES", "10000"))
+        
         # Application Configuration
         self.app_name = "Py-Agentic AI"
         self.app_version = "1.0.0"
@@ -17,6 +50,66 @@ class Settings:
         # CORS Configuration
         self.cors_origins = ["http://localhost:3000"]
         
+        # Feedback memo cache (classification and analysis results)
+        self.memo_cache_max_entries = int(os.getenv("MEMO_CACHE_MAX_ENTRIES", "100000"))
+        self.memo_cache_ttl_seconds = float(os.getenv("MEMO_CACHE_TTL_SECONDS", "3600"))
+        self.memo_cache_max_mb = float(os.getenv("MEMO_CACHE_MAX_MB", "64"))
+        
+        # Pipeline result cache for the read-only feedback endpoints
+        self.result_cache_ttl_seconds = float(os.getenv("RESULT_CACHE_TTL_SECONDS", "300"))
+        self.result_cache_max_entries = int(os.getenv("RESULT_CACHE_MAX_ENTRIES", "8"))
+        
+        # Longest a request waits on a computation shared with concurrent identical requests
+        self.coalesce_timeout_seconds = float(os.getenv("COALESCE_TIMEOUT_SECONDS", "120"))
+        
+        # Persistent ticket store (SQLite)
+        self.ticket_db_path = os.getenv("TICKET_DB_PATH", "output/tickets.db")
+        
+        # Durable ticket number sequence, reserved in blocks by each process
+        self.ticket_id_db_path = os.getenv("TICKET_ID_DB_PATH", self.ticket_db_path)
+        self.ticket_id_block_size = int(os.getenv("TICKET_ID_BLOCK_SIZE", "100"))
+        
+        # Near-duplicate feedback collapsing (off by default: when on, duplicates share one ticket,
+        # so ticket counts drop and tickets list their members)
+        self.dedup_enabled = os.getenv("DEDUP_ENABLED", "false").lower() == "true"
+        self.dedup_threshold = float(os.getenv("DEDUP_THRESHOLD", "0.5"))
+        
+        # Feedback processing engine: "pipeline" (staged agents, memoized per text; also used by
+        # streaming, jobs and incremental runs) or "inline" (service rules, column-wise classification)
+        self.feedback_engine = os.getenv("FEEDBACK_ENGINE", "pipeline").lower()
+        self.pipeline_batch_size = int(os.getenv("PIPELINE_BATCH_SIZE", "1000"))
+        
+        # Pipeline classifier: "keyword" (lexicon scoring) or "llm" (batched requests, keyword fallback)
+        self.feedback_classifier = os.getenv("FEEDBACK_CLASSIFIER", "keyword").lower()
+        self.llm_classifier_model = os.getenv("LLM_CLASSIFIER_MODEL", self.model_name)
+        self.llm_classifier_batch_size = int(os.getenv("LLM_CLASSIFIER_BATCH_SIZE", "50"))
+        self.llm_classifier_concurrency = int(os.getenv("LLM_CLASSIFIER_CONCURRENCY", "4"))
+        self.llm_classifier_max_text_chars = int(os.getenv("LLM_CLASSIFIER_MAX_TEXT_CHARS", "1000"))
+        
+        # Pipeline worker processes: 1 runs in-process, 0 uses one per CPU
+        self.pipeline_workers = int(os.getenv("PIPELINE_WORKERS", "1")) or os.cpu_count() or 1
+        self.pipeline_min_chunk_size = int(os.getenv("PIPELINE_MIN_CHUNK_SIZE", "500"))
+        self.pipeline_max_chunk_size = int(os.getenv("PIPELINE_MAX_CHUNK_SIZE", "5000"))
+        
+        # Streaming ingestion: CSV rows per chunk, items per near-duplicate window
+        self.stream_chunk_size = int(os.getenv("STREAM_CHUNK_SIZE", "10000"))
+        self.dedup_window = int(os.getenv("DEDUP_WINDOW", "20000"))
+        
+        # CSV ingestion: "pyarrow" (multithreaded), "c" (pandas) or "auto" (pyarrow when installed)
+        self.csv_engine = os.getenv("CSV_ENGINE", "auto").lower()
+        self.csv_memory_map = os.getenv("CSV_MEMORY_MAP", "false").lower() == "true"
+        
+        # Background processing jobs: concurrent runs, waiting jobs, finished jobs kept for lookups
+        self.job_workers = int(os.getenv("JOB_WORKERS", "2"))
+        self.job_queue_size = int(os.getenv("JOB_QUEUE_SIZE", "16"))
+        self.job_history_size = int(os.getenv("JOB_HISTORY_SIZE", "100"))
+        
+        # Directory the declared feedback sources of /process/sources and /jobs must lie in
+        self.feedback_source_dir = os.getenv("FEEDBACK_SOURCE_DIR", "data")
+        
+        # Cap for each uploaded feedback CSV (upload requests are cut off at 2x + 1 MB while streaming)
+        self.upload_max_mb = float(os.getenv("UPLOAD_MAX_MB", "100"))
+        
         # Logging Configuration
         self.log_level = os.getenv("LOG_LEVEL", "INFO")
 
@@ -1,7 +1,15 @@
 from fastapi import HTTPException, status
-from src.services.chat_service import ChatService
+from fastapi.responses import StreamingResponse
+from src.services.chat_service import ChatService, ChatStream
+from src.services.llm_resilience import CircuitOpenError
+from src.services.rate_limiter import RateLimitExceeded
 from src.models.chat_models import ChatResponse, ChatRequest
+from typing import AsyncIterator, Dict, Optional
+import asyncio
+import json
 import logging
+import math
+import openai
 
 logger = logging.getLogger(__name__)
 
@@ -9,8 +17,8 @@ logger = logging.getLogger(__name__)
 class ChatController:
     """Controller for chat business logic"""
     
-    def __init__(self):
-        self.chat_service = ChatService()
+    def __init__(self, chat_service: Optional[ChatService] = None):
+        self.chat_service = chat_service if chat_service is not None else ChatService()
     
     async def handle_basic_chat(self) -> ChatResponse:
         """Handle basic chat with default message"""
@@ -19,11 +27,7 @@ class ChatController:
             response_text = await self.chat_service.get_chat_response(message)
             return ChatResponse(response=response_text)
         except Exception as e:
-            logger.error(f"Error in basic chat: {e}")
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Chat service error"
-            )
+            raise _service_error(e, "basic chat")
     
     async def handle_chat_message(self, request: ChatRequest) -> ChatResponse:
         """Handle custom chat message"""
@@ -39,9 +43,91 @@ class ChatController:
         except HTTPException:
             raise
         except Exception as e:
-            logger.error(f"Error in chat: {e}")
+            raise _service_error(e, "chat")
+    
+    def upstream_stats(self) -> Dict:
+        """Upstream call, retry, hedge and circuit breaker counters, and the rate limit queue"""
+        scheduler = self.chat_service.scheduler
+        return {
+            **self.chat_service.resilience.stats(),
+            'scheduler': scheduler.stats() if scheduler is not None else None
+        }
+    
+    def cache_stats(self) -> Dict:
+        """Response cache hit counters"""
+        cache = self.chat_service.response_cache
+        return {'enabled': False} if cache is None else {'enabled': True, **cache.stats()}
+    
+    async def handle_chat_stream(self, request: ChatRequest) -> StreamingResponse:
+        """Relay the AI response token by token as server-sent events"""
+        if not request.message.strip():
             raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Chat service error"
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Message cannot be empty"
             )
+        
+        try:
+            stream = await self.chat_service.open_chat_stream(request.message)
+        except Exception as e:
+            raise _service_error(e, "chat stream")
+        
+        # Proxies must pass each event through as soon as it is written
+        return StreamingResponse(
+            self._sse_events(stream),
+            media_type="text/event-stream",
+            headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+        )
+    
+    async def _sse_events(self, stream: ChatStream) -> AsyncIterator[str]:
+        """
+        Server-sent events of a completion stream
+        
+        The response has already started, so a failure mid-stream is reported
+        as a final `error` event rather than a status code. If the client
+        disconnects, the generator is closed and the upstream stream with it.
+        """
+        try:
+            async for event in self.chat_service.iter_chat_stream(stream):
+                yield _sse(event.pop('type'), event)
+        except Exception as e:
+            logger.error(f"Error in chat stream: {e}")
+            yield _sse('error', {'detail': "Chat service error"})
+
+
+def _service_error(error: Exception, where: str) -> HTTPException:
+    """HTTP error for a failed chat call: 429 when rate limited, 503 while the circuit is open, 504 past the deadline"""
+    if isinstance(error, RateLimitExceeded):
+        logger.warning(f"Rate limited in {where}: {error}")
+        return HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Chat service is busy, retry later",
+            headers={'Retry-After': str(max(math.ceil(error.retry_after), 1))}
+        )
+    if isinstance(error, openai.RateLimitError):
+        logger.warning(f"Upstream rate limit in {where}: {error}")
+        return HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Chat service is busy, retry later"
+        )
+    if isinstance(error, CircuitOpenError):
+        logger.warning(f"Error in {where}: {error}")
+        return HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Chat service temporarily unavailable"
+        )
+    if isinstance(error, asyncio.TimeoutError):
+        logger.warning(f"Chat service deadline exceeded in {where}")
+        return HTTPException(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail="Chat service timed out"
+        )
+    logger.error(f"Error in {where}: {error}")
+    return HTTPException(
+        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        detail="Chat service error"
+    )
+
 
+def _sse(event: str, data: Dict) -> str:
+    """One server-sent event with a JSON payload"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
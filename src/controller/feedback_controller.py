@@ -1,9 +1,20 @@
 from fastapi import HTTPException, status, UploadFile
-from src.services.feedback_service import FeedbackService
-from src.models.feedback_models import ProcessingResult
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from src.config import settings
+from src.services.feedback_service import (
+    CsvTicketSink, FeedbackService, feedback_job_manager, feedback_result_cache, feedback_single_flight
+)
+from src.services.job_manager import JobQueueFull
+from src.services.ticket_store import TicketStore
+from src.services.ticket_export import EXPORT_FORMATS, check_export_format
+from src.agents.source_adapters import SourceSpec
+from src.models.feedback_models import FeedbackSourcesInput, ProcessingResult
+import asyncio
 import logging
 import os
-import tempfile
+from functools import partial
+from typing import List, Optional
 
 logger = logging.getLogger(__name__)
 
@@ -11,8 +22,14 @@ logger = logging.getLogger(__name__)
 class FeedbackController:
     """Controller for feedback processing operations"""
     
-    def __init__(self):
-        self.feedback_service = FeedbackService()
+    def __init__(self, feedback_service: Optional[FeedbackService] = None, ticket_store: Optional[TicketStore] = None):
+        """
+        Args:
+            feedback_service: Service processing the feedback (one with per-instance ticket numbering if None)
+            ticket_store: Store queried for tickets and updated by incremental runs (an in-memory one if None)
+        """
+        self.feedback_service = feedback_service if feedback_service is not None else FeedbackService()
+        self.ticket_store = ticket_store if ticket_store is not None else TicketStore(':memory:')
     
     async def process_feedback_files(self, reviews_path: str, emails_path: str) -> dict:
         """Process feedback from file paths"""
@@ -32,8 +49,8 @@ class FeedbackController:
             
             logger.info(f"Processing feedback from {reviews_path} and {emails_path}")
             
-            # Process through service
-            result = self.feedback_service.process_all_feedback(reviews_path, emails_path)
+            # Process through service, off the event loop
+            result = await run_in_threadpool(self.feedback_service.process_all_feedback, reviews_path, emails_path)
             
             logger.info(f"Processing completed: {result['metrics']['tickets_created']} tickets created")
             
@@ -48,30 +65,130 @@ class FeedbackController:
                 detail=f"Failed to process feedback: {str(e)}"
             )
     
-    async def process_uploaded_files(self, reviews_file: UploadFile, emails_file: UploadFile) -> dict:
-        """Process feedback from uploaded files"""
+    async def get_cached_result(self, reviews_path: str, emails_path: str, allow_stale: bool = True) -> dict:
+        """
+        Process feedback files, reusing the cached result while the files are unchanged
+        
+        After the files change, the previous result is served while the new one
+        computes, unless `allow_stale` is False.
+        """
         try:
-            # Save uploaded files temporarily
-            with tempfile.NamedTemporaryFile(mode='wb', delete=False, suffix='.csv') as reviews_temp:
-                reviews_content = await reviews_file.read()
-                reviews_temp.write(reviews_content)
-                reviews_temp_path = reviews_temp.name
+            for path in (reviews_path, emails_path):
+                if not os.path.exists(path):
+                    raise HTTPException(
+                        status_code=status.HTTP_404_NOT_FOUND,
+                        detail=f"Feedback file not found: {path}"
+                    )
             
-            with tempfile.NamedTemporaryFile(mode='wb', delete=False, suffix='.csv') as emails_temp:
-                emails_content = await emails_file.read()
-                emails_temp.write(emails_content)
-                emails_temp_path = emails_temp.name
+            return await feedback_result_cache.get(
+                'process_all_feedback',
+                [reviews_path, emails_path],
+                lambda: self.feedback_service.process_all_feedback(reviews_path, emails_path),
+                timeout=settings.coalesce_timeout_seconds,
+                allow_stale=allow_stale
+            )
             
-            try:
-                # Process files
-                result = self.feedback_service.process_all_feedback(reviews_temp_path, emails_temp_path)
-                
-                return result
-            finally:
-                # Clean up temp files
-                os.unlink(reviews_temp_path)
-                os.unlink(emails_temp_path)
+        except HTTPException:
+            raise
+        except asyncio.TimeoutError:
+            raise HTTPException(
+                status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+                detail="Feedback processing is still running; retry shortly"
+            )
+        except Exception as e:
+            logger.error(f"Error processing feedback: {e}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to process feedback: {str(e)}"
+            )
+    
+    async def export_tickets(self, reviews_path: str, emails_path: str, output_path: str,
+                             format: str = 'csv') -> dict:
+        """Export tickets, writing a cached result if there is one and streaming otherwise"""
+        self._check_export_format(format)
+        result = await self._peek_result(reviews_path, emails_path)
+        
+        if result is not None:
+            return await self.save_tickets_to_file(result, output_path, format)
+        return await self.export_tickets_stream(reviews_path, emails_path, output_path, format)
+    
+    async def download_tickets(self, reviews_path: str, emails_path: str, format: str = 'csv') -> StreamingResponse:
+        """Stream an export of the tickets as the response body, encoded chunk by chunk off the event loop"""
+        self._check_export_format(format)
+        result = await self._peek_result(reviews_path, emails_path)
+        
+        for path in (reviews_path, emails_path):
+            if result is None and not os.path.exists(path):
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail=f"Feedback file not found: {path}"
+                )
+        
+        writer = EXPORT_FORMATS[format]
+        body = self.feedback_service.iter_export(
+            reviews_path, emails_path, format, result['tickets'] if result is not None else None
+        )
+        return StreamingResponse(
+            body,
+            media_type=writer.media_type,
+            headers={'Content-Disposition': f'attachment; filename="tickets.{writer.extension}"'}
+        )
+    
+    def _check_export_format(self, format: str):
+        """Reject unknown export formats and formats whose dependency is missing"""
+        try:
+            check_export_format(format)
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    
+    async def _peek_result(self, reviews_path: str, emails_path: str):
+        """Cached pipeline result for the files, if there is one"""
+        try:
+            return await feedback_result_cache.peek('process_all_feedback', [reviews_path, emails_path])
+        except OSError:
+            return None
+    
+    async def process_uploaded_files(self, reviews_file: UploadFile, emails_file: UploadFile) -> dict:
+        """Process feedback from uploaded files, parsing the spooled uploads in chunks"""
+        try:
+            max_bytes = int(settings.upload_max_mb * 1024 * 1024)
+            reader = self.feedback_service.pipeline.reader
+            
+            for upload, source_type in ((reviews_file, 'review'), (emails_file, 'email')):
+                # Per-file check on the spooled upload; BodySizeLimitMiddleware already capped
+                # the whole request body while it streamed in
+                size = upload.size if upload.size is not None else upload.file.seek(0, os.SEEK_END)
+                upload.file.seek(0)
+                if size > max_bytes:
+                    name = upload.filename or source_type
+                    raise HTTPException(
+                        status_code=status.HTTP_413_CONTENT_TOO_LARGE,
+                        detail=f"{name} exceeds the {settings.upload_max_mb:g} MB upload limit"
+                    )
                 
+                try:
+                    missing = reader.check_header(upload.file, source_type)
+                except ValueError as e:
+                    raise HTTPException(
+                        status_code=status.HTTP_400_BAD_REQUEST,
+                        detail=f"{upload.filename or source_type}: {e}"
+                    )
+                if missing:
+                    raise HTTPException(
+                        status_code=status.HTTP_400_BAD_REQUEST,
+                        detail=f"{upload.filename or source_type} is missing columns: {', '.join(missing)}"
+                    )
+            
+            # Parse straight from the spooled uploads, off the event loop
+            tickets = []
+            result = await run_in_threadpool(
+                self.feedback_service.stream_feedback, reviews_file.file, emails_file.file, tickets.extend
+            )
+            
+            return {'tickets': tickets, **result}
+            
+        except HTTPException:
+            raise
         except Exception as e:
             logger.error(f"Error processing uploaded files: {e}")
             raise HTTPException(
@@ -79,6 +196,113 @@ class FeedbackController:
                 detail=f"Failed to process uploaded files: {str(e)}"
             )
     
+    async def process_sources(self, sources: FeedbackSourcesInput) -> dict:
+        """Process feedback from declared CSV, JSON Lines or Parquet sources, streamed in chunks"""
+        try:
+            specs = self._source_specs(sources)
+            
+            tickets = []
+            result = await run_in_threadpool(self.feedback_service.stream_sources, specs, tickets.extend)
+            
+            return {'tickets': tickets, **result}
+            
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.error(f"Error processing feedback sources: {e}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to process feedback sources: {str(e)}"
+            )
+    
+    def _source_specs(self, sources: FeedbackSourcesInput) -> List[SourceSpec]:
+        """
+        Source specs of a request
+        
+        Raises:
+            HTTPException: 403 for paths outside FEEDBACK_SOURCE_DIR, 404 for missing files, 400 for invalid specs
+        """
+        specs = []
+        for source in sources.sources:
+            path = self._source_path(source.path)
+            if not os.path.isfile(path):
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail=f"Feedback source not found: {source.path}"
+                )
+            try:
+                specs.append(SourceSpec(
+                    path, source.source_type, source.format, source.compression, source.columns,
+                    [(f.field, f.op, f.value) for f in source.filters]
+                ))
+            except ValueError as e:
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        return specs
+    
+    def _source_path(self, path: str) -> str:
+        """Resolved path of a declared source, rejected (403) unless it lies inside FEEDBACK_SOURCE_DIR"""
+        root = os.path.realpath(settings.feedback_source_dir)
+        resolved = os.path.realpath(path)
+        if os.path.commonpath([root, resolved]) != root:
+            logger.warning(f"Rejected feedback source outside {root}: {path}")
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail=f"Feedback sources must be inside {settings.feedback_source_dir}"
+            )
+        return resolved
+    
+    async def submit_job(self, reviews_path: str, emails_path: str,
+                         sources: Optional[FeedbackSourcesInput] = None) -> dict:
+        """Queue a background run over the feedback files (or declared sources), returning the job's status"""
+        if sources is not None:
+            specs = self._source_specs(sources)
+            kind = 'process_sources'
+            run = partial(self.feedback_service.run_feedback_job, sources=specs)
+        else:
+            for path in (reviews_path, emails_path):
+                if not os.path.exists(path):
+                    raise HTTPException(
+                        status_code=status.HTTP_404_NOT_FOUND,
+                        detail=f"Feedback file not found: {path}"
+                    )
+            kind = 'process_feedback'
+            run = partial(self.feedback_service.run_feedback_job, reviews_path=reviews_path, emails_path=emails_path)
+        
+        try:
+            job = feedback_job_manager.submit(kind, run)
+        except JobQueueFull as e:
+            raise HTTPException(status_code=status.HTTP_429_TOO_MANY_REQUESTS, detail=str(e))
+        return job.to_dict()
+    
+    async def get_job(self, job_id: str) -> dict:
+        """Status, progress and metrics of a job"""
+        return self._job(job_id).to_dict()
+    
+    async def get_job_result(self, job_id: str) -> dict:
+        """Tickets and metrics of a succeeded job"""
+        job = self._job(job_id)
+        if job.status != 'succeeded':
+            detail = f"Job {job_id} is {job.status}" + (f": {job.error}" if job.error else "")
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=detail)
+        return {'job_id': job_id, **job.result}
+    
+    async def cancel_job(self, job_id: str) -> dict:
+        """Cancel a queued job or stop a running one at its next chunk"""
+        try:
+            job = feedback_job_manager.cancel(job_id)
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+        if job is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Job not found: {job_id}")
+        return job.to_dict()
+    
+    def _job(self, job_id: str):
+        """Known job, or 404"""
+        job = feedback_job_manager.get(job_id)
+        if job is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Job not found: {job_id}")
+        return job
+    
     async def get_processing_summary(self, result: dict) -> dict:
         """Get processing summary"""
         try:
@@ -120,6 +344,52 @@ class FeedbackController:
                 detail="Failed to generate summary"
             )
     
+    async def query_tickets(self, reviews_path: str, emails_path: str, limit: int = None, offset: int = 0,
+                            **filters) -> dict:
+        """Query the ticket store, regenerating it only when the feedback files changed"""
+        try:
+            input_digest = await feedback_result_cache.input_key('process_all_feedback', [reviews_path, emails_path])
+            if self.ticket_store.input_digest() != input_digest:
+                await feedback_single_flight.do(
+                    ('refresh_ticket_store', id(self.ticket_store), input_digest),
+                    lambda: self._refresh_ticket_store(reviews_path, emails_path, input_digest),
+                    timeout=settings.coalesce_timeout_seconds
+                )
+            
+            return {
+                'total': self.ticket_store.count(**filters),
+                'tickets': self.ticket_store.query(limit=limit, offset=offset, **filters)
+            }
+            
+        except HTTPException:
+            raise
+        except asyncio.TimeoutError:
+            raise HTTPException(
+                status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+                detail="Ticket store refresh is still running; retry shortly"
+            )
+        except Exception as e:
+            logger.error(f"Error querying tickets: {e}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Failed to retrieve tickets"
+            )
+    
+    async def _refresh_ticket_store(self, reviews_path: str, emails_path: str, input_digest: str):
+        """Regenerate the ticket store from the pipeline result for the inputs (one refresh per digest at a time)"""
+        if self.ticket_store.input_digest() == input_digest:
+            return
+        result = await self.get_cached_result(reviews_path, emails_path, allow_stale=False)
+        # Watermarks at the files' ends, so a later incremental run does not reread the rows
+        watermarks = await run_in_threadpool(
+            self.feedback_service.file_watermarks, reviews_path, emails_path, result['source_rows']
+        )
+        if await feedback_result_cache.input_key('process_all_feedback', [reviews_path, emails_path]) != input_digest:
+            # The files grew while the result was computed, so its row counts may not match the offsets;
+            # without watermarks the next incremental run rereads the files and updates the tickets in place
+            watermarks = None
+        await run_in_threadpool(self.ticket_store.replace_all, result['tickets'], input_digest, watermarks)
+    
     async def get_tickets(self, result: dict, category: str = None, priority: str = None) -> list:
         """Get tickets with optional filtering"""
         try:
@@ -141,15 +411,85 @@ class FeedbackController:
                 detail="Failed to retrieve tickets"
             )
     
-    async def save_tickets_to_file(self, result: dict, output_path: str):
-        """Save tickets to CSV file"""
+    async def export_tickets_stream(self, reviews_path: str, emails_path: str, output_path: str,
+                                    format: str = 'csv') -> dict:
+        """Stream feedback through the pipeline off the event loop, writing tickets to a file chunk by chunk"""
+        try:
+            for path in (reviews_path, emails_path):
+                if not os.path.exists(path):
+                    raise HTTPException(
+                        status_code=status.HTTP_404_NOT_FOUND,
+                        detail=f"Feedback file not found: {path}"
+                    )
+            
+            result = await run_in_threadpool(
+                self.feedback_service.export_stream, reviews_path, emails_path, output_path, format
+            )
+            
+            return {
+                'message': f"Saved {result['ticket_count']} tickets to {output_path}",
+                'file_path': output_path,
+                'format': format,
+                'ticket_count': result['ticket_count'],
+                'metrics': result['metrics']
+            }
+            
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.error(f"Error streaming tickets: {e}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to export tickets: {str(e)}"
+            )
+    
+    async def process_incremental(self, reviews_path: str, emails_path: str, output_path: str) -> dict:
+        """Process only feedback appended since the last incremental run, appending its tickets to a CSV file"""
+        try:
+            for path in (reviews_path, emails_path):
+                if not os.path.exists(path):
+                    raise HTTPException(
+                        status_code=status.HTTP_404_NOT_FOUND,
+                        detail=f"Feedback file not found: {path}"
+                    )
+            
+            input_digest = await feedback_result_cache.input_key('process_all_feedback', [reviews_path, emails_path])
+            sink = CsvTicketSink(output_path, append=True)
+            
+            try:
+                result = await run_in_threadpool(
+                    self.feedback_service.process_incremental, reviews_path, emails_path,
+                    self.ticket_store, sink, None, input_digest
+                )
+            except ValueError as e:
+                raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+            
+            return {
+                'message': f'Appended {sink.ticket_count} new tickets to {output_path}',
+                'file_path': output_path,
+                'ticket_count': sink.ticket_count,
+                **result
+            }
+            
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.error(f"Error processing new feedback: {e}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to process new feedback: {str(e)}"
+            )
+    
+    async def save_tickets_to_file(self, result: dict, output_path: str, format: str = 'csv'):
+        """Save tickets to a CSV, NDJSON or Parquet file off the event loop"""
         try:
             tickets = result['tickets']
-            self.feedback_service.save_tickets(tickets, output_path)
+            await run_in_threadpool(self.feedback_service.save_tickets, tickets, output_path, format)
             
             return {
                 'message': f'Saved {len(tickets)} tickets to {output_path}',
                 'file_path': output_path,
+                'format': format,
                 'ticket_count': len(tickets)
             }
             
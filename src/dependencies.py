@@ -0,0 +1,55 @@
+from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
+from src.controller.chat_controller import ChatController
+from src.controller.feedback_controller import FeedbackController
+from src.controller.user_controller import UserController
+from src.services.chat_service import (
+    ChatService, create_llm_http_client, create_llm_resilience, create_llm_response_cache, create_llm_scheduler
+)
+from src.services.feedback_service import (
+    FeedbackService, create_ticket_id_allocator, create_ticket_store, feedback_job_manager, feedback_process_pool
+)
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class AppServices:
+    """Controllers, services and pooled clients shared by every request of an app"""
+    
+    def __init__(self):
+        self.llm_http_client = create_llm_http_client()
+        self.llm_response_cache = create_llm_response_cache()
+        self.chat_service = ChatService(
+            self.llm_http_client, self.llm_response_cache, create_llm_resilience(), create_llm_scheduler()
+        )
+        self.chat_controller = ChatController(self.chat_service)
+        self.ticket_store = create_ticket_store()
+        self.ticket_ids = create_ticket_id_allocator()
+        self.feedback_controller = FeedbackController(FeedbackService(id_allocator=self.ticket_ids), self.ticket_store)
+        self.user_controller = UserController()
+    
+    async def close(self):
+        """Close pooled connections and stop background work"""
+        await self.llm_http_client.aclose()
+        await run_in_threadpool(feedback_job_manager.shutdown)
+        if feedback_process_pool is not None:
+            await run_in_threadpool(feedback_process_pool.close)
+        self.ticket_store.close()
+        self.ticket_ids.close()
+        if self.llm_response_cache is not None:
+            self.llm_response_cache.close()
+        logger.info("Closed shared services")
+
+
+def get_app_services(app: FastAPI) -> AppServices:
+    """
+    Services created by the app lifespan
+    
+    Created on first use when the lifespan did not run (e.g. a TestClient
+    used without a `with` block).
+    """
+    services = getattr(app.state, 'services', None)
+    if services is None:
+        services = app.state.services = AppServices()
+    return services
@@ -3,7 +3,10 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from src.routes.main_router import router as main_router
 from src.config import settings
+from src.dependencies import AppServices
+from src.middleware import BodySizeLimitMiddleware
 from dotenv import load_dotenv
+from contextlib import asynccontextmanager
 import logging
 
 # Load environment variables first
@@ -16,8 +19,25 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Create the shared services on startup and close them on shutdown"""
+    logger.info(f"Starting {settings.app_name} v{settings.app_version}")
+    logger.info(f"Using model: {settings.model_name}")
+    app.state.services = AppServices()
+    
+    try:
+        yield
+    finally:
+        logger.info(f"Shutting down {settings.app_name}")
+        await app.state.services.close()
+        app.state.services = None
+
+
 # Create FastAPI app
 app = FastAPI(
+    lifespan=lifespan,
     root_path=settings.root_path,
     title=settings.app_name,
     version=settings.app_version,
@@ -35,18 +55,11 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-
-@app.on_event("startup")
-async def startup_event():
-    """Log startup information"""
-    logger.info(f"Starting {settings.app_name} v{settings.app_version}")
-    logger.info(f"Using model: {settings.model_name}")
-
-
-@app.on_event("shutdown")
-async def shutdown_event():
-    """Log shutdown information"""
-    logger.info(f"Shutting down {settings.app_name}")
+# Cap multipart uploads while they stream in: two CSVs of UPLOAD_MAX_MB each, plus form overhead
+app.add_middleware(
+    BodySizeLimitMiddleware,
+    max_bytes=int((2 * settings.upload_max_mb + 1) * 1024 * 1024)
+)
 
 
 @app.get("/health", tags=["Health"])
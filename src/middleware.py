@@ -0,0 +1,72 @@
+import logging
+from typing import Tuple
+
+from fastapi import HTTPException, status
+from fastapi.responses import JSONResponse
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+
+class BodySizeLimitMiddleware:
+    """
+    Rejects request bodies over a byte limit with 413 while they stream in
+
+    Applies to requests of the given content types (multipart uploads by
+    default). A declared Content-Length over the limit is rejected before
+    any of the body is read; otherwise bytes are counted as they arrive and
+    reading stops at the limit, so the form parser never spools more than
+    `max_bytes` to memory or disk.
+    """
+
+    def __init__(self, app: ASGIApp, max_bytes: int, content_types: Tuple[str, ...] = ('multipart/form-data',)):
+        """
+        Args:
+            app: The wrapped ASGI app
+            max_bytes: Largest body accepted
+            content_types: Media types whose bodies are limited
+        """
+        self.app = app
+        self.max_bytes = max_bytes
+        self.content_types = content_types
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        media_type = headers.get('content-type', '').split(';')[0].strip().lower()
+        if media_type not in self.content_types:
+            await self.app(scope, receive, send)
+            return
+
+        length = headers.get('content-length', '')
+        if length.isdigit() and int(length) > self.max_bytes:
+            logger.warning(f"Rejected a {length} byte request body over the {self.max_bytes} byte limit")
+            response = JSONResponse(
+                status_code=status.HTTP_413_CONTENT_TOO_LARGE,
+                content={'detail': self._detail()}
+            )
+            await response(scope, receive, send)
+            return
+
+        received = 0
+
+        async def limited_receive() -> Message:
+            nonlocal received
+            message = await receive()
+            if message['type'] == 'http.request':
+                received += len(message.get('body', b''))
+                if received > self.max_bytes:
+                    logger.warning(f"Stopped reading a request body at the {self.max_bytes} byte limit")
+                    # Raised inside body parsing, which passes HTTPExceptions through
+                    raise HTTPException(status_code=status.HTTP_413_CONTENT_TOO_LARGE, detail=self._detail())
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+    def _detail(self) -> str:
+        """Error message naming the limit"""
+        return f"Request body exceeds the {self.max_bytes / (1024 * 1024):g} MB limit"
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional, List
+from typing import Any, Dict, Optional, List
 from datetime import datetime
 
 
@@ -9,6 +9,28 @@ class FeedbackInput(BaseModel):
     emails_file: Optional[str] = Field(None, description="Path to emails CSV file")
 
 
+class SourceFilter(BaseModel):
+    """Row filter applied while reading a feedback source"""
+    field: str = Field(..., description="FeedbackItem field, e.g. date")
+    op: str = Field(..., description="One of ==, !=, <, <=, >, >=")
+    value: Any
+
+
+class FeedbackSourceInput(BaseModel):
+    """Declared feedback source file and its column mapping"""
+    path: str
+    source_type: str  # 'review' or 'email'
+    format: Optional[str] = Field(None, description="csv, jsonl or parquet (from the file extension if omitted)")
+    compression: Optional[str] = Field(None, description="gzip or zstd (from the file extension if omitted)")
+    columns: Dict[str, str] = Field(default_factory=dict, description="FeedbackItem field -> source column")
+    filters: List[SourceFilter] = Field(default_factory=list)
+
+
+class FeedbackSourcesInput(BaseModel):
+    """Input model for processing declared feedback sources"""
+    sources: List[FeedbackSourceInput]
+
+
 class FeedbackItem(BaseModel):
     """Model for individual feedback item"""
     source_id: str
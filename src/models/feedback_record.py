@@ -0,0 +1,198 @@
+import sys
+from typing import Any, Dict, Iterator, List, Optional, Union
+
+import pandas as pd
+
+
+# Source columns -> record attribute, per source type
+REVIEW_COLUMNS = {
+    'review_id': 'source_id',
+    'review_text': 'text',
+    'platform': 'platform',
+    'rating': 'rating',
+    'user_name': 'user_name',
+    'date': 'date',
+    'app_version': 'app_version'
+}
+EMAIL_COLUMNS = {
+    'email_id': 'source_id',
+    'body': 'text',
+    'subject': 'subject',
+    'sender_email': 'sender_email',
+    'timestamp': 'date'
+}
+SOURCE_COLUMNS = {'review': REVIEW_COLUMNS, 'email': EMAIL_COLUMNS}
+
+# Annotations the pipeline stages attach to a record
+ANNOTATIONS = (
+    'category', 'confidence', 'keyword_hits', 'technical_analysis', 'feature_analysis',
+    'similar_requests', 'duplicates', 'duplicate_of', 'ticket'
+)
+
+# Low-cardinality attributes stored as interned strings
+_INTERNED = ('platform', 'app_version')
+
+
+class FeedbackRecord:
+    """
+    Compact feedback item with its normalized text computed once
+
+    Fields follow `FeedbackItem`. The record also answers the dict lookups
+    the agents use (`get`, `[]`, `in`) under the original CSV column names,
+    so it can flow through the pipeline in place of a pandas row dict.
+    Unset attributes behave like missing keys.
+    """
+
+    __slots__ = (
+        'source_type', 'source_id', 'text', 'text_lower', 'tokens', 'rating', 'platform',
+        'app_version', 'user_name', 'date', 'subject', 'sender_email', 'extra'
+    ) + ANNOTATIONS
+
+    def __init__(self, source_type: str, source_id: Any, text: Optional[str], **fields: Any):
+        self.source_type = sys.intern(source_type)
+        self.source_id = source_id
+        self.set_text(text)
+        self.extra: Optional[Dict[str, Any]] = None
+        for key, value in fields.items():
+            self[key] = value
+
+    def set_text(self, text: Optional[str]):
+        """Set the text and its lowercased form and tokens"""
+        self.text = text if isinstance(text, str) else ''
+        self.text_lower = self.text.lower()
+        self.tokens: List[str] = self.text.split()
+
+    @classmethod
+    def from_dict(cls, row: Dict[str, Any], source_type: Optional[str] = None) -> 'FeedbackRecord':
+        """Build a record from a review or email row dict"""
+        if source_type is None:
+            source_type = 'review' if 'review_id' in row else 'email'
+        columns = SOURCE_COLUMNS[source_type]
+
+        record = cls(source_type, None, None)
+        for key, value in row.items():
+            if columns.get(key) == 'text':
+                record.set_text(value)
+            else:
+                record[key] = value
+        return record
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, source_type: str) -> List['FeedbackRecord']:
+        """Build records column-wise from a reviews or emails DataFrame"""
+        columns = SOURCE_COLUMNS[source_type]
+        names = list(df.columns)
+        values = [df[name].tolist() for name in names]
+
+        records = []
+        for row in zip(*values):
+            record = cls(source_type, None, None)
+            for name, value in zip(names, row):
+                if columns.get(name) == 'text':
+                    record.set_text(value)
+                else:
+                    record[name] = value
+            records.append(record)
+        return records
+
+    def __getstate__(self) -> Dict[str, Any]:
+        """Attributes to pickle, without the lowercased text and tokens (rebuilt on unpickling)"""
+        return {
+            name: getattr(self, name) for name in self.__slots__
+            if name not in ('text_lower', 'tokens') and hasattr(self, name)
+        }
+
+    def __setstate__(self, state: Dict[str, Any]):
+        for name, value in state.items():
+            setattr(self, name, value)
+        self.set_text(self.text)
+
+    def _attribute(self, key: str) -> Optional[str]:
+        """Record attribute backing a column or annotation key, if any"""
+        attribute = SOURCE_COLUMNS[self.source_type].get(key)
+        if attribute is not None:
+            return attribute
+        if key in ANNOTATIONS:
+            return key
+        return None
+
+    def __getitem__(self, key: str) -> Any:
+        attribute = self._attribute(key)
+        if attribute is None:
+            if self.extra is not None and key in self.extra:
+                return self.extra[key]
+            raise KeyError(key)
+
+        try:
+            return getattr(self, attribute)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def __setitem__(self, key: str, value: Any):
+        attribute = self._attribute(key)
+        if attribute is None:
+            if self.extra is None:
+                self.extra = {}
+            self.extra[key] = value
+        elif attribute == 'text':
+            self.set_text(value)
+        else:
+            if attribute in _INTERNED and isinstance(value, str):
+                value = sys.intern(value)
+            setattr(self, attribute, value)
+
+    def __contains__(self, key: str) -> bool:
+        try:
+            self[key]
+        except KeyError:
+            return False
+        return True
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Dict-style lookup by column or annotation name"""
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def setdefault(self, key: str, default: Any = None) -> Any:
+        """Dict-style setdefault by column or annotation name"""
+        try:
+            return self[key]
+        except KeyError:
+            self[key] = default
+            return default
+
+    def keys(self) -> Iterator[str]:
+        """Column and annotation names that are set on this record"""
+        for key in list(SOURCE_COLUMNS[self.source_type]) + list(ANNOTATIONS) + list(self.extra or ()):
+            if key in self:
+                yield key
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Row dict under the original column names, plus annotations"""
+        return {key: self[key] for key in self.keys()}
+
+    def __repr__(self) -> str:
+        return f"FeedbackRecord({self.source_type} {self.source_id!r}: {self.text[:40]!r})"
+
+
+def feedback_text(feedback: Union[FeedbackRecord, Dict]) -> str:
+    """Original text of a feedback record or row dict"""
+    if isinstance(feedback, FeedbackRecord):
+        return feedback.text
+    return feedback.get('review_text') or feedback.get('body', '')
+
+
+def feedback_text_lower(feedback: Union[FeedbackRecord, Dict]) -> str:
+    """Lowercased text, cached on records"""
+    if isinstance(feedback, FeedbackRecord):
+        return feedback.text_lower
+    return feedback_text(feedback).lower()
+
+
+def feedback_tokens(feedback: Union[FeedbackRecord, Dict]) -> List[str]:
+    """Whitespace tokens of the text, cached on records"""
+    if isinstance(feedback, FeedbackRecord):
+        return feedback.tokens
+    return feedback_text(feedback).split()
@@ -1,13 +1,15 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request
+from fastapi.responses import StreamingResponse
 from src.controller.chat_controller import ChatController
+from src.dependencies import get_app_services
 from src.models.chat_models import ChatResponse, ChatRequest
 
 router = APIRouter()
 
 
-def get_controller() -> ChatController:
-    """Dependency injection for controller"""
-    return ChatController()
+def get_controller(request: Request) -> ChatController:
+    """Dependency injection for the app's shared chat controller"""
+    return get_app_services(request.app).chat_controller
 
 
 @router.get("/basic", response_model=ChatResponse)
@@ -23,3 +25,24 @@ async def chat(
 ) -> ChatResponse:
     """Send message and get AI response"""
     return await controller.handle_chat_message(request)
+
+
+@router.post("/chat/stream", response_class=StreamingResponse)
+async def chat_stream(
+    request: ChatRequest,
+    controller: ChatController = Depends(get_controller)
+) -> StreamingResponse:
+    """Send message and stream the AI response as server-sent events (`token` events, then `done` with usage)"""
+    return await controller.handle_chat_stream(request)
+
+
+@router.get("/cache")
+async def cache_stats(controller: ChatController = Depends(get_controller)) -> dict:
+    """Chat response cache hit counters"""
+    return controller.cache_stats()
+
+
+@router.get("/upstream")
+async def upstream_stats(controller: ChatController = Depends(get_controller)) -> dict:
+    """Upstream LLM call metrics: retries, hedges, deadlines, circuit breaker state and latency percentiles"""
+    return controller.upstream_stats()
@@ -1,14 +1,20 @@
-from fastapi import APIRouter, Depends, UploadFile, File, Query
+from fastapi import APIRouter, Depends, Request, UploadFile, File, Query
 from src.controller.feedback_controller import FeedbackController
+from src.dependencies import get_app_services
+from src.models.feedback_models import FeedbackSourcesInput
+from src.services.feedback_service import (
+    feedback_job_manager, feedback_memo_cache, feedback_result_cache, feedback_single_flight
+)
+from src.services.ticket_export import EXPORT_FORMATS
 from typing import Optional
 import os
 
 router = APIRouter()
 
 
-def get_controller() -> FeedbackController:
-    """Dependency injection for feedback controller"""
-    return FeedbackController()
+def get_controller(request: Request) -> FeedbackController:
+    """Dependency injection for the app's shared feedback controller"""
+    return get_app_services(request.app).feedback_controller
 
 
 @router.post("/process")
@@ -21,6 +27,28 @@ async def process_feedback(controller: FeedbackController = Depends(get_controll
     return result
 
 
+@router.post("/process/incremental")
+async def process_new_feedback(
+    output_path: str = Query("output/generated_tickets.csv"),
+    controller: FeedbackController = Depends(get_controller)
+) -> dict:
+    """Process only feedback appended to the default CSV files since the last incremental run"""
+    reviews_path = "data/app_store_reviews.csv"
+    emails_path = "data/support_emails.csv"
+    
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    return await controller.process_incremental(reviews_path, emails_path, output_path)
+
+
+@router.post("/process/sources")
+async def process_feedback_sources(
+    sources: FeedbackSourcesInput,
+    controller: FeedbackController = Depends(get_controller)
+) -> dict:
+    """Process feedback from CSV, JSON Lines or Parquet files (optionally gzip/zstd) with column mappings"""
+    return await controller.process_sources(sources)
+
+
 @router.post("/process/upload")
 async def process_uploaded_feedback(
     reviews_file: UploadFile = File(...),
@@ -32,13 +60,43 @@ async def process_uploaded_feedback(
     return result
 
 
+@router.post("/jobs", status_code=202)
+async def submit_job(
+    sources: Optional[FeedbackSourcesInput] = None,
+    controller: FeedbackController = Depends(get_controller)
+) -> dict:
+    """Queue processing of the default CSV files (or the declared sources) as a background job"""
+    reviews_path = "data/app_store_reviews.csv"
+    emails_path = "data/support_emails.csv"
+    
+    return await controller.submit_job(reviews_path, emails_path, sources)
+
+
+@router.get("/jobs/{job_id}")
+async def get_job(job_id: str, controller: FeedbackController = Depends(get_controller)) -> dict:
+    """Get a job's status, progress and metrics"""
+    return await controller.get_job(job_id)
+
+
+@router.get("/jobs/{job_id}/result")
+async def get_job_result(job_id: str, controller: FeedbackController = Depends(get_controller)) -> dict:
+    """Get the tickets and metrics of a finished job"""
+    return await controller.get_job_result(job_id)
+
+
+@router.delete("/jobs/{job_id}")
+async def cancel_job(job_id: str, controller: FeedbackController = Depends(get_controller)) -> dict:
+    """Cancel a queued or running job"""
+    return await controller.cancel_job(job_id)
+
+
 @router.get("/summary")
 async def get_summary(controller: FeedbackController = Depends(get_controller)) -> dict:
     """Get processing summary"""
     reviews_path = "data/app_store_reviews.csv"
     emails_path = "data/support_emails.csv"
     
-    result = await controller.process_feedback_files(reviews_path, emails_path)
+    result = await controller.get_cached_result(reviews_path, emails_path)
     summary = await controller.get_processing_summary(result)
     
     return summary
@@ -48,31 +106,42 @@ async def get_summary(controller: FeedbackController = Depends(get_controller))
 async def get_tickets(
     category: Optional[str] = Query(None, description="Filter by category"),
     priority: Optional[str] = Query(None, description="Filter by priority"),
+    assigned_to: Optional[str] = Query(None, description="Filter by assigned team"),
+    source_id: Optional[str] = Query(None, description="Filter by source review/email ID"),
+    limit: Optional[int] = Query(None, ge=1, description="Maximum number of tickets"),
+    offset: int = Query(0, ge=0, description="Number of matching tickets to skip"),
     controller: FeedbackController = Depends(get_controller)
 ) -> dict:
-    """Get generated tickets with optional filtering"""
+    """Get generated tickets with optional filtering, served from the ticket store"""
     reviews_path = "data/app_store_reviews.csv"
     emails_path = "data/support_emails.csv"
     
-    result = await controller.process_feedback_files(reviews_path, emails_path)
-    tickets = await controller.get_tickets(result, category, priority)
-    
-    return {'total': len(tickets), 'tickets': tickets}
+    return await controller.query_tickets(
+        reviews_path, emails_path, limit=limit, offset=offset,
+        category=category, priority=priority, assigned_to=assigned_to, source_id=source_id
+    )
 
 
 @router.post("/tickets/export")
 async def export_tickets(
-    output_path: str = Query("output/generated_tickets.csv"),
+    format: str = Query("csv", description="Export format: csv, ndjson (gzip) or parquet"),
+    output_path: Optional[str] = Query(None, description="File to write (output/generated_tickets.<ext> if omitted)"),
+    download: bool = Query(False, description="Stream the export as the response instead of writing a file"),
     controller: FeedbackController = Depends(get_controller)
-) -> dict:
-    """Export generated tickets to CSV file"""
+):
+    """Export generated tickets from the cached result, or by streaming the feedback, to a file or the response"""
     reviews_path = "data/app_store_reviews.csv"
     emails_path = "data/support_emails.csv"
     
-    result = await controller.process_feedback_files(reviews_path, emails_path)
+    if download:
+        return await controller.download_tickets(reviews_path, emails_path, format)
     
-    os.makedirs(os.path.dirname(output_path), exist_ok=True)
-    save_result = await controller.save_tickets_to_file(result, output_path)
+    if output_path is None:
+        extension = EXPORT_FORMATS[format].extension if format in EXPORT_FORMATS else format
+        output_path = f"output/generated_tickets.{extension}"
+    
+    os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+    save_result = await controller.export_tickets(reviews_path, emails_path, output_path, format)
     
     return save_result
 
@@ -83,5 +152,9 @@ async def health_check() -> dict:
     return {
         'status': 'healthy',
         'service': 'Feedback Analysis System',
-        'agents': ['CSV Reader', 'Classifier', 'Bug Analyzer', 'Feature Extractor', 'Ticket Creator']
+        'agents': ['CSV Reader', 'Classifier', 'Bug Analyzer', 'Feature Extractor', 'Ticket Creator'],
+        'memo_cache': feedback_memo_cache.stats(),
+        'result_cache': feedback_result_cache.stats(),
+        'single_flight': feedback_single_flight.stats(),
+        'jobs': feedback_job_manager.stats()
     }
@@ -1,13 +1,14 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request
 from src.controller.user_controller import UserController
+from src.dependencies import get_app_services
 from src.models.user_models import UserResponse, LoginRequest, LoginResponse
 
 router = APIRouter()
 
 
-def get_controller() -> UserController:
-    """Dependency injection for controller"""
-    return UserController()
+def get_controller(request: Request) -> UserController:
+    """Dependency injection for the app's shared user controller"""
+    return get_app_services(request.app).user_controller
 
 
 @router.get("/me", response_model=UserResponse)
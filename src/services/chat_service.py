@@ -1,29 +1,227 @@
-from openai import AsyncOpenAI
+from functools import partial
+from openai import AsyncOpenAI, AsyncStream
+from openai.types.chat import ChatCompletionChunk
+from typing import AsyncIterator, Dict, List, Optional
+from src.config import settings
+from src.services.llm_cache import LLMResponseCache
+from src.services.llm_resilience import CircuitBreaker, ResilientCaller
+from src.services.rate_limiter import UpstreamScheduler, estimate_tokens
+from src.services.single_flight import SingleFlight
+import httpx
 import os
 import logging
+import time
 
 logger = logging.getLogger(__name__)
 
 
+def create_llm_http_client() -> httpx.AsyncClient:
+    """Long-lived HTTP client for LLM calls, keeping connections (and their TLS sessions) alive between requests"""
+    return httpx.AsyncClient(
+        limits=httpx.Limits(
+            max_connections=settings.llm_max_connections,
+            max_keepalive_connections=settings.llm_max_keepalive_connections,
+            keepalive_expiry=settings.llm_keepalive_expiry_seconds
+        ),
+        timeout=httpx.Timeout(settings.llm_timeout_seconds, connect=settings.llm_connect_timeout_seconds),
+        follow_redirects=True
+    )
+
+
+def create_llm_response_cache() -> Optional[LLMResponseCache]:
+    """Response cache for chat completions from the LLM_CACHE_* settings (None if disabled)"""
+    if not settings.llm_cache_enabled:
+        return None
+    return LLMResponseCache(
+        max_entries=settings.llm_cache_max_entries,
+        ttl_seconds=settings.llm_cache_ttl_seconds or None,
+        max_bytes=int(settings.llm_cache_max_mb * 1024 * 1024),
+        db_path=settings.llm_cache_db_path or None,
+        max_disk_entries=settings.llm_cache_max_disk_entries
+    )
+
+
+def create_llm_resilience() -> ResilientCaller:
+    """Deadline, retry, hedging and circuit breaker policy for LLM calls from the LLM_* settings"""
+    return ResilientCaller(
+        deadline_seconds=settings.llm_deadline_seconds,
+        max_attempts=settings.llm_max_attempts,
+        backoff_base_seconds=settings.llm_backoff_base_seconds,
+        backoff_max_seconds=settings.llm_backoff_max_seconds,
+        hedge_percentile=settings.llm_hedge_percentile or None,
+        breaker=CircuitBreaker(
+            failure_rate=settings.llm_breaker_failure_rate,
+            window=settings.llm_breaker_window,
+            min_calls=settings.llm_breaker_min_calls,
+            open_seconds=settings.llm_breaker_open_seconds
+        )
+    )
+
+
+def create_llm_scheduler() -> Optional[UpstreamScheduler]:
+    """Upstream rate limit scheduler from the LLM_*_PER_MINUTE settings (None if both budgets are unlimited)"""
+    if not settings.llm_requests_per_minute and not settings.llm_tokens_per_minute:
+        return None
+    return UpstreamScheduler(
+        requests_per_minute=settings.llm_requests_per_minute or None,
+        tokens_per_minute=settings.llm_tokens_per_minute or None,
+        max_wait_seconds=settings.llm_rate_limit_max_wait_seconds,
+        max_queue=settings.llm_rate_limit_max_queue
+    )
+
+
+class ChatStream:
+    """An open streamed completion and the tokens charged for it up front"""
+    
+    def __init__(self, response: AsyncStream[ChatCompletionChunk], estimated_tokens: int):
+        self.response = response
+        self.estimated_tokens = estimated_tokens
+
+
 class ChatService:
     """Service for OpenAI API integration"""
     
-    def __init__(self):
+    def __init__(self, http_client: Optional[httpx.AsyncClient] = None,
+                 response_cache: Optional[LLMResponseCache] = None, resilience: Optional[ResilientCaller] = None,
+                 scheduler: Optional[UpstreamScheduler] = None):
+        """
+        Args:
+            http_client: Shared, pooled HTTP client for the OpenAI client (a private one if None)
+            response_cache: Cache of responses to repeated prompts (every call goes upstream if None)
+            resilience: Deadline, retry and circuit breaker policy for upstream calls (a default one if None)
+            scheduler: Requests- and tokens-per-minute budgets upstream calls queue for (unlimited if None)
+        """
         api_key = os.getenv("OPENAI_API_KEY")
         if not api_key:
-            raise ValueError("OPENAI_API_KEY not set in environment")
+            logger.warning("OPENAI_API_KEY not set in environment; chat requests will fail")
         
-        self.client = AsyncOpenAI(api_key=api_key)
+        # Retries are left to the resilience policy, so they stay inside its deadline
+        self.client = AsyncOpenAI(api_key=api_key, http_client=http_client, max_retries=0) if api_key else None
         self.model = os.getenv("MODEL_NAME", "gpt-4o-mini")
+        self.response_cache = response_cache
+        self.resilience = resilience if resilience is not None else ResilientCaller()
+        self.scheduler = scheduler
+        self._flights = SingleFlight()
     
     async def get_chat_response(self, message: str) -> str:
-        """Get AI response for a message"""
+        """
+        Get AI response for a message
+        
+        Repeated prompts are answered from the response cache, and concurrent
+        identical prompts share one upstream call.
+        """
+        if self.client is None:
+            raise ValueError("OPENAI_API_KEY not set in environment")
+        
+        messages = [{"role": "user", "content": message}]
+        if self.response_cache is None:
+            return await self._complete(messages)
+        
+        key = LLMResponseCache.make_key(self.model, messages)
+        cached = await self.response_cache.get(key)
+        if cached is not None:
+            return cached
+        return await self._flights.do(key, partial(self._complete_and_cache, key, messages))
+    
+    async def _complete(self, messages: List[Dict[str, str]]) -> str:
+        """Response text of one upstream completion"""
         try:
-            response = await self.client.chat.completions.create(
-                model=self.model,
-                messages=[{"role": "user", "content": message}]
-            )
+            estimated = estimate_tokens(messages, settings.llm_expected_output_tokens)
+            response = await self.resilience.call(partial(self._create, estimated, messages=messages))
+            self._settle(estimated, response.usage)
             return response.choices[0].message.content
         except Exception as e:
             logger.error(f"OpenAI API error: {e}")
             raise
+    
+    async def _create(self, estimated: int, **params):
+        """
+        One upstream request, after waiting for its rate limit budget
+        
+        Called once per attempt, so retries and hedged requests are charged too.
+        """
+        if self.scheduler is not None:
+            await self.scheduler.acquire(estimated)
+        return await self.client.chat.completions.create(model=self.model, **params)
+    
+    def _settle(self, estimated: int, usage):
+        """Correct the token budget with the usage the API reported, if any"""
+        if self.scheduler is None or usage is None:
+            return
+        total = usage.get('total_tokens') if isinstance(usage, dict) else usage.total_tokens
+        self.scheduler.settle(estimated, total)
+    
+    async def _complete_and_cache(self, key: str, messages: List[Dict[str, str]]) -> str:
+        """Upstream completion, stored in the response cache"""
+        response = await self._complete(messages)
+        if response is not None:
+            await self.response_cache.set(key, response)
+        return response
+    
+    async def open_chat_stream(self, message: str) -> ChatStream:
+        """
+        Start a streamed completion for a message
+        
+        Connection and API errors are raised here, before any token is relayed;
+        transient ones are retried within the deadline first.
+        The final chunk carries token usage when the API supports it.
+        """
+        if self.client is None:
+            raise ValueError("OPENAI_API_KEY not set in environment")
+        
+        messages = [{"role": "user", "content": message}]
+        estimated = estimate_tokens(messages, settings.llm_expected_output_tokens)
+        
+        # Not hedged: the losing request would leave an open stream behind
+        try:
+            response = await self.resilience.call(partial(
+                self._create,
+                estimated,
+                messages=messages,
+                stream=True,
+                extra_body={"stream_options": {"include_usage": True}}
+            ), hedge=False)
+            return ChatStream(response, estimated)
+        except Exception as e:
+            logger.error(f"OpenAI API error: {e}")
+            raise
+    
+    async def iter_chat_stream(self, stream: ChatStream) -> AsyncIterator[Dict]:
+        """
+        Events of a streamed completion, closing the upstream response when done or abandoned
+        
+        Yields one {'type': 'token', 'content': ...} per content delta as it
+        arrives, then a single {'type': 'done', ...} record with the finish
+        reason, token usage (None if the API did not report it) and timings.
+        Chunks are read from the API only as fast as the events are consumed.
+        The usage of the final chunk settles the stream's rate limit budget.
+        """
+        started = time.perf_counter()
+        first_token_ms = None
+        finish_reason = None
+        usage = None
+        tokens = 0
+        
+        try:
+            async for chunk in stream.response:
+                if getattr(chunk, 'usage', None) is not None:
+                    usage = chunk.usage if isinstance(chunk.usage, dict) else chunk.usage.model_dump()
+                for choice in chunk.choices:
+                    finish_reason = choice.finish_reason or finish_reason
+                    if choice.delta.content:
+                        if first_token_ms is None:
+                            first_token_ms = round((time.perf_counter() - started) * 1000, 1)
+                        tokens += 1
+                        yield {'type': 'token', 'content': choice.delta.content}
+        finally:
+            await stream.response.close()
+        
+        self._settle(stream.estimated_tokens, usage)
+        yield {
+            'type': 'done',
+            'finish_reason': finish_reason,
+            'usage': usage,
+            'token_chunks': tokens,
+            'first_token_ms': first_token_ms,
+            'elapsed_ms': round((time.perf_counter() - started) * 1000, 1)
+        }
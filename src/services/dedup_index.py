@@ -0,0 +1,128 @@
+import logging
+import re
+from collections import deque
+from typing import Deque, Dict, Hashable, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Anything that is not a letter or digit separates shingle words
+_NON_WORD = re.compile(r'[\W_]+')
+
+# Odd multipliers for the rolling shingle hash and its final bit mix
+_SHINGLE_BASE = np.uint64(0x100000001B3)
+_MIX = np.uint64(0x9E3779B97F4A7C15)
+
+
+def has_shingles(text: Optional[str]) -> bool:
+    """Check if a text has any letters or digits to shingle (empty texts all share one signature)"""
+    return bool(text) and _NON_WORD.sub('', text) != ''
+
+
+class MinHashLSHIndex:
+    """MinHash signatures with LSH banding for near-duplicate lookup"""
+
+    def __init__(self, threshold: float = 0.6, num_perm: int = 64, bands: int = 16,
+                 shingle_size: int = 5, bucket_size: int = 32, seed: int = 1):
+        """
+        Args:
+            threshold: Minimum estimated Jaccard similarity to count as a duplicate
+            num_perm: Number of hash functions in a signature
+            bands: LSH bands; num_perm must be divisible by it
+            shingle_size: Characters per shingle of the normalized text
+            bucket_size: Most recent groups kept per LSH bucket, bounding the
+                candidates compared for texts that share many bands
+        """
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+
+        # Multiply-shift hash family over 64-bit words
+        rng = np.random.default_rng(seed)
+        self._a = (rng.integers(0, 2 ** 63, num_perm, dtype=np.uint64) << np.uint64(1)) | np.uint64(1)
+        self._b = rng.integers(0, 2 ** 63, num_perm, dtype=np.uint64)
+
+        self.bucket_size = bucket_size
+        self._buckets: List[Dict[bytes, Deque[Hashable]]] = [{} for _ in range(bands)]
+        self._signatures: Dict[Hashable, np.ndarray] = {}
+        self._groups: Dict[Hashable, Hashable] = {}
+
+    def signature(self, text: str) -> np.ndarray:
+        """MinHash signature of a text's character shingles"""
+        normalized = _NON_WORD.sub(' ', text.lower()).strip()
+        codes = np.frombuffer(normalized.encode('utf-32-le'), dtype=np.uint32).astype(np.uint64)
+        hashes = np.unique(self._shingle_hashes(codes))
+
+        with np.errstate(over='ignore'):
+            permuted = (self._a[:, None] * hashes[None, :] + self._b[:, None]) >> np.uint64(32)
+        return permuted.min(axis=1)
+
+    def _shingle_hashes(self, codes: np.ndarray) -> np.ndarray:
+        """Rolling hash of every shingle_size window of codepoints (the whole text if shorter)"""
+        count = max(len(codes) - self.shingle_size + 1, 1)
+        hashes = np.zeros(count, dtype=np.uint64)
+        with np.errstate(over='ignore'):
+            for offset in range(min(self.shingle_size, len(codes))):
+                hashes = hashes * _SHINGLE_BASE + codes[offset:offset + count]
+            hashes ^= hashes >> np.uint64(29)
+            return hashes * _MIX
+
+    def add(self, key: Hashable, text: str, signature: Optional[np.ndarray] = None) -> Hashable:
+        """
+        Index a text and assign it to a near-duplicate group
+
+        Args:
+            key: Key of the text
+            text: Text to index
+            signature: The text's signature, if already computed by an index with the same parameters
+
+        Returns:
+            Key of the group's first member (the key itself for a new group)
+        """
+        if signature is None:
+            signature = self.signature(text)
+        band_keys = [signature[band * self.rows:(band + 1) * self.rows].tobytes() for band in range(self.bands)]
+
+        # Candidates share at least one band; keep the most similar one
+        # (earliest on ties), comparing every candidate signature at once
+        candidates = {}
+        for band, band_key in enumerate(band_keys):
+            for candidate in self._buckets[band].get(band_key, ()):
+                candidates.setdefault(candidate, self._signatures[candidate])
+
+        best = None
+        if candidates:
+            keys = list(candidates)
+            similarity = (np.stack(list(candidates.values())) == signature).mean(axis=1)
+            order = np.argsort(-similarity, kind='stable')[0]
+            if similarity[order] >= self.threshold:
+                best = keys[order]
+
+        if best is not None:
+            self._groups[key] = self._groups[best]
+            return self._groups[key]
+
+        # Only group representatives are indexed, so buckets grow with the
+        # number of groups rather than the number of duplicates
+        self._signatures[key] = signature
+        self._groups[key] = key
+        for band, band_key in enumerate(band_keys):
+            bucket = self._buckets[band].get(band_key)
+            if bucket is None:
+                bucket = self._buckets[band][band_key] = deque(maxlen=self.bucket_size)
+            bucket.append(key)
+
+        return key
+
+    def group_of(self, key: Hashable) -> Optional[Hashable]:
+        """Group representative of an indexed key"""
+        return self._groups.get(key)
+
+    def __len__(self) -> int:
+        return len(self._groups)
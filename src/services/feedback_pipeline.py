@@ -0,0 +1,609 @@
+import copy
+import logging
+import math
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, BinaryIO, Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from src.agents.bug_analyzer_agent import BugAnalyzerAgent
+from src.agents.classifier_agent import FeedbackClassifierAgent
+from src.agents.csv_reader_agent import CSVReaderAgent
+from src.agents.extraction_engine import PATTERN_VERSION
+from src.agents.feature_extractor_agent import FeatureExtractorAgent
+from src.agents.feedback_ingest import FeedbackIngestor
+from src.agents.keyword_matcher import LEXICON_VERSION
+from src.agents.llm_classifier_agent import LLMClassifierAgent
+from src.agents.quality_critic_agent import QualityCriticAgent
+from src.agents.ticket_creator_agent import TicketCreatorAgent
+from src.models.feedback_record import FeedbackRecord, feedback_text
+from src.services.dedup_index import MinHashLSHIndex, has_shingles
+from src.services.memo_cache import MemoCache
+from src.services.ticket_ids import TicketIdAllocator
+
+logger = logging.getLogger(__name__)
+
+
+class PipelineStage:
+    """A named pipeline step that processes the items routed to it in place"""
+
+    def __init__(self, name: str, process: Callable[[List[Dict]], object],
+                 route: Optional[Callable[[Dict], bool]] = None):
+        """
+        Args:
+            name: Stage name used in timings
+            process: Callable that annotates a list of items in place
+            route: Predicate selecting the items this stage runs on (all items if omitted)
+        """
+        self.name = name
+        self.process = process
+        self.route = route
+
+
+class PipelineExecutor:
+    """Runs declared stages over batches of items, timing each stage"""
+
+    def __init__(self, stages: List[PipelineStage]):
+        self.stages = stages
+        self.timings: Dict[str, Dict] = {}
+
+    def record(self, name: str, items: int, seconds: float):
+        """Add work done outside the stages (e.g. reading) to the timings"""
+        timing = self.timings.setdefault(name, {'items': 0, 'seconds': 0.0})
+        timing['items'] += items
+        timing['seconds'] += seconds
+
+    def run(self, items: List[Dict], batch_size: Optional[int] = None) -> List[Dict]:
+        """Run every stage over the items, one batch at a time"""
+        size = batch_size or len(items) or 1
+        for start in range(0, len(items), size):
+            self.run_batch(items[start:start + size])
+        return items
+
+    def run_batch(self, batch: List[Dict]):
+        """Run every stage over one batch"""
+        for stage in self.stages:
+            routed = batch if stage.route is None else [item for item in batch if stage.route(item)]
+            if not routed:
+                continue
+
+            started = time.perf_counter()
+            stage.process(routed)
+            self.record(stage.name, len(routed), time.perf_counter() - started)
+
+
+def routes_to(*categories: str) -> Callable[[Dict], bool]:
+    """Route items of the given categories that were not collapsed into a duplicate group"""
+    return lambda item: item.get('category') in categories and 'duplicate_of' not in item
+
+
+class DuplicateGrouper:
+    """Pipeline stage state collapsing near-duplicate feedback within each category"""
+
+    def __init__(self, threshold: float):
+        self.threshold = threshold
+        self.collapsed = 0
+        self._indexes: Dict[str, MinHashLSHIndex] = {}
+        self._items: List[Dict] = []
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def group_batch(self, feedback_items: List[Dict], signatures: Optional[np.ndarray] = None):
+        """
+        Attach each item to the first earlier item it duplicates
+
+        Items without any letters or digits are never grouped: their empty
+        shingle sets would make them all duplicates of each other.
+
+        Args:
+            feedback_items: Classified items, in order
+            signatures: Precomputed MinHash signature of each item (one row per item), if any
+        """
+        for position, item in enumerate(feedback_items):
+            key = len(self._items)
+            self._items.append(item)
+            text = feedback_text(item)
+            if not has_shingles(text):
+                continue
+
+            category = item['category']
+            if category not in self._indexes:
+                self._indexes[category] = MinHashLSHIndex(threshold=self.threshold)
+
+            signature = signatures[position] if signatures is not None else None
+            representative = self._indexes[category].add(key, text, signature)
+            if representative == key:
+                continue
+
+            self._attach(self._items[representative], item)
+
+    def _attach(self, representative: Dict, item: Dict):
+        """Record a duplicate on its representative (and its ticket, if already created)"""
+        source_id = item.get('review_id') or item.get('email_id')
+        item['duplicate_of'] = representative.get('review_id') or representative.get('email_id')
+        representative.setdefault('duplicates', []).append(item)
+        representative['similar_requests'] = len(representative['duplicates'])
+        self.collapsed += 1
+
+        ticket = representative.get('ticket')
+        if ticket is not None:
+            ticket['similar_requests'] = representative['similar_requests']
+            ticket['member_source_ids'] += f", {source_id}"
+
+
+class PipelineRun:
+    """Counters and stage state of one pipeline run, merged chunk by chunk"""
+
+    def __init__(self, dedup_threshold: Optional[float], dedup_window: Optional[int] = None):
+        self.dedup_threshold = dedup_threshold
+        self.dedup_window = dedup_window
+        self.grouper = DuplicateGrouper(dedup_threshold) if dedup_threshold is not None else None
+
+        self.total_feedback = 0
+        self.tickets_created = 0
+        self.duplicates_collapsed = 0
+        self.category_counts: Dict[str, int] = {}
+        self.quality_review = {
+            'total_tickets': 0,
+            'approved': 0,
+            'rejected': 0,
+            'tickets_with_issues': [],
+            'average_quality_score': 0
+        }
+        self._total_quality_score = 0.0
+        self.stage_timings: Dict[str, Dict] = {}
+
+    def group_batch(self, feedback_items: List[Dict], signatures: Optional[np.ndarray] = None):
+        """Dedup stage: group near-duplicates with the current grouper"""
+        self.grouper.group_batch(feedback_items, signatures)
+
+    def next_chunk(self) -> bool:
+        """Start a new dedup window once the current one is full, returning whether it did"""
+        if self.grouper is not None and self.dedup_window and len(self.grouper) >= self.dedup_window:
+            self.duplicates_collapsed += self.grouper.collapsed
+            self.grouper = DuplicateGrouper(self.dedup_threshold)
+            return True
+        return False
+
+    def add_chunk(self, items: List[Dict], tickets: List[Dict]):
+        """Merge the counts of a processed chunk"""
+        self.total_feedback += len(items)
+        self.tickets_created += len(tickets)
+        for item in items:
+            self.category_counts[item['category']] = self.category_counts.get(item['category'], 0) + 1
+
+    def add_review(self, review: Dict):
+        """Merge a QualityCriticAgent batch summary"""
+        merged = self.quality_review
+        merged['total_tickets'] += review['total_tickets']
+        merged['approved'] += review['approved']
+        merged['rejected'] += review['rejected']
+        merged['tickets_with_issues'].extend(review['tickets_with_issues'])
+
+        self._total_quality_score += review['average_quality_score'] * review['total_tickets']
+        if merged['total_tickets']:
+            merged['average_quality_score'] = self._total_quality_score / merged['total_tickets']
+
+    def summary(self) -> Dict:
+        """Counters of the run so far"""
+        collapsed = self.duplicates_collapsed + (self.grouper.collapsed if self.grouper is not None else 0)
+        return {
+            'total_feedback': self.total_feedback,
+            'tickets_created': self.tickets_created,
+            'category_counts': dict(self.category_counts),
+            'duplicates_collapsed': collapsed,
+            'quality_review': self.quality_review
+        }
+
+
+class PipelineProcessPool:
+    """
+    Worker processes running the per-item pipeline stages over chunks of items
+
+    Workers are spawned on first use and reused across runs. Chunk sizes
+    adapt to the number of items and workers: several chunks per worker so
+    uneven chunks balance out, but no smaller than `min_chunk_size` so the
+    cost of shipping records between processes stays small next to the work.
+    """
+
+    def __init__(self, workers: int, min_chunk_size: int = 500, max_chunk_size: int = 5000,
+                 chunks_per_worker: int = 4):
+        """
+        Args:
+            workers: Worker processes
+            min_chunk_size: Fewest items per chunk (runs with fewer items stay in-process)
+            max_chunk_size: Most items per chunk
+            chunks_per_worker: Chunks to aim for per worker
+        """
+        self.workers = workers
+        self.min_chunk_size = min_chunk_size
+        self.max_chunk_size = max_chunk_size
+        self.chunks_per_worker = chunks_per_worker
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def chunk_size(self, items: int) -> int:
+        """Items per chunk for a run of `items` items"""
+        size = math.ceil(items / (self.workers * self.chunks_per_worker))
+        return max(self.min_chunk_size, min(self.max_chunk_size, size))
+
+    def map(self, function: Callable, jobs: List[Tuple]) -> List[Any]:
+        """Run `function(*job)` for every job in the workers, results in job order"""
+        executor = self._start()
+        futures = [executor.submit(function, *job) for job in jobs]
+        return [future.result() for future in futures]
+
+    def close(self):
+        """Stop the worker processes (they are started again on next use)"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown()
+
+    def _start(self) -> ProcessPoolExecutor:
+        """The worker pool, spawning it on first use"""
+        with self._lock:
+            if self._executor is None:
+                # Spawned rather than forked: the parent may be running server threads
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context('spawn'),
+                    initializer=_start_worker
+                )
+                logger.info(f"Started {self.workers} pipeline worker processes")
+            return self._executor
+
+
+class FeedbackPipeline:
+    """Staged pipeline over the feedback agents"""
+
+    def __init__(self, dedup_threshold: Optional[float] = None, batch_size: Optional[int] = None,
+                 dedup_window: Optional[int] = None, ingestor: Optional[FeedbackIngestor] = None,
+                 process_pool: Optional[PipelineProcessPool] = None, id_allocator: Optional[TicketIdAllocator] = None,
+                 classifier: Optional[Union[FeedbackClassifierAgent, LLMClassifierAgent]] = None,
+                 memo_cache: Optional[MemoCache] = None):
+        """
+        The pipeline applies the agents' rules, whose keyword hits are shared
+        by every later stage, so it does not use the service's column-wise
+        `classify_frame`. With a memo cache, each distinct text is instead
+        classified, analyzed and extracted once, across batches and runs.
+
+        Args:
+            dedup_threshold: Near-duplicate similarity threshold (no collapsing if None)
+            batch_size: Items per batch (a single batch if None)
+            dedup_window: Items after which streaming runs start a new dedup index
+            ingestor: CSV ingestion settings for the reader (defaults if None)
+            process_pool: Worker processes for chunks of items (everything runs in-process if None)
+            id_allocator: Durable source of ticket numbers (per-instance numbering if None)
+            classifier: Classification backend (keyword scoring if None); an LLM classifier
+                keeps every chunk in-process, since its requests already run concurrently
+            memo_cache: Cache of per-text stage results (everything is computed if None;
+                LLM classifications are never cached)
+        """
+        self.name = "Feedback Pipeline"
+        self.dedup_threshold = dedup_threshold
+        self.batch_size = batch_size
+        self.dedup_window = dedup_window
+        self.process_pool = process_pool
+        self.memo_cache = memo_cache
+
+        self.reader = CSVReaderAgent(ingestor)
+        self.classifier = classifier if classifier is not None else FeedbackClassifierAgent()
+        self.bug_analyzer = BugAnalyzerAgent()
+        self.feature_extractor = FeatureExtractorAgent()
+        self.ticket_creator = TicketCreatorAgent(id_allocator)
+        self.critic = QualityCriticAgent()
+        logger.info(f"{self.name} initialized")
+
+    def build_stages(self, run: PipelineRun) -> List[PipelineStage]:
+        """Declare the stages of one run"""
+        stages = [PipelineStage('classify', self._classify)]
+        if run.grouper is not None:
+            stages.append(PipelineStage('dedup', run.group_batch, lambda item: item['category'] != 'Spam'))
+
+        stages += [
+            PipelineStage('analyze_bug', self._analyze_bugs, routes_to('Bug')),
+            PipelineStage('extract_feature', self._extract_features, routes_to('Feature Request')),
+            PipelineStage('create_ticket', self._create_tickets,
+                          routes_to('Bug', 'Feature Request', 'Praise', 'Complaint')),
+            PipelineStage('review_quality', lambda batch: self._review_tickets(batch, run),
+                          lambda item: 'ticket' in item)
+        ]
+        return stages
+
+    def process_files(self, reviews_path: str, emails_path: str) -> Dict:
+        """
+        Read both feedback files and run them through the pipeline
+
+        Returns:
+            Dict with tickets, category counts, duplicates collapsed,
+            quality review summary, per-stage timings and rows read per source type
+        """
+        run = PipelineRun(self.dedup_threshold)
+        executor = PipelineExecutor(self.build_stages(run))
+
+        started = time.perf_counter()
+        items = self.reader.read_feedback_records(reviews_path, emails_path)
+        executor.record('read', len(items), time.perf_counter() - started)
+        rows = source_rows(items)
+
+        tickets = self._process_chunk(executor, run, items)
+        logger.info(f"{self.name} processed {len(items)} items into {len(tickets)} tickets")
+
+        return {'tickets': tickets, **run.summary(), 'stage_timings': executor.timings, 'source_rows': rows}
+
+    def iter_tickets(self, reviews_path: Union[str, BinaryIO], emails_path: Union[str, BinaryIO], chunksize: int,
+                     run: Optional[PipelineRun] = None) -> Iterator[List[Dict]]:
+        """
+        Stream both feedback files (paths or binary file objects) through the pipeline in chunks
+
+        Only one chunk of records is held at a time; near-duplicates are
+        collapsed within windows of `dedup_window` items.
+
+        Yields:
+            Tickets created from each chunk
+        """
+        chunks = self.reader.iter_feedback_records(reviews_path, emails_path, chunksize)
+        return self.iter_chunks(chunks, run)
+
+    def iter_chunks(self, chunks: Iterator[List[Dict]], run: Optional[PipelineRun] = None) -> Iterator[List[Dict]]:
+        """
+        Run chunks of records, read by the caller, through the pipeline
+
+        With dedup on, a ticket can still gain duplicates from later chunks of
+        its dedup window, so tickets are held until their window closes (or
+        the input ends) and only then yielded, complete. Items of the window
+        are kept by the dedup index anyway, so holding them adds no memory.
+
+        Yields:
+            After each chunk, the tickets that are final: the chunk's own
+            without dedup, else those of a just-closed window (often none)
+        """
+        run = run if run is not None else PipelineRun(self.dedup_threshold, self.dedup_window)
+        executor = PipelineExecutor(self.build_stages(run))
+        run.stage_timings = executor.timings
+        held: List[Dict] = []
+
+        while True:
+            started = time.perf_counter()
+            items = next(chunks, None)
+            if items is None:
+                break
+            executor.record('read', len(items), time.perf_counter() - started)
+
+            ready = []
+            if run.next_chunk():
+                ready, held = held, []
+            tickets = self._process_chunk(executor, run, items)
+            if run.grouper is None:
+                yield tickets
+            else:
+                held.extend(tickets)
+                yield ready
+
+        if held:
+            yield held
+        logger.info(f"{self.name} streamed {run.total_feedback} items into {run.tickets_created} tickets")
+
+    def _process_chunk(self, executor: PipelineExecutor, run: PipelineRun, items: List[Dict]) -> List[Dict]:
+        """Run one chunk of records through the stages and collect its tickets"""
+        parallel = self.process_pool is not None and not isinstance(self.classifier, LLMClassifierAgent)
+        if parallel and len(items) > self.process_pool.min_chunk_size:
+            tickets = self._process_parallel(executor, run, items)
+        else:
+            executor.run(items, self.batch_size)
+            tickets = [item['ticket'] for item in items if 'ticket' in item]
+        run.add_chunk(items, tickets)
+        return tickets
+
+    def _process_parallel(self, executor: PipelineExecutor, run: PipelineRun, items: List[Dict]) -> List[Dict]:
+        """
+        Run one chunk of records through the stages with the per-item work in worker processes
+
+        Workers classify sub-chunks of items; near-duplicates are grouped here,
+        in item order; workers then analyze, ticket and review the remaining
+        items. Each sub-chunk's ticket numbers start where the previous one's
+        end, so tickets are numbered exactly as a sequential run numbers them.
+        """
+        pool = self.process_pool
+        dedup = run.grouper is not None
+
+        signatures = []
+        chunks = _slices(items, pool.chunk_size(len(items)))
+        results = pool.map(_classify_chunk, [(chunk, dedup) for chunk in chunks])
+        for chunk, (labels, chunk_signatures, timings) in zip(chunks, results):
+            for item, (category, confidence) in zip(chunk, labels):
+                item['category'] = category
+                item['confidence'] = confidence
+            signatures.append(chunk_signatures)
+            _merge_timings(executor, timings)
+
+        if dedup:
+            started = time.perf_counter()
+            routed = [item for item in items if item['category'] != 'Spam']
+            run.group_batch(routed, np.concatenate(signatures))
+            executor.record('dedup', len(routed), time.perf_counter() - started)
+
+        route = routes_to('Bug', 'Feature Request', 'Praise', 'Complaint')
+        ticketed = [item for item in items if route(item)]
+        chunks = _slices(ticketed, pool.chunk_size(len(ticketed)))
+        jobs = []
+        if ticketed:
+            # Workers number their chunks from one range reserved up front
+            counter = self.ticket_creator.reserve_numbers(len(ticketed)) - 1
+            for chunk in chunks:
+                jobs.append(([_ticket_payload(item) for item in chunk], counter))
+                counter += len(chunk)
+
+        tickets = []
+        for chunk, (chunk_tickets, review, timings) in zip(chunks, pool.map(_ticket_chunk, jobs)):
+            for item, ticket in zip(chunk, chunk_tickets):
+                item['ticket'] = ticket
+            tickets.extend(chunk_tickets)
+            run.add_review(review)
+            _merge_timings(executor, timings)
+        return tickets
+
+    def _classify(self, feedback_items: List[Dict]):
+        """Classify stage, each distinct text and rating classified once with the keyword classifier"""
+        if isinstance(self.classifier, LLMClassifierAgent):
+            self.classifier.classify_batch(feedback_items)
+            return
+
+        self._memoized(feedback_items, self.classifier.classify_batch, ('category', 'confidence', 'keyword_hits'),
+                       lambda item: ('pipeline.classify', feedback_text(item),
+                                     rating_key(item.get('rating')), LEXICON_VERSION))
+
+    def _analyze_bugs(self, feedback_items: List[Dict]):
+        """Bug analysis stage, each distinct report analyzed once"""
+        self._memoized(feedback_items, self.bug_analyzer.analyze_batch, ('technical_analysis',),
+                       lambda item: ('pipeline.analyze_bug', feedback_text(item), item.get('platform', ''),
+                                     item.get('app_version', 'Unknown'), rating_key(item.get('rating')),
+                                     LEXICON_VERSION, PATTERN_VERSION))
+
+    def _extract_features(self, feedback_items: List[Dict]):
+        """Feature extraction stage, each distinct request extracted once"""
+        self._memoized(feedback_items, self.feature_extractor.extract_batch, ('feature_analysis',),
+                       lambda item: ('pipeline.extract_feature', feedback_text(item),
+                                     rating_key(item.get('rating', 3)), item.get('similar_requests', 0),
+                                     LEXICON_VERSION))
+
+    def _memoized(self, feedback_items: List[Dict], process: Callable[[List[Dict]], object],
+                  fields: Tuple[str, ...], key_parts: Callable[[Dict], Tuple]):
+        """
+        Run a batch stage only over items whose result is not in the memo cache
+
+        Items with a cached result get its `fields` copied in; of the rest,
+        the first item of each key is processed and its result shared with
+        the others of the same key.
+
+        Args:
+            feedback_items: Items routed to the stage
+            process: The stage's batch method, annotating items in place
+            fields: Item fields the stage sets
+            key_parts: Namespace, text and every other input the stage's result depends on
+        """
+        if self.memo_cache is None:
+            process(feedback_items)
+            return
+
+        pending: Dict[str, List[Dict]] = {}
+        for item in feedback_items:
+            key = self.memo_cache.make_key(*key_parts(item))
+            cached = self.memo_cache.get(key)
+            if cached is not None:
+                _restore_fields(item, cached)
+            else:
+                pending.setdefault(key, []).append(item)
+        if not pending:
+            return
+
+        process([group[0] for group in pending.values()])
+        for key, group in pending.items():
+            result = {field: group[0][field] for field in fields}
+            self.memo_cache.set(key, result)
+            for item in group[1:]:
+                _restore_fields(item, result)
+
+    def _create_tickets(self, feedback_items: List[Dict]):
+        """Create a ticket for each item and keep it on the item"""
+        for item in feedback_items:
+            item['ticket'] = self.ticket_creator.create_ticket(item)
+
+    def _review_tickets(self, feedback_items: List[Dict], run: PipelineRun):
+        """Review the tickets of a batch, merging the summary into the run"""
+        run.add_review(self.critic.review_batch([item['ticket'] for item in feedback_items]))
+
+
+# Pipeline of the current worker process (set by the pool initializer)
+_worker_pipeline: Optional[FeedbackPipeline] = None
+
+# Computes MinHash signatures with the hash family every DuplicateGrouper index uses
+_signature_index = MinHashLSHIndex()
+
+
+def _start_worker():
+    """Process pool initializer: build the agents and a memo cache once per worker"""
+    global _worker_pipeline
+    _worker_pipeline = FeedbackPipeline(memo_cache=MemoCache())
+
+
+def source_rows(records: List[FeedbackRecord]) -> Dict[str, Dict]:
+    """Rows read per source type ('review', 'email') and the source ID of the last one"""
+    rows = {source_type: {'rows': 0, 'last_source_id': None} for source_type in ('review', 'email')}
+    for record in records:
+        counts = rows[record.source_type]
+        counts['rows'] += 1
+        counts['last_source_id'] = record.source_id
+    return rows
+
+
+def rating_key(rating) -> Optional[float]:
+    """Normalize a rating for cache keys (None, NaN and numeric types compare equal)"""
+    if rating is None or pd.isna(rating):
+        return None
+    try:
+        return float(rating)
+    except (TypeError, ValueError):
+        return rating
+
+
+def _restore_fields(item: Dict, result: Dict):
+    """Copy a memoized stage result into an item (dicts copied, so items never share one)"""
+    for field, value in result.items():
+        item[field] = dict(value) if isinstance(value, dict) else value
+
+
+def _classify_chunk(items: List[Dict], dedup: bool) -> Tuple[List[Tuple[str, float]], Optional[np.ndarray], Dict]:
+    """Worker task: (category, confidence) of each item, signatures of the non-spam ones and the stage timings"""
+    executor = PipelineExecutor([PipelineStage('classify', _worker_pipeline._classify)])
+    executor.run(items)
+    labels = [(item['category'], item['confidence']) for item in items]
+
+    signatures = None
+    if dedup:
+        started = time.perf_counter()
+        texts = [feedback_text(item) for item in items if item['category'] != 'Spam']
+        signatures = np.array([_signature_index.signature(text) for text in texts], dtype=np.uint64)
+        signatures = signatures.reshape(len(texts), _signature_index.num_perm)
+        executor.record('dedup', 0, time.perf_counter() - started)
+    return labels, signatures, executor.timings
+
+
+def _ticket_chunk(items: List[Dict], ticket_counter: int) -> Tuple[List[Dict], Dict, Dict]:
+    """Worker task: analyze and ticket classified items numbered after `ticket_counter`"""
+    pipeline = _worker_pipeline
+    run = PipelineRun(None)
+    executor = PipelineExecutor([stage for stage in pipeline.build_stages(run) if stage.name != 'classify'])
+
+    pipeline.ticket_creator.ticket_counter = ticket_counter
+    executor.run(items)
+    return [item['ticket'] for item in items], run.quality_review, executor.timings
+
+
+def _ticket_payload(item: Dict) -> Dict:
+    """Item to send to a worker, its duplicates cut down to the source IDs a ticket lists"""
+    duplicates = item.get('duplicates')
+    if not duplicates:
+        return item
+
+    payload = copy.copy(item)
+    payload['duplicates'] = [
+        {'review_id': d['review_id']} if 'review_id' in d else {'email_id': d.get('email_id')} for d in duplicates
+    ]
+    return payload
+
+
+def _merge_timings(executor: PipelineExecutor, timings: Dict[str, Dict]):
+    """Add a worker's stage timings to the run's"""
+    for name, timing in timings.items():
+        executor.record(name, timing['items'], timing['seconds'])
+
+
+def _slices(items: List, size: int) -> List[List]:
+    """Consecutive slices of at most `size` items"""
+    return [items[start:start + size] for start in range(0, len(items), size)]
@@ -1,64 +1,183 @@
+import hashlib
 import logging
+import os
+import threading
+import numpy as np
 import pandas as pd
-from typing import Dict, List
+from typing import BinaryIO, Callable, Dict, Iterator, List, Optional, Tuple, Union
 from datetime import datetime
+from src.agents.feedback_ingest import FeedbackIngestor
+from src.agents.extraction_engine import PATTERN_VERSION, service_bug_extractor
+from src.agents.source_adapters import SourceSpec
+from src.agents.llm_classifier_agent import LLMClassifierAgent
+from src.agents.keyword_matcher import LEXICON_VERSION, LEXICONS, KeywordHits, keyword_matcher
+from src.config import settings
+from src.models.feedback_record import FeedbackRecord
+from src.services.dedup_index import MinHashLSHIndex, has_shingles
+from src.services.feedback_pipeline import FeedbackPipeline, PipelineProcessPool, PipelineRun, rating_key
+from src.services.job_manager import Job, JobManager
+from src.services.memo_cache import MemoCache
+from src.services.result_cache import ResultCache
+from src.services.single_flight import SingleFlight
+from src.services.ticket_export import CsvTicketWriter, iter_export_bytes, write_tickets
+from src.services.ticket_ids import TicketIdAllocator
+from src.services.ticket_store import TicketStore
 
 logger = logging.getLogger(__name__)
 
+# Codepoints `str.split()` treats as whitespace, and vowels for the gibberish check
+_WHITESPACE = np.array([c for c in range(0x3001) if chr(c).isspace()], dtype=np.uint32)
+_VOWELS = np.array([ord(c) for c in 'aeiouAEIOU'], dtype=np.uint32)
+
+# NUL padding after joined texts, so keyword lookahead never runs off the array
+_CODEPOINT_PADDING = max(len(kw) for keywords in LEXICONS.values() for kw in keywords)
+
+# Bytes before a watermark hashed to detect a rewritten file
+_WATERMARK_PREFIX_BYTES = 4096
+
+# Process-wide memo cache for classification and analysis results
+feedback_memo_cache = MemoCache(
+    max_entries=settings.memo_cache_max_entries,
+    ttl_seconds=settings.memo_cache_ttl_seconds,
+    max_bytes=int(settings.memo_cache_max_mb * 1024 * 1024)
+)
+
+# Process-wide cache of full pipeline results, keyed by input paths and revalidated by content digest
+feedback_result_cache = ResultCache(
+    ttl_seconds=settings.result_cache_ttl_seconds,
+    max_entries=settings.result_cache_max_entries
+)
+
+# Worker processes shared by every pipeline run (None runs the pipeline in-process)
+feedback_process_pool = PipelineProcessPool(
+    settings.pipeline_workers,
+    min_chunk_size=settings.pipeline_min_chunk_size,
+    max_chunk_size=settings.pipeline_max_chunk_size
+) if settings.pipeline_workers > 1 else None
+
+# Background feedback processing jobs
+feedback_job_manager = JobManager(
+    max_workers=settings.job_workers,
+    max_queued=settings.job_queue_size,
+    max_finished=settings.job_history_size
+)
+
+# Coalesces concurrent ticket store refreshes for the same inputs
+feedback_single_flight = SingleFlight()
+
+
+def create_ticket_store() -> TicketStore:
+    """Persistent, indexed store of the tickets generated from the default feedback files (TICKET_DB_PATH)"""
+    return TicketStore(settings.ticket_db_path)
+
+
+def create_ticket_id_allocator() -> TicketIdAllocator:
+    """Durable ticket numbering shared by every worker process and run (TICKET_ID_DB_PATH)"""
+    return TicketIdAllocator(settings.ticket_id_db_path, block_size=settings.ticket_id_block_size)
+
+
+def create_feedback_classifier() -> Optional[LLMClassifierAgent]:
+    """LLM classifier when FEEDBACK_CLASSIFIER=llm and an API key is set (None for keyword scoring)"""
+    if settings.feedback_classifier != 'llm':
+        return None
+    if not settings.openai_api_key:
+        logger.warning("FEEDBACK_CLASSIFIER=llm but OPENAI_API_KEY is not set; using keyword classification")
+        return None
+    return LLMClassifierAgent(
+        settings.openai_api_key,
+        settings.llm_classifier_model,
+        batch_size=settings.llm_classifier_batch_size,
+        max_concurrency=settings.llm_classifier_concurrency,
+        max_text_chars=settings.llm_classifier_max_text_chars,
+        timeout_seconds=settings.llm_timeout_seconds
+    )
+
 
 class FeedbackService:
     """Service for processing feedback through multi-agent pipeline"""
     
-    def __init__(self):
+    # Known features, matched in this order against the `service.feature.*` lexicons
+    FEATURES = [
+        'calendar integration', 'offline mode', 'dark mode',
+        'export functionality', 'widget support', 'biometric auth'
+    ]
+    
+    # Category order used for argmax ties (first category wins)
+    CATEGORIES = ['Bug', 'Feature Request', 'Praise', 'Complaint', 'Spam']
+    
+    # Lexicon backing each category score
+    CATEGORY_LEXICONS = {
+        'Bug': 'service.bug',
+        'Feature Request': 'service.feature',
+        'Praise': 'service.praise',
+        'Complaint': 'service.complaint',
+        'Spam': 'service.spam'
+    }
+    
+    # Metric counter updated for each category
+    CATEGORY_METRICS = {
+        'Bug': 'bugs',
+        'Feature Request': 'features',
+        'Praise': 'praise',
+        'Complaint': 'complaints',
+        'Spam': 'spam'
+    }
+    
+    def __init__(self, memo_cache: Optional[MemoCache] = None, id_allocator: Optional[TicketIdAllocator] = None):
         self.processing_log = []
         self.ticket_counter = 1000
+        self._counter_lock = threading.Lock()
+        self.memo_cache = memo_cache if memo_cache is not None else feedback_memo_cache
+        self.id_allocator = id_allocator
+        self.dedup_threshold = settings.dedup_threshold if settings.dedup_enabled else None
+        self.engine = settings.feedback_engine
+        self.ingestor = FeedbackIngestor(settings.csv_engine, settings.csv_memory_map)
+        self.pipeline = FeedbackPipeline(
+            self.dedup_threshold, settings.pipeline_batch_size or None, settings.dedup_window or None, self.ingestor,
+            feedback_process_pool, self.id_allocator, create_feedback_classifier(), self.memo_cache
+        )
     
-    def read_feedback(self, reviews_path: str, emails_path: str) -> Dict:
-        """Read feedback from CSV files"""
+    def read_feedback_frames(self, reviews_path: str, emails_path: str) -> Dict[str, pd.DataFrame]:
+        """Read feedback from CSV files as typed DataFrames of the used columns, both files at once"""
         try:
-            reviews_df = pd.read_csv(reviews_path)
-            emails_df = pd.read_csv(emails_path)
+            reviews_df, emails_df = self.ingestor.read_frames(reviews_path, emails_path)
             
-            reviews = reviews_df.to_dict('records')
-            emails = emails_df.to_dict('records')
-            
-            logger.info(f"Read {len(reviews)} reviews and {len(emails)} emails")
+            logger.info(f"Read {len(reviews_df)} reviews and {len(emails_df)} emails")
             return {
-                'reviews': reviews,
-                'emails': emails,
-                'total': len(reviews) + len(emails)
+                'reviews': reviews_df,
+                'emails': emails_df
             }
         except Exception as e:
             logger.error(f"Error reading feedback: {e}")
             raise
     
-    def classify_feedback(self, text: str, rating: int = None) -> Dict:
-        """Classify feedback into categories"""
-        text_lower = text.lower()
-        
-        # Bug detection
-        bug_keywords = ['crash', 'bug', 'error', 'broken', 'not working', 'issue', 
-                       'fail', 'freeze', 'slow', 'lag', 'data loss']
-        bug_score = sum(1 for kw in bug_keywords if kw in text_lower)
-        
-        # Feature request detection
-        feature_keywords = ['feature', 'request', 'add', 'would love', 'please add',
-                           'suggestion', 'improve', 'need', 'want', 'integration']
-        feature_score = sum(1 for kw in feature_keywords if kw in text_lower)
-        
-        # Praise detection
-        praise_keywords = ['love', 'amazing', 'great', 'excellent', 'perfect', 
-                          'best', 'awesome', 'fantastic', 'thank you']
-        praise_score = sum(1 for kw in praise_keywords if kw in text_lower)
+    def read_feedback(self, reviews_path: str, emails_path: str) -> Dict:
+        """Read feedback from CSV files"""
+        frames = self.read_feedback_frames(reviews_path, emails_path)
+        reviews = frames['reviews'].to_dict('records')
+        emails = frames['emails'].to_dict('records')
         
-        # Complaint detection
-        complaint_keywords = ['expensive', 'price', 'poor', 'bad', 'terrible',
-                             'disappointed', 'frustrating', 'customer service']
-        complaint_score = sum(1 for kw in complaint_keywords if kw in text_lower)
+        return {
+            'reviews': reviews,
+            'emails': emails,
+            'total': len(reviews) + len(emails)
+        }
+    
+    def classify_feedback(self, text: str, rating: int = None, hits: Optional[KeywordHits] = None) -> Dict:
+        """Classify feedback into categories"""
+        key = self.memo_cache.make_key('classify_feedback', text.strip().lower(), rating_key(rating), LEXICON_VERSION)
+        return self._memoized(key, lambda: self._classify_feedback(text, rating, hits))
+    
+    def _classify_feedback(self, text: str, rating: Optional[int], hits: Optional[KeywordHits]) -> Dict:
+        """Classify feedback into categories (uncached)"""
+        if hits is None:
+            hits = keyword_matcher.scan(text.lower())
         
-        # Spam detection
-        spam_keywords = ['buy', 'cheap', 'www.', 'http', 'click here', 'guaranteed']
-        spam_score = sum(1 for kw in spam_keywords if kw in text_lower)
+        bug_score = hits.count('service.bug')
+        feature_score = hits.count('service.feature')
+        praise_score = hits.count('service.praise')
+        complaint_score = hits.count('service.complaint')
+        spam_score = hits.count('service.spam')
         
         # Check for gibberish
         words = text.split()
@@ -81,34 +200,160 @@ class FeedbackService:
         
         return {'category': category, 'confidence': confidence}
     
-    def analyze_bug(self, feedback: Dict, text: str) -> Dict:
+    def classify_frame(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Classify every row of a feedback DataFrame with column operations
+        
+        Produces the same category and confidence as `classify_feedback`
+        applied to each row, without a Python loop over the rows.
+        
+        Returns:
+            DataFrame with `category` and `confidence` columns, aligned to df
+        """
+        text = self._frame_text(df)
+        if 'rating' in df.columns:
+            rating = pd.to_numeric(df['rating'], errors='coerce').to_numpy(dtype=float)
+        else:
+            rating = np.full(len(df), np.nan)
+        
+        # Classify each distinct (text, rating) pair once. Texts are grouped by their UTF-8 bytes:
+        # pandas hashes str objects only up to the first NUL, which would merge distinct texts
+        text_code = pd.factorize(text.str.encode('utf-8', 'surrogatepass'))[0]
+        group = pd.DataFrame({'text': text_code, 'rating': rating}).groupby(
+            ['text', 'rating'], sort=False, dropna=False
+        ).ngroup().to_numpy()
+        first = np.unique(group, return_index=True)[1]
+        category, confidence = self._classify_texts(text.iloc[first], rating[first])
+        
+        return pd.DataFrame({'category': category[group], 'confidence': confidence[group]}, index=df.index)
+    
+    def _classify_texts(self, text: pd.Series, rating: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Vectorized category and confidence for texts and their (possibly NaN) ratings"""
+        # Keyword scores: number of distinct lexicon keywords in each text
+        codes, starts, ends = self._join_codepoints(text.str.lower())
+        first_positions = {}
+        scores = np.zeros((len(text), len(self.CATEGORIES)))
+        for column, category in enumerate(self.CATEGORIES):
+            for keyword in LEXICONS[self.CATEGORY_LEXICONS[category]]:
+                scores[:, column] += self._keyword_rows(codes, starts, ends, keyword, first_positions)
+        
+        # Rating multipliers (missing or zero ratings are ignored)
+        rated = ~np.isnan(rating) & (rating != 0)
+        scores[:, 0] *= np.where(rated & (rating <= 2), 1.5, 1)
+        scores[:, 2] *= np.where(rated & (rating >= 4), 1.5, 1)
+        
+        # Argmax category and confidence
+        best = scores.argmax(axis=1)
+        category = np.array(self.CATEGORIES, dtype=object)[best]
+        confidence = np.minimum(scores[np.arange(len(text)), best] / 10, 1.0)
+        
+        # Gibberish check
+        gibberish = self._gibberish_rows(text)
+        category[gibberish] = 'Spam'
+        confidence[gibberish] = 0.9
+        
+        return category, confidence
+    
+    def _frame_text(self, df: pd.DataFrame) -> pd.Series:
+        """Feedback text column of a DataFrame (review text, falling back to email body)"""
+        text = pd.Series('', index=df.index, dtype=object)
+        if 'body' in df.columns:
+            text = df['body'].fillna('').astype(str)
+        if 'review_text' in df.columns:
+            review_text = df['review_text'].fillna('').astype(str)
+            text = review_text.where(review_text != '', text)
+        return text
+    
+    def _join_codepoints(self, text: pd.Series) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Join texts into one codepoint array, one separator between texts
+        
+        Texts may contain any character, the separator included, so callers
+        bound matches and words by the returned offsets, not the separator.
+        
+        Returns:
+            Tuple of (codepoints with padding, start offset of each text, end offset of each text)
+        """
+        lengths = text.str.len().to_numpy(dtype=np.int64)
+        starts = np.zeros(len(text), dtype=np.int64)
+        starts[1:] = np.cumsum(lengths[:-1] + 1)
+        
+        joined = '\0'.join(text.tolist()) + '\0' * _CODEPOINT_PADDING
+        codes = np.frombuffer(joined.encode('utf-32-le', 'surrogatepass'), dtype=np.uint32)
+        return codes, starts, starts + lengths
+    
+    def _keyword_rows(self, codes: np.ndarray, starts: np.ndarray, ends: np.ndarray, keyword: str,
+                      first_positions: Dict[str, np.ndarray]) -> np.ndarray:
+        """Boolean mask of the texts containing a keyword"""
+        pattern = np.frombuffer(keyword.encode('utf-32-le'), dtype=np.uint32)
+        
+        # Narrow first-character candidates (shared across keywords) one character at a time
+        if keyword[0] not in first_positions:
+            first_positions[keyword[0]] = np.flatnonzero(codes == pattern[0])
+        positions = first_positions[keyword[0]]
+        for offset in range(1, len(pattern)):
+            positions = positions[codes[positions + offset] == pattern[offset]]
+        
+        # Keep matches that end inside the text they start in
+        rows = np.searchsorted(starts, positions, side='right') - 1
+        rows = rows[positions + len(pattern) <= ends[rows]]
+        
+        found = np.zeros(len(starts), dtype=bool)
+        found[rows] = True
+        return found
+    
+    def _gibberish_rows(self, text: pd.Series) -> np.ndarray:
+        """Boolean mask of texts where under 30% of words are longer than 3 characters with a vowel"""
+        codes, starts, ends = self._join_codepoints(text)
+        
+        # Word characters: anything but whitespace and the separators between texts
+        in_word = ~np.isin(codes, _WHITESPACE)
+        in_word[ends] = False
+        in_word[len(codes) - _CODEPOINT_PADDING:] = False
+        word_start = in_word.copy()
+        word_start[1:] &= ~in_word[:-1]
+        
+        # Per-word length and vowel presence
+        word_id = np.cumsum(word_start)[in_word] - 1
+        word_length = np.bincount(word_id)
+        word_vowels = np.bincount(word_id, weights=np.isin(codes[in_word], _VOWELS))
+        meaningful = (word_length > 3) & (word_vowels > 0)
+        
+        # Aggregate words per text
+        word_row = np.searchsorted(starts, np.flatnonzero(word_start), side='right') - 1
+        words = np.bincount(word_row, minlength=len(starts))
+        meaningful_words = np.bincount(word_row, weights=meaningful, minlength=len(starts))
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return (words > 0) & (meaningful_words / words < 0.3)
+    
+    def analyze_bug(self, feedback: Dict, text: str, hits: Optional[KeywordHits] = None) -> Dict:
         """Extract technical details from bug report"""
-        import re
+        key = self.memo_cache.make_key(
+            'analyze_bug', text.strip(), feedback.get('platform', 'Unknown'), feedback.get('app_version', 'Unknown'),
+            LEXICON_VERSION, PATTERN_VERSION
+        )
+        return self._memoized(key, lambda: self._analyze_bug(feedback, text, hits))
+    
+    def _analyze_bug(self, feedback: Dict, text: str, hits: Optional[KeywordHits]) -> Dict:
+        """Extract technical details from bug report (uncached)"""
+        if hits is None:
+            hits = keyword_matcher.scan(text.lower())
         
         # Extract platform
         platform = feedback.get('platform', 'Unknown')
         if not platform or platform == 'Unknown':
-            if 'android' in text.lower():
+            if hits.any('service.platform.android'):
                 platform = 'Android'
-            elif 'ios' in text.lower() or 'iphone' in text.lower():
+            elif hits.any('service.platform.ios'):
                 platform = 'iOS'
         
         # Extract device
-        device_patterns = [
-            r'(iPhone \d+\s*Pro\s*Max|iPhone \d+\s*Pro|iPhone \d+)',
-            r'(Samsung Galaxy [A-Z]\d+)',
-            r'(Pixel \d+)',
-        ]
-        device = 'Unknown'
-        for pattern in device_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                device = match.group(1)
-                break
+        found = service_bug_extractor.extract(text)
+        device = found['device'][1] if 'device' in found else 'Unknown'
         
         # Assess severity
-        critical_keywords = ['data loss', 'deleted', 'lost', 'crash', 'won\'t open', 'can\'t login']
-        severity = 'Critical' if any(kw in text.lower() for kw in critical_keywords) else 'High'
+        severity = 'Critical' if hits.any('service.severity.critical') else 'High'
         
         return {
             'platform': platform,
@@ -117,38 +362,69 @@ class FeedbackService:
             'app_version': feedback.get('app_version', 'Unknown')
         }
     
-    def extract_feature(self, text: str) -> Dict:
+    def extract_feature(self, text: str, hits: Optional[KeywordHits] = None) -> Dict:
         """Extract feature request details"""
-        text_lower = text.lower()
+        key = self.memo_cache.make_key('extract_feature', text.strip().lower(), LEXICON_VERSION)
+        return self._memoized(key, lambda: self._extract_feature(text, hits))
+    
+    def _extract_feature(self, text: str, hits: Optional[KeywordHits]) -> Dict:
+        """Extract feature request details (uncached)"""
+        if hits is None:
+            hits = keyword_matcher.scan(text.lower())
         
         # Identify feature
-        feature_patterns = {
-            'calendar integration': ['calendar', 'google calendar', 'outlook'],
-            'offline mode': ['offline', 'without internet'],
-            'dark mode': ['dark mode', 'dark theme', 'night mode'],
-            'export functionality': ['export', 'pdf', 'csv'],
-            'widget support': ['widget', 'home screen'],
-            'biometric auth': ['biometric', 'face id', 'fingerprint'],
-        }
-        
         feature = 'Feature request'
-        for feat, keywords in feature_patterns.items():
-            if any(kw in text_lower for kw in keywords):
+        for feat in self.FEATURES:
+            if hits.any(f'service.feature.{feat}'):
                 feature = feat
                 break
         
         # Estimate demand
-        high_demand = ['really need', 'must have', 'essential', 'critical']
-        demand = 'High' if any(kw in text_lower for kw in high_demand) else 'Medium'
+        demand = 'High' if hits.any('service.demand.high') else 'Medium'
         
         return {
             'requested_feature': feature,
             'estimated_demand': demand
         }
     
-    def create_ticket(self, feedback: Dict, classification: Dict, analysis: Dict = None) -> Dict:
+    def _memoized(self, key: str, compute) -> Dict:
+        """Look up a result dict in the memo cache, computing it on a miss"""
+        return dict(self.memo_cache.get_or_compute(key, compute))
+    
+    def group_duplicates(self, items: List[Dict], categories: List[str]) -> List[List[int]]:
+        """
+        Group near-duplicate feedback within each category
+        
+        Returns:
+            Item indexes of each group in first-seen order, representative first
+        """
+        if self.dedup_threshold is None:
+            return [[i] for i in range(len(items))]
+        
+        indexes = {}
+        groups: Dict[int, List[int]] = {}
+        for i, (item, category) in enumerate(zip(items, categories)):
+            if category not in indexes:
+                indexes[category] = MinHashLSHIndex(threshold=self.dedup_threshold)
+            text = item.get('review_text') or item.get('body', '')
+            if not has_shingles(text):
+                # Texts without words would all share one empty shingle set
+                groups[i] = [i]
+                continue
+            representative = indexes[category].add(i, text)
+            groups.setdefault(representative, []).append(i)
+        
+        return list(groups.values())
+    
+    def create_ticket(self, feedback: Dict, classification: Dict, analysis: Dict = None,
+                      duplicates: Optional[List[Dict]] = None) -> Dict:
         """Create structured ticket"""
-        self.ticket_counter += 1
+        if self.id_allocator is not None:
+            number = self.id_allocator.next_id()
+        else:
+            with self._counter_lock:
+                self.ticket_counter += 1
+                number = self.ticket_counter
         
         source_type = 'review' if 'review_id' in feedback else 'email'
         source_id = feedback.get('review_id') or feedback.get('email_id')
@@ -190,6 +466,12 @@ class FeedbackService:
         else:
             description += f"\n**Source:** Support Email\n"
         
+        # List near-duplicate feedback collapsed into this ticket
+        duplicates = duplicates or []
+        member_source_ids = [source_id] + [d.get('review_id') or d.get('email_id') for d in duplicates]
+        if duplicates:
+            description += f"**Similar Reports:** {len(duplicates)} ({', '.join(map(str, member_source_ids[1:]))})\n"
+        
         # Determine priority
         if category == 'Bug':
             severity = analysis.get('severity', 'Medium') if analysis else 'Medium'
@@ -210,7 +492,7 @@ class FeedbackService:
         }
         
         return {
-            'ticket_id': f"TICK-{self.ticket_counter}",
+            'ticket_id': f"TICK-{number}",
             'source_id': source_id,
             'source_type': source_type,
             'category': category,
@@ -221,52 +503,347 @@ class FeedbackService:
             'assigned_to': team_mapping.get(category, 'Triage Team'),
             'tags': category.lower().replace(' ', '-'),
             'created_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-            'confidence': classification['confidence']
+            'confidence': classification['confidence'],
+            'similar_requests': len(duplicates),
+            'member_source_ids': ', '.join(map(str, member_source_ids))
         }
     
     def process_all_feedback(self, reviews_path: str, emails_path: str) -> Dict:
-        """Process all feedback through pipeline"""
+        """Process all feedback through the configured engine"""
+        if self.engine == 'inline':
+            return self.process_inline(reviews_path, emails_path)
+        return self.process_with_agents(reviews_path, emails_path)
+    
+    def process_with_agents(self, reviews_path: str, emails_path: str) -> Dict:
+        """Process all feedback through the staged agent pipeline"""
+        start_time = datetime.now()
+        
+        result = self.pipeline.process_files(reviews_path, emails_path)
+        metrics = self._pipeline_metrics(result, start_time)
+        
+        logger.info(f"Processed {metrics['total_feedback']} feedback items, "
+                    f"created {metrics['tickets_created']} tickets")
+        
+        return {
+            'tickets': result['tickets'],
+            'metrics': metrics,
+            'quality_review': result['quality_review'],
+            'stage_timings': result['stage_timings'],
+            'source_rows': result['source_rows']
+        }
+    
+    def stream_feedback(self, reviews_path: Union[str, BinaryIO], emails_path: Union[str, BinaryIO],
+                        sink: Callable[[List[Dict]], None], chunksize: Optional[int] = None,
+                        progress: Optional[Callable[[Dict], None]] = None) -> Dict:
+        """
+        Process feedback in chunks, handing each chunk's tickets to a sink
+        
+        Memory stays bounded by the chunk size instead of the file size.
+        
+        Args:
+            reviews_path, emails_path: CSV paths or binary file objects
+            sink: Called after every chunk with the tickets that are final (with dedup on,
+                a window's tickets arrive together once no later duplicate can join them)
+            chunksize: CSV rows per chunk (STREAM_CHUNK_SIZE if omitted)
+            progress: Called with the run's counters after every chunk
+        
+        Returns:
+            Dict with metrics, quality review and stage timings (no tickets)
+        """
+        start_time = datetime.now()
+        
+        run = PipelineRun(self.dedup_threshold, self.pipeline.dedup_window)
+        for tickets in self.iter_ticket_chunks(reviews_path, emails_path, run, chunksize):
+            sink(tickets)
+            if progress is not None:
+                progress(run.summary())
+        
+        return self._stream_result(run, start_time)
+    
+    def stream_sources(self, sources: List[SourceSpec], sink: Callable[[List[Dict]], None],
+                       chunksize: Optional[int] = None, progress: Optional[Callable[[Dict], None]] = None) -> Dict:
+        """
+        Process feedback from declared sources (CSV, JSON Lines or Parquet) in chunks, handing tickets to a sink
+        
+        Returns:
+            Dict with metrics, quality review and stage timings (no tickets)
+        """
+        start_time = datetime.now()
+        
+        run = PipelineRun(self.dedup_threshold, self.pipeline.dedup_window)
+        chunks = self.pipeline.reader.iter_sources(sources, chunksize or settings.stream_chunk_size)
+        for tickets in self.pipeline.iter_chunks(chunks, run):
+            sink(tickets)
+            if progress is not None:
+                progress(run.summary())
+        
+        return self._stream_result(run, start_time)
+    
+    def run_feedback_job(self, job: Job, reviews_path: Optional[str] = None, emails_path: Optional[str] = None,
+                         sources: Optional[List[SourceSpec]] = None) -> Dict:
+        """
+        Body of a background job: stream the feedback files (or declared sources), reporting progress per chunk
+        
+        Raises:
+            JobCancelled: At the first chunk boundary after the job was cancelled
+        """
+        job.check_cancelled()
+        
+        def progress(summary: Dict):
+            job.report(
+                items_processed=summary['total_feedback'],
+                tickets_created=summary['tickets_created'],
+                duplicates_collapsed=summary['duplicates_collapsed']
+            )
+        
+        tickets = []
+        if sources is not None:
+            result = self.stream_sources(sources, tickets.extend, progress=progress)
+        else:
+            result = self.stream_feedback(reviews_path, emails_path, tickets.extend, progress=progress)
+        return {'tickets': tickets, **result}
+    
+    def export_stream(self, reviews_path: str, emails_path: str, output_path: str, format: str = 'csv',
+                      chunksize: Optional[int] = None) -> Dict:
+        """
+        Stream feedback through the pipeline, writing each chunk's tickets to a file as it is created
+        
+        Returns:
+            Dict with ticket count, metrics, quality review and stage timings
+        """
+        start_time = datetime.now()
+        
+        run = PipelineRun(self.dedup_threshold, self.pipeline.dedup_window)
+        with open(output_path, 'wb') as f:
+            count = write_tickets(self.iter_ticket_chunks(reviews_path, emails_path, run, chunksize), f, format)
+        
+        return {'ticket_count': count, **self._stream_result(run, start_time)}
+    
+    def iter_export(self, reviews_path: str, emails_path: str, format: str = 'csv',
+                    tickets: Optional[List[Dict]] = None, chunksize: Optional[int] = None) -> Iterator[bytes]:
+        """
+        Encoded export of the given tickets, or of the tickets streamed from the feedback files
+        
+        Yields:
+            Bytes of the export as each chunk of tickets is encoded
+        """
+        if tickets is not None:
+            chunks = _chunked(tickets, chunksize or settings.stream_chunk_size)
+        else:
+            run = PipelineRun(self.dedup_threshold, self.pipeline.dedup_window)
+            chunks = self.iter_ticket_chunks(reviews_path, emails_path, run, chunksize)
+        return iter_export_bytes(chunks, format)
+    
+    def iter_ticket_chunks(self, reviews_path: Union[str, BinaryIO], emails_path: Union[str, BinaryIO],
+                           run: PipelineRun, chunksize: Optional[int] = None) -> Iterator[List[Dict]]:
+        """Tickets of each chunk of the feedback files, counted into `run`"""
+        return self.pipeline.iter_tickets(reviews_path, emails_path, chunksize or settings.stream_chunk_size, run)
+    
+    def _stream_result(self, run: PipelineRun, start_time: datetime) -> Dict:
+        """Metrics, quality review and stage timings of a finished streaming run"""
+        summary = run.summary()
+        metrics = self._pipeline_metrics(summary, start_time)
+        
+        logger.info(f"Streamed {metrics['total_feedback']} feedback items, "
+                    f"created {metrics['tickets_created']} tickets")
+        
+        return {
+            'metrics': metrics,
+            'quality_review': summary['quality_review'],
+            'stage_timings': run.stage_timings
+        }
+    
+    def process_incremental(self, reviews_path: str, emails_path: str, store: TicketStore,
+                            sink: Optional[Callable[[List[Dict]], None]] = None,
+                            chunksize: Optional[int] = None, input_digest: Optional[str] = None) -> Dict:
+        """
+        Process only the rows appended to the feedback files since the last incremental run
+        
+        Each file's watermark (byte offset, row count and last review/email ID)
+        is kept in the ticket store. Rows past it are read, classified and
+        ticketed, and the new tickets and advanced watermarks are committed
+        together. Ticket numbers continue from the previous run; a row that
+        already has a stored ticket (same source type and ID) updates it in
+        place. Near-duplicates are only collapsed among the new rows.
+        
+        Args:
+            reviews_path, emails_path: Append-only feedback CSV files
+            store: Ticket store holding the watermarks and receiving the new tickets
+            sink: Called with the new tickets once they are committed
+            chunksize: CSV rows per chunk (STREAM_CHUNK_SIZE if omitted)
+            input_digest: Digest of the inputs, recorded so readers know the store is current
+        
+        Returns:
+            Dict with metrics, per-file watermarks, quality review and stage timings
+        
+        Raises:
+            ValueError: If a file shrank or its already-processed part was rewritten
+        """
+        start_time = datetime.now()
+        reader = self.pipeline.reader
+        
+        sources = {}
+        for path, source_type in ((reviews_path, 'review'), (emails_path, 'email')):
+            key = os.path.abspath(path)
+            previous = store.watermark(key)
+            start = self._check_watermark(path, previous)
+            end = reader.complete_rows_end(path, start)
+            sources[key] = {
+                'path': path,
+                'source_type': source_type,
+                'start': start,
+                'end': end,
+                'watermark': {
+                    'byte_offset': end,
+                    'rows': previous['rows'] if previous else 0,
+                    'last_source_id': previous['last_source_id'] if previous else None,
+                    'prefix_digest': _prefix_digest(path, end)
+                }
+            }
+        
+        def chunks():
+            for source in sources.values():
+                watermark = source['watermark']
+                for records in reader.iter_records_between(
+                    source['path'], source['source_type'], source['start'], source['end'],
+                    chunksize or settings.stream_chunk_size
+                ):
+                    watermark['rows'] += len(records)
+                    if records:
+                        watermark['last_source_id'] = records[-1].source_id
+                    yield records
+        
+        tickets = []
+        run = PipelineRun(self.dedup_threshold, self.pipeline.dedup_window)
+        for chunk_tickets in self.pipeline.iter_chunks(chunks(), run):
+            tickets.extend(chunk_tickets)
+        
+        watermarks = {key: source['watermark'] for key, source in sources.items()}
+        store.commit_increment(tickets, watermarks, input_digest)
+        if sink is not None:
+            sink(tickets)
+        
+        summary = run.summary()
+        metrics = self._pipeline_metrics(summary, start_time)
+        
+        logger.info(f"Incremental run processed {metrics['total_feedback']} new feedback items, "
+                    f"created {metrics['tickets_created']} tickets")
+        
+        return {
+            'metrics': metrics,
+            'watermarks': {source['path']: source['watermark'] for source in sources.values()},
+            'quality_review': summary['quality_review'],
+            'stage_timings': run.stage_timings
+        }
+    
+    def file_watermarks(self, reviews_path: str, emails_path: str, read_rows: Dict[str, Dict]) -> Dict[str, Dict]:
+        """
+        Watermarks at the end of each feedback file's complete rows
+        
+        Recorded with tickets generated from the whole files, so the next
+        incremental run only reads rows appended after them. Row counts and
+        last source IDs come from the run that produced the tickets, so the
+        files are only scanned for their last record boundary, not parsed.
+        
+        Args:
+            reviews_path, emails_path: Feedback files the tickets were generated from
+            read_rows: The run's `source_rows` (rows and last source ID per source type)
+        
+        Returns:
+            Absolute file path -> watermark (byte_offset, rows, last_source_id, prefix_digest)
+        """
+        reader = self.pipeline.reader
+        watermarks = {}
+        for path, source_type in ((reviews_path, 'review'), (emails_path, 'email')):
+            end = reader.complete_rows_end(path)
+            watermarks[os.path.abspath(path)] = {
+                'byte_offset': end,
+                'rows': read_rows[source_type]['rows'],
+                'last_source_id': read_rows[source_type]['last_source_id'],
+                'prefix_digest': _prefix_digest(path, end)
+            }
+        return watermarks
+    
+    def _check_watermark(self, path: str, watermark: Optional[Dict]) -> int:
+        """Offset to resume reading a file from, after checking it only grew since the watermark"""
+        if watermark is None:
+            return 0
+        
+        offset = watermark['byte_offset']
+        if os.path.getsize(path) < offset or _prefix_digest(path, offset) != watermark['prefix_digest']:
+            raise ValueError(
+                f"{path} was truncated or rewritten since the last incremental run; "
+                f"reset the watermarks to reprocess it"
+            )
+        return offset
+    
+    def _pipeline_metrics(self, result: Dict, start_time: datetime) -> Dict:
+        """Build run metrics from pipeline counters"""
+        review = result['quality_review']
+        metrics = {
+            'total_feedback': result['total_feedback'],
+            'bugs': 0,
+            'features': 0,
+            'praise': 0,
+            'complaints': 0,
+            'spam': 0,
+            'duplicates_collapsed': result['duplicates_collapsed'],
+            'tickets_created': result['tickets_created'],
+            'tickets_approved': review['approved'],
+            'average_quality_score': review['average_quality_score']
+        }
+        for category, count in result['category_counts'].items():
+            metrics[self.CATEGORY_METRICS[category]] += count
+        metrics['processing_time'] = (datetime.now() - start_time).total_seconds()
+        return metrics
+    
+    def process_inline(self, reviews_path: str, emails_path: str) -> Dict:
+        """Process all feedback with the service's own classification and analysis"""
         start_time = datetime.now()
         
         # Read feedback
-        feedback_data = self.read_feedback(reviews_path, emails_path)
-        all_feedback = feedback_data['reviews'] + feedback_data['emails']
+        frames = self.read_feedback_frames(reviews_path, emails_path)
         
         # Process each item
         tickets = []
         metrics = {
-            'total_feedback': len(all_feedback),
+            'total_feedback': sum(len(df) for df in frames.values()),
             'bugs': 0,
             'features': 0,
             'praise': 0,
             'complaints': 0,
             'spam': 0,
+            'duplicates_collapsed': 0,
             'tickets_created': 0
         }
         
-        for item in all_feedback:
-            text = item.get('review_text') or item.get('body', '')
-            rating = item.get('rating')
+        items = []
+        classifications = []
+        read_rows = {}
+        for df, source_type in ((frames['reviews'], 'review'), (frames['emails'], 'email')):
+            last = FeedbackRecord.from_frame(df.tail(1), source_type)
+            read_rows[source_type] = {'rows': len(df), 'last_source_id': last[0].source_id if last else None}
             
-            # Classify
-            classification = self.classify_feedback(text, rating)
-            category = classification['category']
+            # Classify the whole frame at once
+            classified = self.classify_frame(df)
             
             # Update metrics
-            if category == 'Bug':
-                metrics['bugs'] += 1
-            elif category == 'Feature Request':
-                metrics['features'] += 1
-            elif category == 'Praise':
-                metrics['praise'] += 1
-            elif category == 'Complaint':
-                metrics['complaints'] += 1
-            elif category == 'Spam':
-                metrics['spam'] += 1
+            for category, count in classified['category'].value_counts().items():
+                metrics[self.CATEGORY_METRICS[category]] += int(count)
             
             # Skip spam
-            if category == 'Spam':
-                continue
+            keep = (classified['category'] != 'Spam').to_numpy()
+            items.extend(FeedbackRecord.from_frame(df[keep], source_type))
+            classifications.extend(classified[keep].to_dict('records'))
+        
+        # One ticket per group of near-duplicate feedback
+        groups = self.group_duplicates(items, [c['category'] for c in classifications])
+        metrics['duplicates_collapsed'] = len(items) - len(groups)
+        
+        for members in groups:
+            item, classification = items[members[0]], classifications[members[0]]
+            text = item.get('review_text') or item.get('body', '')
+            category = classification['category']
             
             # Analyze based on category
             analysis = None
@@ -276,21 +853,65 @@ class FeedbackService:
                 analysis = self.extract_feature(text)
             
             # Create ticket
-            ticket = self.create_ticket(item, classification, analysis)
+            duplicates = [items[i] for i in members[1:]]
+            ticket = self.create_ticket(item, classification, analysis, duplicates)
             tickets.append(ticket)
         
         metrics['tickets_created'] = len(tickets)
         metrics['processing_time'] = (datetime.now() - start_time).total_seconds()
         
-        logger.info(f"Processed {len(all_feedback)} feedback items, created {len(tickets)} tickets")
+        logger.info(f"Processed {metrics['total_feedback']} feedback items, created {len(tickets)} tickets")
         
         return {
             'tickets': tickets,
-            'metrics': metrics
+            'metrics': metrics,
+            'source_rows': read_rows
         }
     
-    def save_tickets(self, tickets: List[Dict], output_path: str):
-        """Save tickets to CSV"""
-        df = pd.DataFrame(tickets)
-        df.to_csv(output_path, index=False)
-        logger.info(f"Saved {len(tickets)} tickets to {output_path}")
+    def save_tickets(self, tickets: List[Dict], output_path: str, format: str = 'csv') -> int:
+        """Save tickets to a CSV, NDJSON or Parquet file, written chunk by chunk"""
+        with open(output_path, 'wb') as f:
+            count = write_tickets(_chunked(tickets, settings.stream_chunk_size), f, format)
+        logger.info(f"Saved {count} tickets to {output_path}")
+        return count
+
+
+class CsvTicketSink:
+    """Ticket sink appending each chunk to a CSV file, header written once"""
+    
+    def __init__(self, output_path: str, append: bool = False):
+        """
+        Args:
+            output_path: CSV file to write
+            append: Keep an existing file's tickets and add to them instead of overwriting it
+        """
+        self.output_path = output_path
+        self.append = append
+        self.ticket_count = 0
+    
+    def __call__(self, tickets: List[Dict]):
+        if not tickets:
+            return
+        
+        existing = self.ticket_count or (
+            self.append and os.path.exists(self.output_path) and os.path.getsize(self.output_path) > 0
+        )
+        with open(self.output_path, 'ab' if existing else 'wb') as f:
+            writer = CsvTicketWriter(f, header=not existing)
+            writer.write(tickets)
+            writer.close()
+        self.ticket_count += len(tickets)
+
+
+def _chunked(items: List[Dict], size: int) -> Iterator[List[Dict]]:
+    """Consecutive slices of at most `size` items"""
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _prefix_digest(path: str, offset: int) -> str:
+    """Digest of the bytes just before an offset, to tell an appended file from a rewritten one"""
+    with open(path, 'rb') as f:
+        start = max(offset - _WATERMARK_PREFIX_BYTES, 0)
+        f.seek(start)
+        return hashlib.blake2b(f.read(offset - start), digest_size=16).hexdigest()
@@ -0,0 +1,208 @@
+import logging
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Statuses a job can end in
+FINISHED_STATUSES = ('succeeded', 'failed', 'cancelled')
+
+
+class JobQueueFull(Exception):
+    """Raised when a job is submitted while every worker is busy and the queue is full"""
+
+
+class JobCancelled(Exception):
+    """Raised inside a running job once its cancellation has been requested"""
+
+
+class Job:
+    """One background run: its status, progress and, once finished, its result or error"""
+
+    def __init__(self, kind: str):
+        self.job_id = uuid.uuid4().hex
+        self.kind = kind
+        self.status = 'queued'
+        self.created_at = datetime.now()
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+        self.progress: Dict[str, Any] = {}
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self._cancel_requested = threading.Event()
+        self._future: Optional[Future] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED_STATUSES
+
+    @property
+    def cancel_requested(self) -> bool:
+        return self._cancel_requested.is_set()
+
+    def report(self, **progress: Any):
+        """Record progress from inside the job, stopping it there if it was cancelled"""
+        self.progress.update(progress)
+        self.check_cancelled()
+
+    def check_cancelled(self):
+        """
+        Stop a running job whose cancellation was requested
+
+        Raises:
+            JobCancelled: If the job was cancelled
+        """
+        if self._cancel_requested.is_set():
+            raise JobCancelled(f"Job {self.job_id} was cancelled")
+
+    def to_dict(self) -> Dict:
+        """Status, timing, progress and (once succeeded) metrics of the job"""
+        metrics = self.result.get('metrics') if self.status == 'succeeded' and isinstance(self.result, dict) else None
+        return {
+            'job_id': self.job_id,
+            'kind': self.kind,
+            'status': self.status,
+            'cancel_requested': self.cancel_requested,
+            'created_at': _timestamp(self.created_at),
+            'started_at': _timestamp(self.started_at),
+            'finished_at': _timestamp(self.finished_at),
+            'progress': dict(self.progress),
+            'metrics': metrics,
+            'error': self.error
+        }
+
+
+class JobManager:
+    """
+    Runs submitted jobs on a bounded pool of worker threads
+
+    At most `max_workers` jobs run at once and `max_queued` more wait;
+    submissions beyond that are rejected rather than queued without bound.
+    Queued jobs can be cancelled outright; running jobs stop at their next
+    `Job.report` or `Job.check_cancelled`. The most recent `max_finished`
+    finished jobs are kept for status and result lookups.
+    """
+
+    def __init__(self, max_workers: int = 2, max_queued: int = 16, max_finished: int = 100):
+        self.max_workers = max_workers
+        self.max_queued = max_queued
+        self.max_finished = max_finished
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(self, kind: str, function: Callable[[Job], Any]) -> Job:
+        """
+        Queue `function(job)` to run on a worker
+
+        Raises:
+            JobQueueFull: If max_workers jobs are running and max_queued are waiting
+        """
+        with self._lock:
+            active = sum(1 for job in self._jobs.values() if not job.finished)
+            if active >= self.max_workers + self.max_queued:
+                raise JobQueueFull(
+                    f"{active} jobs are already queued or running (limit {self.max_workers + self.max_queued})"
+                )
+
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="feedback-job")
+
+            job = Job(kind)
+            self._jobs[job.job_id] = job
+            job._future = self._executor.submit(self._run, job, function)
+
+        logger.info(f"Queued {kind} job {job.job_id}")
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """Job by ID, if it is known"""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        """
+        Cancel a queued job, or ask a running one to stop
+
+        Returns:
+            The job, or None if it is unknown
+
+        Raises:
+            ValueError: If the job has already finished
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            if job.finished:
+                raise ValueError(f"Job {job_id} has already {job.status}")
+
+            job._cancel_requested.set()
+            if job.status == 'queued':
+                job._future.cancel()
+                self._finish(job, 'cancelled')
+
+        logger.info(f"Cancellation requested for job {job_id}")
+        return job
+
+    def stats(self) -> Dict:
+        """Job counts by status and the pool limits"""
+        with self._lock:
+            counts = {status: 0 for status in ('queued', 'running') + FINISHED_STATUSES}
+            for job in self._jobs.values():
+                counts[job.status] += 1
+        return {**counts, 'max_workers': self.max_workers, 'max_queued': self.max_queued}
+
+    def shutdown(self):
+        """Cancel queued jobs, ask running ones to stop and wait for them (workers restart on the next submit)"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+            for job in self._jobs.values():
+                if not job.finished:
+                    job._cancel_requested.set()
+                    if job.status == 'queued':
+                        job._future.cancel()
+                        self._finish(job, 'cancelled')
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    def _run(self, job: Job, function: Callable[[Job], Any]):
+        """Run a job on a worker thread, recording its outcome"""
+        with self._lock:
+            if job.status != 'queued':
+                return
+            job.status = 'running'
+            job.started_at = datetime.now()
+
+        try:
+            result = function(job)
+        except JobCancelled:
+            logger.info(f"Job {job.job_id} cancelled")
+            status, result, error = 'cancelled', None, None
+        except Exception as e:
+            logger.error(f"Job {job.job_id} failed: {e}")
+            status, result, error = 'failed', None, str(e)
+        else:
+            status, error = 'succeeded', None
+
+        with self._lock:
+            job.result = result
+            job.error = error
+            self._finish(job, status)
+
+    def _finish(self, job: Job, status: str):
+        """Mark a job finished and forget the oldest finished jobs over the limit (lock held)"""
+        job.status = status
+        job.finished_at = datetime.now()
+
+        finished = [job_id for job_id, known in self._jobs.items() if known.finished]
+        for job_id in finished[:max(len(finished) - self.max_finished, 0)]:
+            del self._jobs[job_id]
+
+
+def _timestamp(moment: Optional[datetime]) -> Optional[str]:
+    return moment.strftime('%Y-%m-%d %H:%M:%S') if moment is not None else None
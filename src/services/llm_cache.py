@@ -0,0 +1,152 @@
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional
+
+from src.services.memo_cache import MemoCache
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS llm_responses (
+    key TEXT PRIMARY KEY,
+    response TEXT NOT NULL,
+    expires_at REAL,
+    stored_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_llm_responses_stored_at ON llm_responses (stored_at);
+"""
+
+
+class LLMResponseCache:
+    """
+    Cache of LLM responses keyed by model and normalized messages
+
+    An in-memory LRU tier with TTL and entry/size limits sits in front of an
+    optional SQLite tier that survives restarts. Disk hits are promoted to
+    memory. Disk lookups and writes run off the event loop.
+    """
+
+    def __init__(self, max_entries: int = 1000, ttl_seconds: Optional[float] = 3600,
+                 max_bytes: int = 16 * 1024 * 1024, db_path: Optional[str] = None, max_disk_entries: int = 10000):
+        """
+        Args:
+            max_entries: Responses kept in memory
+            ttl_seconds: Lifetime of a cached response in both tiers (no expiry if None)
+            max_bytes: Approximate memory budget of the in-memory tier
+            db_path: SQLite file of the on-disk tier (memory only if None)
+            max_disk_entries: Responses kept on disk, oldest evicted first
+        """
+        self.memory = MemoCache(max_entries=max_entries, ttl_seconds=ttl_seconds, max_bytes=max_bytes)
+        self.ttl_seconds = ttl_seconds
+        self.db_path = db_path
+        self.max_disk_entries = max_disk_entries
+        self._connection: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+        self.disk_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(model: str, messages: List[Dict[str, str]]) -> str:
+        """Key from the model name and the messages with whitespace runs collapsed"""
+        normalized = [(message['role'], ' '.join(message['content'].split())) for message in messages]
+        return MemoCache.make_key('llm.chat', json.dumps(normalized, ensure_ascii=False), model)
+
+    async def get(self, key: str) -> Optional[str]:
+        """Cached response for a key, from memory or else disk"""
+        response = self.memory.get(key)
+        if response is not None:
+            return response
+
+        if self.db_path is not None:
+            response = await asyncio.to_thread(self._disk_get, key)
+            if response is not None:
+                with self._lock:
+                    self.disk_hits += 1
+                self.memory.set(key, response)
+                return response
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    async def set(self, key: str, response: str):
+        """Store a response in memory and, if enabled, on disk"""
+        self.memory.set(key, response)
+        if self.db_path is not None:
+            await asyncio.to_thread(self._disk_set, key, response)
+
+    def stats(self) -> Dict:
+        """Hit counters per tier and overall hit rate"""
+        memory = self.memory.stats()
+        with self._lock:
+            hits = memory['hits'] + self.disk_hits
+            lookups = hits + self.misses
+            return {
+                'entries': memory['entries'],
+                'bytes': memory['bytes'],
+                'memory_hits': memory['hits'],
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'evictions': memory['evictions'],
+                'expirations': memory['expirations'],
+                'hit_rate': hits / lookups if lookups else 0.0,
+                'disk_enabled': self.db_path is not None
+            }
+
+    def close(self):
+        """Close the on-disk tier (reopened on the next lookup)"""
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the database and create the schema on first use (lock held)"""
+        if self._connection is None:
+            directory = os.path.dirname(self.db_path)
+            if directory and self.db_path != ':memory:':
+                os.makedirs(directory, exist_ok=True)
+
+            connection = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None, timeout=30)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.executescript(_SCHEMA)
+            self._connection = connection
+        return self._connection
+
+    def _disk_get(self, key: str) -> Optional[str]:
+        """Unexpired response stored on disk"""
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT response FROM llm_responses WHERE key = ? AND (expires_at IS NULL OR expires_at > ?)",
+                (key, time.time())
+            ).fetchone()
+        return row[0] if row is not None else None
+
+    def _disk_set(self, key: str, response: str):
+        """Store a response on disk, dropping expired entries and the oldest over the limit"""
+        now = time.time()
+        expires_at = now + self.ttl_seconds if self.ttl_seconds else None
+        with self._lock:
+            connection = self._connect()
+            connection.execute("BEGIN")
+            try:
+                connection.execute(
+                    "INSERT OR REPLACE INTO llm_responses (key, response, expires_at, stored_at) VALUES (?, ?, ?, ?)",
+                    (key, response, expires_at, now)
+                )
+                connection.execute("DELETE FROM llm_responses WHERE expires_at <= ?", (now,))
+                connection.execute(
+                    "DELETE FROM llm_responses WHERE key IN "
+                    "(SELECT key FROM llm_responses ORDER BY stored_at DESC LIMIT -1 OFFSET ?)",
+                    (self.max_disk_entries,)
+                )
+            except Exception:
+                connection.execute("ROLLBACK")
+                raise
+            connection.execute("COMMIT")
@@ -0,0 +1,277 @@
+import asyncio
+import logging
+import random
+import threading
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional
+
+import httpx
+import openai
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitOpenError(Exception):
+    """Raised without calling upstream while the circuit breaker is open"""
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Whether an upstream error is transient: timeouts, connection failures, rate limits and 5xx responses"""
+    transient = (asyncio.TimeoutError, httpx.TransportError, openai.APIConnectionError, openai.RateLimitError)
+    if isinstance(error, transient):
+        return True
+    return isinstance(error, openai.APIStatusError) and error.status_code >= 500
+
+
+class CircuitBreaker:
+    """
+    Fails fast while the recent upstream error rate is too high
+
+    Outcomes of the last `window` calls are kept. Once at least `min_calls`
+    are known and the failure rate reaches `failure_rate`, the circuit opens
+    and calls are rejected for `open_seconds`. Then one trial call is let
+    through (half-open): success closes the circuit, failure reopens it.
+    """
+
+    def __init__(self, failure_rate: float = 0.5, window: int = 20, min_calls: int = 10, open_seconds: float = 30):
+        self.failure_rate = failure_rate
+        self.min_calls = min_calls
+        self.open_seconds = open_seconds
+
+        self._outcomes: Deque[bool] = deque(maxlen=window)  # True for a failure
+        self._opened_at: Optional[float] = None
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+        self.opened = 0
+        self.rejected = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state()
+
+    def allow(self) -> Optional[str]:
+        """
+        Admit a call if the circuit lets it through
+
+        Returns:
+            The state it was admitted in ("closed", or "half_open" for the
+            trial call), or None if it is rejected
+        """
+        with self._lock:
+            state = self._state()
+            if state == 'closed':
+                return state
+            if state == 'half_open' and not self._trial_running:
+                self._trial_running = True
+                return state
+            self.rejected += 1
+            return None
+
+    def record(self, admitted: str, success: Optional[bool]):
+        """
+        Record the outcome of an admitted call
+
+        Args:
+            admitted: State returned by `allow`
+            success: Whether it succeeded (None if it was abandoned, e.g. cancelled, without an outcome)
+        """
+        with self._lock:
+            if admitted == 'half_open':
+                self._trial_running = False
+                if success:
+                    self._opened_at = None
+                    self._outcomes.clear()
+                elif success is not None:
+                    self._opened_at = time.monotonic()
+                return
+
+            # Calls admitted before the circuit opened do not count towards reopening it
+            if success is None or self._opened_at is not None:
+                return
+
+            self._outcomes.append(not success)
+            failures = sum(self._outcomes)
+            if len(self._outcomes) >= self.min_calls and failures / len(self._outcomes) >= self.failure_rate:
+                self._opened_at = time.monotonic()
+                self.opened += 1
+                logger.warning(f"Circuit opened after {failures} failures in the last {len(self._outcomes)} calls")
+
+    def _state(self) -> str:
+        """Current state (lock held)"""
+        if self._opened_at is None:
+            return 'closed'
+        if time.monotonic() - self._opened_at >= self.open_seconds:
+            return 'half_open'
+        return 'open'
+
+
+class LatencyTracker:
+    """Recent successful call latencies, for percentiles"""
+
+    def __init__(self, size: int = 200):
+        self._latencies: Deque[float] = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def add(self, seconds: float):
+        with self._lock:
+            self._latencies.append(seconds)
+
+    def __len__(self) -> int:
+        return len(self._latencies)
+
+    def percentile(self, percent: float) -> Optional[float]:
+        """Latency below which `percent`% of recent calls finished (None without samples)"""
+        with self._lock:
+            latencies = sorted(self._latencies)
+        if not latencies:
+            return None
+        return latencies[min(int(len(latencies) * percent / 100), len(latencies) - 1)]
+
+
+class ResilientCaller:
+    """
+    Runs upstream calls under a deadline, with jittered retries, optional hedging and a circuit breaker
+
+    Each call gets `deadline_seconds` in total. Transient failures are
+    retried after a full-jitter exponential backoff, up to `max_attempts`,
+    but only while the backoff still fits in the deadline. With
+    `hedge_percentile` set, an attempt still running after that percentile
+    of recent latencies gets a second, identical request; the first to
+    succeed wins and the other is cancelled.
+    """
+
+    def __init__(self, deadline_seconds: float = 30, max_attempts: int = 3, backoff_base_seconds: float = 0.2,
+                 backoff_max_seconds: float = 2, hedge_percentile: Optional[float] = None, hedge_min_samples: int = 20,
+                 breaker: Optional[CircuitBreaker] = None):
+        """
+        Args:
+            deadline_seconds: Longest a call may take, retries and backoff included
+            max_attempts: Attempts per call, the first included
+            backoff_base_seconds: Backoff cap before the second attempt, doubled for each later one
+            backoff_max_seconds: Largest backoff cap
+            hedge_percentile: Latency percentile after which an attempt is hedged (no hedging if None)
+            hedge_min_samples: Latencies needed before hedging starts
+            breaker: Circuit breaker shared by the calls (a default one if None)
+        """
+        self.deadline_seconds = deadline_seconds
+        self.max_attempts = max_attempts
+        self.backoff_base_seconds = backoff_base_seconds
+        self.backoff_max_seconds = backoff_max_seconds
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_samples = hedge_min_samples
+        self.breaker = breaker if breaker is not None else CircuitBreaker()
+        self.latencies = LatencyTracker()
+
+        self.calls = 0
+        self.successes = 0
+        self.failures = 0
+        self.retries = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.deadline_exceeded = 0
+
+    async def call(self, operation: Callable[[], Awaitable[Any]], deadline_seconds: Optional[float] = None,
+                   hedge: bool = True) -> Any:
+        """
+        Result of `operation()`, retried and hedged within the deadline
+
+        Args:
+            operation: Starts one upstream request each time it is called
+            deadline_seconds: Deadline of this call (deadline_seconds if None)
+            hedge: Whether this call may be hedged (off for calls whose result holds a resource, e.g. a stream)
+
+        Raises:
+            CircuitOpenError: If the circuit breaker rejects the call
+            asyncio.TimeoutError: If the deadline passes first
+            Exception: The last upstream error once retries are exhausted or it is not transient
+        """
+        self.calls += 1
+        deadline = time.monotonic() + (deadline_seconds if deadline_seconds is not None else self.deadline_seconds)
+
+        attempt = 0
+        while True:
+            attempt += 1
+            admitted = self.breaker.allow()
+            if admitted is None:
+                self.failures += 1
+                raise CircuitOpenError("Upstream circuit is open; failing fast")
+
+            started = time.monotonic()
+            try:
+                result = await asyncio.wait_for(self._attempt(operation, hedge), max(deadline - started, 0))
+            except asyncio.CancelledError:
+                self.breaker.record(admitted, None)
+                raise
+            except Exception as e:
+                retryable = is_retryable(e)
+                # Client errors (bad request, auth) say nothing about upstream health
+                self.breaker.record(admitted, not retryable)
+                remaining = deadline - time.monotonic()
+                backoff = random.uniform(0, min(self.backoff_max_seconds, self.backoff_base_seconds * 2 ** attempt / 2))
+                if not retryable or attempt >= self.max_attempts or backoff >= remaining:
+                    self.failures += 1
+                    if remaining <= 0:
+                        self.deadline_exceeded += 1
+                        if not isinstance(e, asyncio.TimeoutError):
+                            raise asyncio.TimeoutError(f"Upstream deadline exceeded: {e}") from e
+                    raise
+
+                self.retries += 1
+                logger.warning(f"Upstream attempt {attempt} failed ({e}); retrying in {backoff:.2f}s")
+                await asyncio.sleep(backoff)
+                continue
+
+            self.breaker.record(admitted, True)
+            self.latencies.add(time.monotonic() - started)
+            self.successes += 1
+            return result
+
+    async def _attempt(self, operation: Callable[[], Awaitable[Any]], hedge: bool) -> Any:
+        """One attempt, with a hedged second request if the first is slower than the hedge percentile"""
+        delay = None
+        if hedge and self.hedge_percentile is not None and len(self.latencies) >= self.hedge_min_samples:
+            delay = self.latencies.percentile(self.hedge_percentile)
+        if delay is None:
+            return await operation()
+
+        primary = asyncio.ensure_future(operation())
+        tasks = {primary}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if not done:
+                self.hedges += 1
+                tasks.add(asyncio.ensure_future(operation()))
+
+            error = None
+            while tasks:
+                done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is not primary:
+                            self.hedge_wins += 1
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def stats(self) -> Dict:
+        """Call, retry, hedge and circuit breaker counters with recent latency percentiles"""
+        return {
+            'calls': self.calls,
+            'successes': self.successes,
+            'failures': self.failures,
+            'retries': self.retries,
+            'hedges': self.hedges,
+            'hedge_wins': self.hedge_wins,
+            'deadline_exceeded': self.deadline_exceeded,
+            'circuit_state': self.breaker.state,
+            'circuit_opened': self.breaker.opened,
+            'circuit_rejected': self.breaker.rejected,
+            'latency_p50_seconds': self.latencies.percentile(50),
+            'latency_p95_seconds': self.latencies.percentile(95)
+        }
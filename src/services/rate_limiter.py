@@ -0,0 +1,157 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Rough characters per token of English text, and per-message overhead of the chat format
+_CHARS_PER_TOKEN = 4
+_TOKENS_PER_MESSAGE = 4
+
+
+class RateLimitExceeded(Exception):
+    """Raised when a request would wait longer than allowed for its share of the budget"""
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def estimate_tokens(messages: List[Dict[str, str]], max_output_tokens: int) -> int:
+    """Estimated tokens a completion uses: prompt characters / 4 plus message overhead and the expected output"""
+    prompt = sum(len(message['content']) // _CHARS_PER_TOKEN + _TOKENS_PER_MESSAGE for message in messages)
+    return prompt + max_output_tokens
+
+
+class TokenBucket:
+    """Budget refilled continuously at `per_minute` units per minute, holding at most a minute's worth"""
+
+    def __init__(self, per_minute: float):
+        self.per_minute = per_minute
+        self.capacity = per_minute
+        self._available = per_minute
+        self._updated = time.monotonic()
+
+    def available(self) -> float:
+        """Units available now (negative after a debit beyond the budget)"""
+        now = time.monotonic()
+        self._available = min(self.capacity, self._available + (now - self._updated) * self.per_minute / 60)
+        self._updated = now
+        return self._available
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until `amount` units are available (amounts above capacity wait for a full bucket)"""
+        missing = min(amount, self.capacity) - self.available()
+        return max(missing, 0) * 60 / self.per_minute
+
+    def take(self, amount: float):
+        """Spend units; a negative amount refunds them"""
+        self.available()
+        self._available = min(self.capacity, self._available - amount)
+
+
+class UpstreamScheduler:
+    """
+    Admits upstream requests within requests-per-minute and tokens-per-minute budgets
+
+    Requests are admitted strictly in arrival order: the request at the head
+    of the queue waits until both budgets cover it, and later requests wait
+    behind it, so a large request is not starved by small ones. A request
+    whose wait would exceed `max_wait_seconds`, or that arrives with
+    `max_queue` requests already waiting, is rejected straight away instead
+    of joining the queue. Token costs are estimated up front and corrected
+    with the usage the API reports.
+    """
+
+    def __init__(self, requests_per_minute: Optional[float] = None, tokens_per_minute: Optional[float] = None,
+                 max_wait_seconds: float = 10, max_queue: int = 100):
+        """
+        Args:
+            requests_per_minute: Request budget (unlimited if None)
+            tokens_per_minute: Token budget (unlimited if None)
+            max_wait_seconds: Longest a request may wait for admission
+            max_queue: Most requests waiting at once
+        """
+        self.requests = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self.max_wait_seconds = max_wait_seconds
+        self.max_queue = max_queue
+
+        self._lock: Optional[asyncio.Lock] = None
+        self._waiting = 0
+        self._waits: Deque[float] = deque(maxlen=500)
+
+        self.admitted = 0
+        self.rejected = 0
+
+    async def acquire(self, tokens: int):
+        """
+        Wait for this request's turn and budget, then spend it
+
+        Raises:
+            RateLimitExceeded: If the queue is full or the wait would exceed max_wait_seconds
+        """
+        if self._waiting >= self.max_queue:
+            self.rejected += 1
+            raise RateLimitExceeded(f"{self._waiting} requests already waiting for the upstream budget", 1.0)
+
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+
+        started = time.monotonic()
+        self._waiting += 1
+        try:
+            # asyncio.Lock wakes its waiters in FIFO order
+            await asyncio.wait_for(self._lock.acquire(), self.max_wait_seconds)
+        except asyncio.TimeoutError:
+            self._waiting -= 1
+            self.rejected += 1
+            raise RateLimitExceeded("Timed out waiting in the upstream request queue", self.max_wait_seconds)
+
+        try:
+            wait = self._wait_time(tokens)
+            queued = time.monotonic() - started
+            if queued + wait > self.max_wait_seconds:
+                self.rejected += 1
+                raise RateLimitExceeded(f"Upstream budget frees up in {wait:.1f}s", wait)
+            if wait > 0:
+                await asyncio.sleep(wait)
+
+            if self.requests is not None:
+                self.requests.take(1)
+            if self.tokens is not None:
+                self.tokens.take(tokens)
+            self.admitted += 1
+            self._waits.append(time.monotonic() - started)
+        finally:
+            self._waiting -= 1
+            self._lock.release()
+
+    def settle(self, estimated: int, actual: Optional[int]):
+        """Correct the token budget once the actual usage of an admitted request is known"""
+        if self.tokens is not None and actual is not None:
+            self.tokens.take(actual - estimated)
+
+    def stats(self) -> Dict:
+        """Queue depth, admissions, rejections, wait times and the budgets left"""
+        waits = sorted(self._waits)
+        return {
+            'queue_depth': self._waiting,
+            'admitted': self.admitted,
+            'rejected': self.rejected,
+            'wait_avg_seconds': sum(waits) / len(waits) if waits else 0.0,
+            'wait_p95_seconds': waits[min(int(len(waits) * 0.95), len(waits) - 1)] if waits else 0.0,
+            'requests_available': self.requests.available() if self.requests is not None else None,
+            'tokens_available': self.tokens.available() if self.tokens is not None else None
+        }
+
+    def _wait_time(self, tokens: int) -> float:
+        """Seconds until both budgets cover a request of `tokens`"""
+        waits = [0.0]
+        if self.requests is not None:
+            waits.append(self.requests.wait_time(1))
+        if self.tokens is not None:
+            waits.append(self.tokens.wait_time(tokens))
+        return max(waits)
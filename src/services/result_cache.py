@@ -0,0 +1,213 @@
+import asyncio
+import hashlib
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from src.services.single_flight import wait_shared
+
+logger = logging.getLogger(__name__)
+
+# Bytes read at a time when hashing input files
+_HASH_BLOCK_SIZE = 1024 * 1024
+
+
+class ResultCache:
+    """
+    Process-level cache of pipeline results, one entry per set of input paths
+
+    Each entry remembers the content digest of the inputs it was computed
+    from. Entries younger than `ttl_seconds` whose files still have the same
+    mtime and size are served as-is. Otherwise the last result is still
+    served immediately while one background refresh rehashes the inputs and
+    recomputes the result only if the digest changed (stale-while-revalidate);
+    unchanged content just renews the entry. Concurrent requests for inputs
+    with no entry yet share a single computation.
+    """
+
+    def __init__(self, ttl_seconds: float = 300, max_entries: int = 8,
+                 executor: Optional[ThreadPoolExecutor] = None):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._executor = executor or ThreadPoolExecutor(max_workers=2, thread_name_prefix="result-cache")
+
+        # key -> (value, content digest, file fingerprints, checked_at)
+        self._entries: "OrderedDict[str, Tuple[Any, str, Tuple, float]]" = OrderedDict()
+        self._inflight: Dict[str, Future] = {}
+        self._file_digests: Dict[str, Tuple[Tuple[int, int], str]] = {}  # path -> ((mtime_ns, size), content digest)
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.refreshes = 0
+        self.unchanged_refreshes = 0
+
+    def file_digest(self, path: str) -> str:
+        """Content digest of a file, rehashed only when its mtime or size changes"""
+        stat = os.stat(path)
+        fingerprint = (stat.st_mtime_ns, stat.st_size)
+        known = self._file_digests.get(path)
+        if known is not None and known[0] == fingerprint:
+            return known[1]
+
+        digest = hashlib.blake2b(digest_size=16)
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(_HASH_BLOCK_SIZE), b''):
+                digest.update(block)
+
+        self._file_digests[path] = (fingerprint, digest.hexdigest())
+        return digest.hexdigest()
+
+    def make_key(self, namespace: str, paths: List[str]) -> str:
+        """Cache entry key from a namespace and the absolute input paths"""
+        return '\x1f'.join([namespace] + [os.path.abspath(path) for path in paths])
+
+    def make_digest(self, namespace: str, paths: List[str]) -> str:
+        """Digest of a namespace and the path and content of each input"""
+        digest = hashlib.blake2b(namespace.encode(), digest_size=16)
+        for path in paths:
+            digest.update(f"\x1f{os.path.abspath(path)}:".encode())
+            digest.update(self.file_digest(path).encode())
+        return digest.hexdigest()
+
+    async def get(self, namespace: str, paths: List[str], compute: Callable[[], Any],
+                  timeout: Optional[float] = None, allow_stale: bool = True) -> Any:
+        """
+        Return the cached result for the inputs, computing it at most once per content digest
+
+        Args:
+            timeout: Seconds to wait for an in-flight computation (it keeps running for other callers)
+            allow_stale: Whether the result of an earlier version of the inputs may be served
+                while it is revalidated (if False, wait for the result of the current content)
+
+        Raises:
+            asyncio.TimeoutError: If the computation outlasts the timeout
+        """
+        key = self.make_key(namespace, paths)
+        fingerprint = _fingerprint(paths)
+        return await wait_shared(self._lookup(key, namespace, paths, fingerprint, compute, allow_stale), timeout)
+
+    async def input_key(self, namespace: str, paths: List[str]) -> str:
+        """Content digest of the current inputs (file hashing runs off the event loop)"""
+        if all(self._is_known(path) for path in paths):
+            return self.make_digest(namespace, paths)
+        return await asyncio.get_running_loop().run_in_executor(self._executor, self.make_digest, namespace, paths)
+
+    async def peek(self, namespace: str, paths: List[str]) -> Optional[Any]:
+        """Cached result for the inputs as they are now (same mtime and size), if any, without computing"""
+        key = self.make_key(namespace, paths)
+        fingerprint = _fingerprint(paths)
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry[0] if entry is not None and entry[2] == fingerprint else None
+
+    def clear(self):
+        """Drop every cached result (in-flight computations still complete)"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        """Cache counters and current usage"""
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl_seconds,
+                'in_flight': len(self._inflight),
+                'hits': self.hits,
+                'stale_hits': self.stale_hits,
+                'misses': self.misses,
+                'coalesced': self.coalesced,
+                'refreshes': self.refreshes,
+                'unchanged_refreshes': self.unchanged_refreshes
+            }
+
+    def _is_known(self, path: str) -> bool:
+        """Check if a file's digest is cached for its current mtime and size"""
+        known = self._file_digests.get(path)
+        if known is None:
+            return False
+        stat = os.stat(path)
+        return known[0] == (stat.st_mtime_ns, stat.st_size)
+
+    def _lookup(self, key: str, namespace: str, paths: List[str], fingerprint: Tuple,
+                compute: Callable[[], Any], allow_stale: bool) -> Future:
+        """Future for the key's value: cached, stale with a refresh started, or a shared computation"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                if entry[2] == fingerprint and time.monotonic() - entry[3] < self.ttl_seconds:
+                    self.hits += 1
+                    return _resolved(entry[0])
+
+                future = self._inflight.get(key)
+                if future is None:
+                    self.refreshes += 1
+                    future = self._inflight[key] = self._executor.submit(
+                        self._refresh, key, namespace, paths, compute, entry
+                    )
+                if allow_stale:
+                    self.stale_hits += 1
+                    return _resolved(entry[0])
+                self.coalesced += 1
+                return future
+
+            future = self._inflight.get(key)
+            if future is not None:
+                self.coalesced += 1
+                return future
+
+            self.misses += 1
+            future = self._inflight[key] = self._executor.submit(self._refresh, key, namespace, paths, compute, None)
+            return future
+
+    def _refresh(self, key: str, namespace: str, paths: List[str], compute: Callable[[], Any],
+                 entry: Optional[Tuple]) -> Any:
+        """Hash the inputs and store their value, recomputing it only if the digest changed"""
+        try:
+            # Fingerprint before hashing, so a write during hashing leaves the entry to revalidate
+            fingerprint = _fingerprint(paths)
+            digest = self.make_digest(namespace, paths)
+            if entry is not None and entry[1] == digest:
+                value = entry[0]
+                with self._lock:
+                    self.unchanged_refreshes += 1
+            else:
+                value = compute()
+        except Exception as e:
+            logger.error(f"Result cache computation failed: {e}")
+            with self._lock:
+                self._inflight.pop(key, None)
+            raise
+
+        # Store before clearing the in-flight marker so no caller sees neither
+        with self._lock:
+            self._entries[key] = (value, digest, fingerprint, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._inflight.pop(key, None)
+        return value
+
+
+def _fingerprint(paths: List[str]) -> Tuple:
+    """(mtime_ns, size) of each input, a cheap check for whether the files changed"""
+    fingerprints = []
+    for path in paths:
+        stat = os.stat(path)
+        fingerprints.append((stat.st_mtime_ns, stat.st_size))
+    return tuple(fingerprints)
+
+
+def _resolved(value: Any) -> Future:
+    """Future already holding a value"""
+    future: Future = Future()
+    future.set_result(value)
+    return future
@@ -0,0 +1,69 @@
+import asyncio
+import logging
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent async calls for the same key into one in-flight computation
+
+    The first caller for a key starts the computation; callers arriving while
+    it runs await the same task and share its result or exception. Each
+    caller waits at most its own timeout. A caller that gives up, or whose
+    request is cancelled, stops waiting without cancelling the computation,
+    so the callers still waiting get its result.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+
+        self.leaders = 0
+        self.coalesced = 0
+        self.timeouts = 0
+
+    async def do(self, key: Hashable, compute: Callable[[], Awaitable[Any]], timeout: Optional[float] = None) -> Any:
+        """
+        Result of `compute()` for the key, shared with every concurrent caller
+
+        Raises:
+            asyncio.TimeoutError: If the computation outlasts this caller's timeout
+        """
+        loop = asyncio.get_running_loop()
+        task = self._inflight.get(key)
+        if task is None or task.get_loop() is not loop:
+            self.leaders += 1
+            task = self._inflight[key] = loop.create_task(compute())
+            task.add_done_callback(lambda done: self._forget(key, done))
+        else:
+            self.coalesced += 1
+
+        try:
+            return await asyncio.wait_for(asyncio.shield(task), timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            logger.warning(f"Gave up waiting for in-flight computation {key!r} after {timeout}s")
+            raise
+
+    def stats(self) -> Dict:
+        """Flight counters and current in-flight keys"""
+        return {
+            'in_flight': len(self._inflight),
+            'leaders': self.leaders,
+            'coalesced': self.coalesced,
+            'timeouts': self.timeouts
+        }
+
+    def _forget(self, key: Hashable, done: asyncio.Task):
+        """Drop a finished flight, retrieving its exception in case every caller gave up on it"""
+        if self._inflight.get(key) is done:
+            del self._inflight[key]
+        if not done.cancelled():
+            done.exception()
+
+
+async def wait_shared(future: Future, timeout: Optional[float] = None) -> Any:
+    """Await a future shared with other callers, giving up after `timeout` without cancelling it"""
+    return await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), timeout)
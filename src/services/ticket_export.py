@@ -0,0 +1,213 @@
+import csv
+import gzip
+import io
+import json
+import logging
+import math
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Optional
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet export is optional
+    pa = None
+    pq = None
+
+from src.services.ticket_store import TICKET_COLUMNS
+
+logger = logging.getLogger(__name__)
+
+# Tickets per Parquet row group
+PARQUET_ROW_GROUP_SIZE = 50000
+
+
+class CsvTicketWriter:
+    """
+    Writes ticket chunks as CSV rows, header taken from the first ticket
+
+    Rows match `DataFrame.to_csv(index=False)` of the same tickets: minimal
+    quoting, "\\n" line endings, and missing values (None or NaN) as empty
+    fields. Unlike a DataFrame, each value keeps its own type, so an int in
+    a column that also holds floats is written as "0", not "0.0".
+    """
+
+    media_type = 'text/csv'
+    extension = 'csv'
+
+    def __init__(self, file: BinaryIO, header: bool = True):
+        """
+        Args:
+            file: Binary file to write to
+            header: Write a header line before the first row (off when appending)
+        """
+        self._text = io.TextIOWrapper(file, encoding='utf-8', newline='', write_through=True)
+        self._header = header
+        self._writer: Optional[csv.DictWriter] = None
+
+    def write(self, tickets: List[Dict]):
+        if not tickets:
+            return
+        if self._writer is None:
+            self._writer = csv.DictWriter(self._text, fieldnames=list(tickets[0]), extrasaction='ignore',
+                                          lineterminator='\n')
+            if self._header:
+                self._writer.writeheader()
+        self._writer.writerows({key: _csv_value(value) for key, value in ticket.items()} for ticket in tickets)
+
+    def close(self):
+        self._text.flush()
+        self._text.detach()
+
+
+class NdjsonTicketWriter:
+    """Writes ticket chunks as gzip-compressed newline-delimited JSON"""
+
+    media_type = 'application/x-ndjson'
+    extension = 'ndjson.gz'
+
+    def __init__(self, file: BinaryIO):
+        self._gzip = gzip.GzipFile(fileobj=file, mode='wb', compresslevel=6)
+
+    def write(self, tickets: List[Dict]):
+        if tickets:
+            self._gzip.write(''.join(json.dumps(ticket, default=str) + '\n' for ticket in tickets).encode('utf-8'))
+
+    def close(self):
+        self._gzip.close()
+
+
+class ParquetTicketWriter:
+    """Writes ticket chunks as Parquet, one row group per `row_group_size` tickets (requires pyarrow)"""
+
+    media_type = 'application/vnd.apache.parquet'
+    extension = 'parquet'
+
+    def __init__(self, file: BinaryIO, row_group_size: int = PARQUET_ROW_GROUP_SIZE):
+        if pa is None:
+            raise ValueError("Parquet export requires pyarrow (pip install pyarrow)")
+
+        self.row_group_size = row_group_size
+        self._schema = pa.schema([
+            (column, pa.float64() if column == 'confidence' else
+             pa.int64() if column == 'similar_requests' else pa.string())
+            for column in TICKET_COLUMNS
+        ])
+        self._writer = pq.ParquetWriter(file, self._schema, compression='snappy')
+        self._pending: List[Dict] = []
+
+    def write(self, tickets: List[Dict]):
+        self._pending.extend(tickets)
+        while len(self._pending) >= self.row_group_size:
+            self._write_row_group(self._pending[:self.row_group_size])
+            del self._pending[:self.row_group_size]
+
+    def close(self):
+        if self._pending:
+            self._write_row_group(self._pending)
+            self._pending = []
+        self._writer.close()
+
+    def _write_row_group(self, tickets: List[Dict]):
+        """Write buffered tickets as one row group, column by column"""
+        columns = [
+            [_parquet_value(ticket.get(column), field.type) for ticket in tickets]
+            for column, field in zip(TICKET_COLUMNS, self._schema)
+        ]
+        self._writer.write_table(pa.Table.from_arrays(columns, schema=self._schema),
+                                 row_group_size=len(tickets))
+
+
+def _csv_value(value):
+    """CSV field value, NaN written as an empty field like None"""
+    if isinstance(value, float) and math.isnan(value):
+        return ''
+    return value
+
+
+# Export format name -> writer class
+EXPORT_FORMATS = {
+    'csv': CsvTicketWriter,
+    'ndjson': NdjsonTicketWriter,
+    'parquet': ParquetTicketWriter
+}
+
+
+def check_export_format(format: str):
+    """
+    Check an export format can be written, before any output is opened
+
+    Raises:
+        ValueError: If the format is unknown or its optional dependency is missing
+    """
+    if format not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format '{format}' (expected one of: {', '.join(EXPORT_FORMATS)})")
+    if format == 'parquet' and pa is None:
+        raise ValueError("Parquet export requires pyarrow (pip install pyarrow)")
+
+
+def ticket_writer(format: str, file: BinaryIO):
+    """Writer for an export format (see `check_export_format` for the errors raised)"""
+    check_export_format(format)
+    return EXPORT_FORMATS[format](file)
+
+
+def write_tickets(chunks: Iterable[List[Dict]], file: BinaryIO, format: str) -> int:
+    """Write chunks of tickets to a binary file as they arrive, returning the ticket count"""
+    writer = ticket_writer(format, file)
+    count = 0
+    try:
+        for tickets in chunks:
+            writer.write(tickets)
+            count += len(tickets)
+    finally:
+        writer.close()
+    return count
+
+
+def iter_export_bytes(chunks: Iterable[List[Dict]], format: str) -> Iterator[bytes]:
+    """Encode chunks of tickets, yielding the bytes of each chunk as soon as it is written"""
+    buffer = _DrainableBuffer()
+    writer = ticket_writer(format, buffer)
+    for tickets in chunks:
+        writer.write(tickets)
+        data = buffer.drain()
+        if data:
+            yield data
+
+    writer.close()
+    data = buffer.drain()
+    if data:
+        yield data
+
+
+def _parquet_value(value, type):
+    """Ticket value as the Parquet column type expects (text for everything but numbers)"""
+    if value is None:
+        return None
+    if type == pa.string():
+        return value if isinstance(value, str) else str(value)
+    return value.item() if hasattr(value, 'item') else value
+
+
+class _DrainableBuffer(io.RawIOBase):
+    """Write-only byte sink whose contents are handed out and dropped as the export streams"""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
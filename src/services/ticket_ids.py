@@ -0,0 +1,132 @@
+import logging
+import os
+import sqlite3
+import threading
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS id_sequences (
+    name TEXT PRIMARY KEY,
+    next_value INTEGER NOT NULL
+);
+"""
+
+
+class TicketIdAllocator:
+    """
+    Ticket numbers from a durable SQLite sequence, reserved a block at a time
+
+    Each process reserves `block_size` consecutive numbers in one short
+    write transaction and hands them out from memory, so the database is
+    touched once per block rather than once per ticket. Uvicorn workers and
+    separate runs sharing the database file get disjoint blocks: numbers are
+    unique across processes and restarts, and increase within a process.
+    Numbers left in a block when a process exits are skipped, never reused.
+    """
+
+    def __init__(self, db_path: str, block_size: int = 100, start: int = 1000, sequence: str = 'ticket'):
+        """
+        Args:
+            db_path: SQLite database file holding the sequence (":memory:" for one in-process sequence)
+            block_size: Numbers reserved per database write
+            start: Number before the first one handed out on a new sequence
+            sequence: Name of the sequence in the database
+        """
+        if block_size < 1:
+            raise ValueError("block_size must be at least 1")
+
+        self.db_path = db_path
+        self.block_size = block_size
+        self.start = start
+        self.sequence = sequence
+        self._connection: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+        self._next = 0
+        self._end = 0
+
+        self.blocks_reserved = 0
+
+    def next_id(self) -> int:
+        """Next ticket number"""
+        return self.reserve(1)
+
+    def reserve(self, count: int) -> int:
+        """
+        Reserve `count` consecutive ticket numbers
+
+        Returns:
+            The first of the reserved numbers
+        """
+        if count < 1:
+            raise ValueError("count must be at least 1")
+
+        with self._lock:
+            if os.getpid() != self._pid:
+                # A forked child must not hand out its parent's block
+                self._pid = os.getpid()
+                self._connection = None
+                self._next = self._end = 0
+
+            if self._end - self._next < count:
+                self._next = self._reserve_block(max(count, self.block_size))
+                self._end = self._next + max(count, self.block_size)
+
+            first = self._next
+            self._next += count
+            return first
+
+    def stats(self) -> Dict:
+        """Sequence name, block size and numbers left in the current block"""
+        with self._lock:
+            return {
+                'sequence': self.sequence,
+                'block_size': self.block_size,
+                'blocks_reserved': self.blocks_reserved,
+                'remaining_in_block': self._end - self._next
+            }
+
+    def close(self):
+        """Close the database connection (the next reservation reopens it)"""
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the database and create the schema on first use (lock held)"""
+        if self._connection is None:
+            directory = os.path.dirname(self.db_path)
+            if directory and self.db_path != ':memory:':
+                os.makedirs(directory, exist_ok=True)
+
+            connection = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None, timeout=30)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.executescript(_SCHEMA)
+            self._connection = connection
+        return self._connection
+
+    def _reserve_block(self, size: int) -> int:
+        """Advance the stored sequence by `size` and return the first number of the block (lock held)"""
+        connection = self._connect()
+        # IMMEDIATE takes the write lock up front, so concurrent processes queue
+        # on the busy timeout instead of reading the same value
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            row = connection.execute(
+                "SELECT next_value FROM id_sequences WHERE name = ?", (self.sequence,)
+            ).fetchone()
+            first = row[0] if row is not None else self.start + 1
+            connection.execute(
+                "INSERT OR REPLACE INTO id_sequences (name, next_value) VALUES (?, ?)", (self.sequence, first + size)
+            )
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+        connection.execute("COMMIT")
+
+        self.blocks_reserved += 1
+        logger.debug(f"Reserved {self.sequence} numbers {first}-{first + size - 1}")
+        return first
@@ -0,0 +1,286 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Ticket fields stored as columns; any other field goes into the `extra` JSON column
+TICKET_COLUMNS = [
+    'ticket_id', 'source_id', 'source_type', 'category', 'title', 'description', 'priority',
+    'status', 'assigned_to', 'tags', 'created_at', 'confidence', 'similar_requests',
+    'member_source_ids', 'metadata'
+]
+
+# Columns that can be filtered on, each backed by an index
+FILTER_COLUMNS = ['category', 'priority', 'assigned_to', 'source_id', 'created_at']
+
+_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS tickets (
+    ticket_id TEXT PRIMARY KEY,
+    source_id TEXT,
+    source_type TEXT,
+    category TEXT,
+    title TEXT,
+    description TEXT,
+    priority TEXT,
+    status TEXT,
+    assigned_to TEXT,
+    tags TEXT,
+    created_at TEXT,
+    confidence REAL,
+    similar_requests INTEGER,
+    member_source_ids TEXT,
+    metadata TEXT,
+    extra TEXT
+);
+CREATE TABLE IF NOT EXISTS store_meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS watermarks (
+    path TEXT PRIMARY KEY,
+    byte_offset INTEGER NOT NULL,
+    rows INTEGER NOT NULL,
+    last_source_id TEXT,
+    prefix_digest TEXT,
+    updated_at TEXT
+);
+{''.join(f'CREATE INDEX IF NOT EXISTS idx_tickets_{column} ON tickets ({column});' for column in FILTER_COLUMNS)}
+"""
+
+# Source IDs per lookup query (below SQLite's bound parameter limit)
+_LOOKUP_BATCH = 500
+
+_INSERT = (
+    f"INSERT OR REPLACE INTO tickets ({', '.join(TICKET_COLUMNS)}, extra) "
+    f"VALUES ({', '.join('?' for _ in range(len(TICKET_COLUMNS) + 1))})"
+)
+
+
+class TicketStore:
+    """Embedded SQLite ticket store with indexed filters and transactional bulk inserts"""
+
+    def __init__(self, db_path: str):
+        """
+        Args:
+            db_path: SQLite database file (":memory:" keeps one in-process database)
+        """
+        self.db_path = db_path
+        self._connection: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the database and create the schema on first use"""
+        if self._connection is None:
+            directory = os.path.dirname(self.db_path)
+            if directory and self.db_path != ':memory:':
+                os.makedirs(directory, exist_ok=True)
+
+            connection = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+            connection.row_factory = sqlite3.Row
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.executescript(_SCHEMA)
+            self._connection = connection
+            logger.info(f"Ticket store opened at {self.db_path}")
+        return self._connection
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """Serialize access and run the block in one transaction"""
+        with self._lock:
+            connection = self._connect()
+            connection.execute("BEGIN")
+            try:
+                yield connection
+            except Exception:
+                connection.execute("ROLLBACK")
+                raise
+            connection.execute("COMMIT")
+
+    def add_tickets(self, tickets: Iterable[Dict]) -> int:
+        """Insert or update tickets in one transaction; usable as a streaming ticket sink"""
+        rows = [_ticket_row(ticket) for ticket in tickets]
+        if not rows:
+            return 0
+
+        with self._transaction() as connection:
+            connection.executemany(_INSERT, rows)
+        return len(rows)
+
+    __call__ = add_tickets
+
+    def replace_all(self, tickets: Iterable[Dict], input_digest: Optional[str] = None,
+                    watermarks: Optional[Dict[str, Dict]] = None) -> int:
+        """
+        Replace every stored ticket in one transaction, recording the input digest they came from
+
+        Args:
+            tickets: Tickets generated from the whole of each feedback file
+            input_digest: Digest of the inputs the tickets came from
+            watermarks: File path -> watermark at the end the tickets cover, so the
+                next incremental run only reads rows appended after it (without
+                watermarks, the next incremental run rereads each file from the start)
+        """
+        rows = [_ticket_row(ticket) for ticket in tickets]
+        with self._transaction() as connection:
+            connection.execute("DELETE FROM tickets")
+            connection.executemany(_INSERT, rows)
+            connection.execute("DELETE FROM watermarks")
+            _write_watermarks(connection, watermarks or {})
+            _set_meta(connection, 'input_digest', input_digest)
+
+        logger.info(f"Ticket store replaced with {len(rows)} tickets")
+        return len(rows)
+
+    def commit_increment(self, tickets: Iterable[Dict], watermarks: Dict[str, Dict],
+                         input_digest: Optional[str] = None) -> int:
+        """
+        Upsert the tickets of an incremental run and advance its watermarks in one transaction
+
+        A ticket for feedback that already has one (same source type and ID,
+        e.g. a row reread after the watermarks were reset) replaces it and
+        keeps its ticket ID; the ticket dict is updated with that ID.
+
+        Args:
+            tickets: Tickets created from the new rows
+            watermarks: File path -> watermark (byte_offset, rows, last_source_id, prefix_digest)
+            input_digest: Digest of the inputs the store now reflects, if known
+        """
+        tickets = list(tickets)
+        with self._transaction() as connection:
+            existing = _existing_ticket_ids(connection, tickets)
+            for ticket in tickets:
+                known = existing.get((ticket.get('source_type'), str(_sql_value(ticket.get('source_id')))))
+                if known is not None:
+                    ticket['ticket_id'] = known
+            connection.executemany(_INSERT, [_ticket_row(ticket) for ticket in tickets])
+            _write_watermarks(connection, watermarks)
+            if input_digest is not None:
+                _set_meta(connection, 'input_digest', input_digest)
+
+        logger.info(f"Ticket store upserted {len(tickets)} tickets from an incremental run "
+                    f"({len(existing)} replaced existing ones)")
+        return len(tickets)
+
+    def watermark(self, path: str) -> Optional[Dict]:
+        """Where the last incremental run stopped reading a file, if it was read before"""
+        with self._lock:
+            row = self._connect().execute("SELECT * FROM watermarks WHERE path = ?", (path,)).fetchone()
+        return dict(row) if row is not None else None
+
+    def reset_watermarks(self):
+        """Forget every watermark, so the next incremental run rereads the files from the start"""
+        with self._transaction() as connection:
+            connection.execute("DELETE FROM watermarks")
+
+    def input_digest(self) -> Optional[str]:
+        """Digest of the inputs the stored tickets were generated from"""
+        return self._meta('input_digest')
+
+    def _meta(self, key: str) -> Optional[str]:
+        """Value of a store_meta key"""
+        with self._lock:
+            row = self._connect().execute("SELECT value FROM store_meta WHERE key = ?", (key,)).fetchone()
+        return row['value'] if row is not None else None
+
+    def query(self, limit: Optional[int] = None, offset: int = 0, **filters: Optional[str]) -> List[Dict]:
+        """
+        Tickets matching every given filter, in insertion order
+
+        Args:
+            limit: Maximum number of tickets (all if None)
+            offset: Number of matching tickets to skip
+            filters: Column -> value for any of FILTER_COLUMNS (None values are ignored)
+        """
+        where, params = _where(filters)
+        sql = f"SELECT * FROM tickets{where} ORDER BY rowid LIMIT ? OFFSET ?"
+        with self._lock:
+            rows = self._connect().execute(sql, params + [limit if limit is not None else -1, offset]).fetchall()
+        return [_row_ticket(row) for row in rows]
+
+    def count(self, **filters: Optional[str]) -> int:
+        """Number of tickets matching every given filter"""
+        where, params = _where(filters)
+        with self._lock:
+            return self._connect().execute(f"SELECT COUNT(*) FROM tickets{where}", params).fetchone()[0]
+
+    def close(self):
+        """Close the database connection"""
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+
+def _set_meta(connection: sqlite3.Connection, key: str, value: Optional[str]):
+    """Set a store_meta key inside the caller's transaction"""
+    connection.execute("INSERT OR REPLACE INTO store_meta (key, value) VALUES (?, ?)", (key, value))
+
+
+def _write_watermarks(connection: sqlite3.Connection, watermarks: Dict[str, Dict]):
+    """Insert or replace file watermarks inside the caller's transaction"""
+    updated_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    connection.executemany(
+        "INSERT OR REPLACE INTO watermarks "
+        "(path, byte_offset, rows, last_source_id, prefix_digest, updated_at) VALUES (?, ?, ?, ?, ?, ?)",
+        [
+            (path, mark['byte_offset'], mark['rows'], _sql_value(mark['last_source_id']),
+             mark['prefix_digest'], updated_at)
+            for path, mark in watermarks.items()
+        ]
+    )
+
+
+def _existing_ticket_ids(connection: sqlite3.Connection, tickets: List[Dict]) -> Dict[tuple, str]:
+    """(source_type, source_id) -> stored ticket ID, for the tickets' feedback that already has a ticket"""
+    keys = {(ticket.get('source_type'), _sql_value(ticket.get('source_id'))) for ticket in tickets}
+    existing = {}
+    for source_type in {source_type for source_type, _ in keys}:
+        source_ids = [source_id for known_type, source_id in keys if known_type == source_type]
+        for start in range(0, len(source_ids), _LOOKUP_BATCH):
+            batch = source_ids[start:start + _LOOKUP_BATCH]
+            rows = connection.execute(
+                f"SELECT source_id, ticket_id FROM tickets "
+                f"WHERE source_type = ? AND source_id IN ({', '.join('?' for _ in batch)})",
+                [source_type] + batch
+            ).fetchall()
+            existing.update({(source_type, str(row['source_id'])): row['ticket_id'] for row in rows})
+    return existing
+
+
+def _where(filters: Dict[str, Optional[str]]):
+    """WHERE clause and parameters for the given column filters"""
+    clauses, params = [], []
+    for column, value in filters.items():
+        if column not in FILTER_COLUMNS:
+            raise ValueError(f"Cannot filter tickets on '{column}'")
+        if value is not None:
+            clauses.append(f"{column} = ?")
+            params.append(value)
+    return (f" WHERE {' AND '.join(clauses)}" if clauses else ''), params
+
+
+def _ticket_row(ticket: Dict) -> tuple:
+    """Column values of a ticket, unknown fields folded into the extra JSON"""
+    extra = {key: value for key, value in ticket.items() if key not in TICKET_COLUMNS}
+    values = tuple(_sql_value(ticket.get(column)) for column in TICKET_COLUMNS)
+    return values + (json.dumps(extra, default=str) if extra else None,)
+
+
+def _sql_value(value):
+    """Plain Python value for SQLite (unwraps numpy scalars)"""
+    return value.item() if hasattr(value, 'item') else value
+
+
+def _row_ticket(row: sqlite3.Row) -> Dict:
+    """Ticket dict from a stored row, leaving out fields the ticket never had"""
+    ticket = {column: row[column] for column in TICKET_COLUMNS if row[column] is not None}
+    if row['extra']:
+        ticket.update(json.loads(row['extra']))
+    return ticket
@@ -0,0 +1,13 @@
+import pytest
+
+from src.config import settings
+
+
+@pytest.fixture(autouse=True, scope='session')
+def ticket_databases(tmp_path_factory):
+    """Point the app's ticket store and ID sequence at a temporary database instead of the output directory"""
+    db_path = str(tmp_path_factory.mktemp('tickets') / 'tickets.db')
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setattr(settings, 'ticket_db_path', db_path)
+        patch.setattr(settings, 'ticket_id_db_path', db_path)
+        yield db_path
@@ -1,15 +1,39 @@
 """
 Comprehensive test suite for Feedback Analysis System
 """
+import asyncio
+import pickle
 import pytest
 import sys
+import threading
+import time
 import os
+from concurrent.futures import ThreadPoolExecutor
+import pandas as pd
 
 # Add src to path
 sys.path.insert(0, os.path.abspath('.'))
 
-from src.services.feedback_service import FeedbackService
+from src.services.feedback_service import CsvTicketSink, FeedbackService
+from src.services.job_manager import JobCancelled, JobManager, JobQueueFull
+from src.services.memo_cache import MemoCache
+from src.services.result_cache import ResultCache
+from src.services.single_flight import SingleFlight
+from src.services.ticket_ids import TicketIdAllocator
+from src.services.ticket_store import TicketStore
+from src.services.ticket_export import iter_export_bytes, write_tickets
+from src.services.dedup_index import MinHashLSHIndex
+from src.models.feedback_record import FeedbackRecord
+from src.agents.feedback_ingest import FeedbackIngestor
+from src.agents.source_adapters import SourceSpec
+from src.services.feedback_pipeline import (
+    DuplicateGrouper, FeedbackPipeline, PipelineExecutor, PipelineProcessPool, PipelineStage
+)
 from src.controller.feedback_controller import FeedbackController
+from src.agents.keyword_matcher import KeywordMatcher, LEXICONS, keyword_matcher
+from src.agents.extraction_engine import bug_report_extractor
+from src.agents.bug_analyzer_agent import BugAnalyzerAgent
+from src.agents.csv_reader_agent import CSVReaderAgent
 
 
 class TestFeedbackService:
@@ -63,6 +87,50 @@ class TestFeedbackService:
         
         assert result['category'] == 'Spam'
     
+    def test_classify_frame_matches_classify_feedback(self):
+        """Test vectorized classification agrees with per-item classification"""
+        df = pd.DataFrame({
+            'review_text': [
+                "App crashes when I try to upload photos",
+                "Please add dark mode feature to the app",
+                "Amazing app! Love the new features. Excellent work!",
+                "Buy cheap watches at www.fakewatches.com! Click here!",
+                "xkcd qwrt zzzz bbbb",
+                ""
+            ],
+            'rating': [1, 4, 5, None, 3, 0]
+        })
+        
+        result = self.service.classify_frame(df)
+        
+        for i, row in df.iterrows():
+            rating = None if pd.isna(row['rating']) else row['rating']
+            expected = self.service.classify_feedback(row['review_text'], rating)
+            assert result.loc[i, 'category'] == expected['category']
+            assert result.loc[i, 'confidence'] == expected['confidence']
+    
+    def test_classify_frame_handles_nul_characters(self):
+        """Test texts containing NULs are classified like per-item classification, not merged or split"""
+        df = pd.DataFrame({
+            'review_text': [
+                "\0App crashes on login",
+                "\0Please add dark mode",
+                "Great\0app love it",
+                "Great\0add a feature please",
+                "crash\0",
+                "\0"
+            ],
+            'rating': [3, 3, 5, 5, 1, 3]
+        })
+        
+        result = self.service.classify_frame(df)
+        
+        for i, row in df.iterrows():
+            expected = self.service.classify_feedback(row['review_text'], row['rating'])
+            assert result.loc[i, 'category'] == expected['category']
+            assert result.loc[i, 'confidence'] == expected['confidence']
+        assert result.loc[0, 'category'] != result.loc[1, 'category']
+    
     def test_analyze_bug(self):
         """Test bug analysis"""
         feedback = {
@@ -104,6 +172,1294 @@ class TestFeedbackService:
         assert ticket['priority'] in ['Critical', 'High', 'Medium', 'Low']
         assert ticket['status'] == 'Open'
         assert 'Engineering Team' in ticket['assigned_to']
+    
+    def test_concurrent_tickets_get_unique_ids(self, tmp_path):
+        """Test tickets created from several threads at once never share an ID"""
+        from src.agents.ticket_creator_agent import TicketCreatorAgent
+        
+        feedback = {'review_id': 'R001', 'review_text': 'App crashes', 'category': 'Bug'}
+        classification = {'category': 'Bug', 'confidence': 0.8}
+        allocated = FeedbackService(id_allocator=TicketIdAllocator(str(tmp_path / 'ids.db'), block_size=7))
+        agent = TicketCreatorAgent()
+        creators = [
+            lambda: self.service.create_ticket(feedback, classification),
+            lambda: allocated.create_ticket(feedback, classification),
+            lambda: agent.create_ticket(feedback)
+        ]
+        
+        # Switch threads as often as possible to widen any race
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        try:
+            for create in creators:
+                with ThreadPoolExecutor(max_workers=4) as pool:
+                    batches = list(pool.map(lambda _: [create()['ticket_id'] for _ in range(500)], range(4)))
+                ids = [ticket_id for batch in batches for ticket_id in batch]
+                assert len(set(ids)) == len(ids) == 2000
+        finally:
+            sys.setswitchinterval(interval)
+
+
+class TestKeywordMatcher:
+    """Test the shared single-pass keyword matcher"""
+    
+    def test_reports_every_hit_with_offset(self):
+        """Test overlapping keywords are all reported with their start offsets"""
+        matcher = KeywordMatcher({'a': ['please add', 'add'], 'b': ['add on']})
+        hits = matcher.scan("please add on")
+        
+        assert sorted(hits) == [('a', 'add', 7), ('a', 'please add', 0), ('b', 'add on', 7)]
+        assert hits.count('a') == 2
+        assert hits.any('b')
+        assert not hits.any('c')
+    
+    def test_matches_substring_semantics(self):
+        """Test lexicon counts match per-keyword substring checks"""
+        text = "I can't login, the app won't open and I lost all my data. Please add a fix!".lower()
+        hits = keyword_matcher.scan(text)
+        
+        for lexicon, keywords in LEXICONS.items():
+            assert hits.count(lexicon) == sum(1 for kw in keywords if kw in text), lexicon
+    
+    def test_service_accepts_precomputed_hits(self):
+        """Test service methods reuse a shared hit set"""
+        service = FeedbackService()
+        text = "App crashes on Pixel 7, Android 14"
+        hits = keyword_matcher.scan(text.lower())
+        
+        assert service.classify_feedback(text, 1, hits) == service.classify_feedback(text, 1)
+        assert service.analyze_bug({}, text, hits)['severity'] == 'Critical'
+
+
+class TestExtractionEngine:
+    """Test the single-scan bug report extraction engine"""
+    
+    def test_extracts_all_families_in_one_scan(self):
+        """Test device, OS version, error message and steps come back together"""
+        text = "Error: upload failed. Pixel 7 Pro, Android 14. Steps: open app then upload."
+        found = bug_report_extractor.extract(text)
+        
+        assert found['device'] == (3, 'Pixel 7 Pro')
+        assert found['os_version'] == (0, '14')
+        assert found['error_message'][1] == 'upload failed'
+        assert found['steps'][1] == 'open app then upload'
+    
+    def test_pattern_priority_beats_position(self):
+        """Test a higher-priority pattern wins even when it appears later"""
+        analysis = BugAnalyzerAgent().analyze_bug({'review_text': "Works on Pixel 7 but crashes on iPadOS 17 on my iPhone 14"})
+        
+        assert analysis['device'] == 'iPhone 14'
+        assert analysis['os_version'] == 'iPadOS 17'
+
+
+class TestMemoCache:
+    """Test the content-addressed memo cache"""
+    
+    def test_service_reuses_results_for_repeated_text(self):
+        """Test repeated feedback is served from the cache"""
+        cache = MemoCache()
+        service = FeedbackService(memo_cache=cache)
+        
+        first = service.classify_feedback("App crashes on upload", rating=1)
+        second = service.classify_feedback("  app CRASHES on upload ", rating=1.0)
+        service.classify_feedback("App crashes on upload", rating=5)
+        
+        assert first == second
+        assert cache.stats()['hits'] == 1
+        assert cache.stats()['misses'] == 2
+    
+    def test_evicts_least_recently_used(self):
+        """Test entry limit evicts the least recently used key"""
+        cache = MemoCache(max_entries=2)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+        
+        assert cache.get('b') is None
+        assert cache.get('a') == 1
+        assert cache.stats()['evictions'] == 1
+    
+    def test_ttl_and_memory_ceiling(self):
+        """Test expired entries miss and the byte ceiling bounds usage"""
+        cache = MemoCache(ttl_seconds=-1)
+        cache.set('a', {'category': 'Bug'})
+        assert cache.get('a') is None
+        assert cache.stats()['expirations'] == 1
+        
+        cache = MemoCache(max_bytes=1000)
+        for i in range(50):
+            cache.set(str(i), {'text': 'x' * 100})
+        assert 0 < cache.stats()['bytes'] <= 1000
+        assert cache.stats()['evictions'] > 0
+
+
+class TestResultCache:
+    """Test the path-keyed, digest-revalidated result cache"""
+    
+    def test_computes_once_per_input_version(self, tmp_path):
+        """Test concurrent requests share one computation until the file changes"""
+        path = tmp_path / "reviews.csv"
+        path.write_text("review_id,review_text\nR1,first\n")
+        cache = ResultCache(ttl_seconds=60)
+        calls = []
+        
+        def compute():
+            calls.append(path.read_text())
+            return len(calls)
+        
+        async def requests():
+            return await asyncio.gather(*(cache.get('test', [str(path)], compute) for _ in range(5)))
+        
+        assert asyncio.run(requests()) == [1] * 5
+        assert asyncio.run(cache.get('test', [str(path)], compute)) == 1
+        
+        path.write_text("review_id,review_text\nR1,second version\n")
+        assert asyncio.run(cache.get('test', [str(path)], compute, allow_stale=False)) == 2
+        assert len(calls) == 2
+        assert cache.stats()['misses'] == 1
+    
+    def test_serves_stale_while_changed_inputs_recompute(self, tmp_path):
+        """Test the previous result is returned at once while the result for changed content computes"""
+        path = tmp_path / "reviews.csv"
+        path.write_text("review_id,review_text\nR1,first\n")
+        cache = ResultCache(ttl_seconds=60)
+        calls = []
+        
+        def compute():
+            calls.append(path.read_text())
+            return len(calls)
+        
+        assert asyncio.run(cache.get('test', [str(path)], compute)) == 1
+        path.write_text("review_id,review_text\nR1,second version\n")
+        assert asyncio.run(cache.get('test', [str(path)], compute)) == 1
+        
+        cache._executor.shutdown(wait=True)
+        assert len(calls) == 2
+        assert asyncio.run(cache.get('test', [str(path)], compute)) == 2
+        assert cache.stats()['stale_hits'] == 1
+    
+    def test_unchanged_content_skips_recompute(self, tmp_path):
+        """Test expired or touched entries whose content digest is unchanged are renewed without recomputing"""
+        path = tmp_path / "emails.csv"
+        path.write_text("email_id,body\nE1,hello\n")
+        cache = ResultCache(ttl_seconds=0)
+        calls = []
+        
+        def compute():
+            calls.append(1)
+            return len(calls)
+        
+        assert asyncio.run(cache.get('test', [str(path)], compute)) == 1
+        assert asyncio.run(cache.get('test', [str(path)], compute, allow_stale=False)) == 1
+        os.utime(path, ns=(0, 0))
+        assert asyncio.run(cache.get('test', [str(path)], compute, allow_stale=False)) == 1
+        
+        assert len(calls) == 1
+        assert cache.stats()['refreshes'] == cache.stats()['unchanged_refreshes'] == 2
+
+
+class TestSingleFlight:
+    """Test coalescing of concurrent identical computations"""
+    
+    def test_concurrent_calls_share_one_computation(self):
+        """Test callers for the same key share a result while other keys run separately"""
+        flight = SingleFlight()
+        calls = []
+        
+        async def compute(key):
+            calls.append(key)
+            await asyncio.sleep(0.05)
+            return f"result {key}"
+        
+        async def requests():
+            return await asyncio.gather(*(flight.do(key, lambda key=key: compute(key)) for key in 'aaaab'))
+        
+        assert asyncio.run(requests()) == ['result a'] * 4 + ['result b']
+        assert sorted(calls) == ['a', 'b']
+        assert flight.stats() == {'in_flight': 0, 'leaders': 2, 'coalesced': 3, 'timeouts': 0}
+    
+    def test_timeout_leaves_computation_running_for_others(self):
+        """Test a caller giving up does not cancel the shared computation"""
+        flight = SingleFlight()
+        
+        async def compute():
+            await asyncio.sleep(0.1)
+            return 'done'
+        
+        async def requests():
+            patient = asyncio.ensure_future(flight.do('key', compute))
+            await asyncio.sleep(0)
+            with pytest.raises(asyncio.TimeoutError):
+                await flight.do('key', compute, timeout=0.01)
+            return await patient
+        
+        assert asyncio.run(requests()) == 'done'
+        assert flight.stats()['timeouts'] == 1
+
+
+class TestTicketStore:
+    """Test the SQLite ticket store"""
+    
+    def make_tickets(self):
+        """Tickets across categories and priorities"""
+        return [
+            {'ticket_id': f'TICK-{i}', 'source_id': f'R{i}', 'category': category, 'priority': priority,
+             'assigned_to': 'Engineering Team', 'created_at': '2024-01-15 10:00:00', 'confidence': 0.5}
+            for i, (category, priority) in enumerate([('Bug', 'High'), ('Bug', 'Low'), ('Praise', 'Low')] * 3)
+        ]
+    
+    def test_filters_with_indexes(self, tmp_path):
+        """Test filtered queries, counts and pagination"""
+        store = TicketStore(str(tmp_path / "tickets.db"))
+        assert store.add_tickets(self.make_tickets()) == 9
+        
+        assert store.count(category='Bug') == 6
+        assert store.count(category='Bug', priority='Low') == 3
+        assert [t['ticket_id'] for t in store.query(limit=2, offset=1, category='Bug')] == ['TICK-1', 'TICK-3']
+        assert store.query(source_id='R2') == [self.make_tickets()[2]]
+        
+        plan = store._connect().execute("EXPLAIN QUERY PLAN SELECT * FROM tickets WHERE priority = 'High'").fetchall()
+        assert 'idx_tickets_priority' in str([tuple(row) for row in plan])
+        
+        with pytest.raises(ValueError):
+            store.query(title='x')
+    
+    def test_replace_all_records_input_digest(self, tmp_path):
+        """Test a full replace swaps tickets and records their inputs atomically"""
+        store = TicketStore(str(tmp_path / "tickets.db"))
+        store.add_tickets(self.make_tickets())
+        store.replace_all([{'ticket_id': 'TICK-X', 'category': 'Bug', 'quality': {'score': 90}}], 'digest-1')
+        
+        assert store.input_digest() == 'digest-1'
+        assert store.query() == [{'ticket_id': 'TICK-X', 'category': 'Bug', 'quality': {'score': 90}}]
+
+
+class TestTicketIdAllocator:
+    """Test durable block-reserved ticket numbering"""
+    
+    def test_numbers_continue_across_blocks_and_restarts(self, tmp_path):
+        """Test numbers increase within a process and a restart continues after its reserved blocks"""
+        path = str(tmp_path / "ids.db")
+        allocator = TicketIdAllocator(path, block_size=3)
+        
+        assert [allocator.next_id() for _ in range(4)] == [1001, 1002, 1003, 1004]
+        assert allocator.stats()['blocks_reserved'] == 2
+        allocator.close()
+        
+        assert TicketIdAllocator(path, block_size=3).next_id() == 1007
+    
+    def test_reserve_returns_consecutive_range(self, tmp_path):
+        """Test a reservation larger than a block gets one consecutive range"""
+        allocator = TicketIdAllocator(str(tmp_path / "ids.db"), block_size=4)
+        
+        assert allocator.next_id() == 1001
+        assert allocator.reserve(10) == 1005
+        assert allocator.next_id() == 1015
+        with pytest.raises(ValueError):
+            allocator.reserve(0)
+    
+    def test_concurrent_allocators_never_share_numbers(self, tmp_path):
+        """Test allocators on one database, as in separate workers, hand out disjoint increasing numbers"""
+        path = str(tmp_path / "ids.db")
+        allocators = [TicketIdAllocator(path, block_size=7) for _ in range(4)]
+        
+        def allocate(allocator):
+            return [allocator.next_id() for _ in range(200)]
+        
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            results = list(executor.map(allocate, allocators))
+        
+        assert all(numbers == sorted(numbers) for numbers in results)
+        assert len({number for numbers in results for number in numbers}) == 800
+
+
+class TestTicketExport:
+    """Test streaming ticket export formats"""
+    
+    def make_chunks(self):
+        """Two chunks of tickets"""
+        tickets = [
+            {'ticket_id': f'TICK-{i}', 'source_id': f'R{i}', 'category': 'Bug', 'title': 'Crash, "again"',
+             'confidence': 0.5, 'similar_requests': i}
+            for i in range(5)
+        ]
+        return [tickets[:3], tickets[3:]]
+    
+    def test_csv_and_ndjson_round_trip(self, tmp_path):
+        """Test CSV and gzip NDJSON exports hold every ticket of every chunk"""
+        import gzip
+        import json
+        
+        with open(tmp_path / "tickets.csv", 'wb') as f:
+            assert write_tickets(self.make_chunks(), f, 'csv') == 5
+        assert list(pd.read_csv(tmp_path / "tickets.csv")['title']) == ['Crash, "again"'] * 5
+        
+        streamed = b''.join(iter_export_bytes(self.make_chunks(), 'ndjson'))
+        lines = gzip.decompress(streamed).decode().splitlines()
+        assert [json.loads(line)['ticket_id'] for line in lines] == [f'TICK-{i}' for i in range(5)]
+        
+        with pytest.raises(ValueError):
+            list(iter_export_bytes(self.make_chunks(), 'xml'))
+    
+    def test_csv_matches_dataframe_to_csv(self, tmp_path):
+        """Test CSV exports are byte-identical to DataFrame.to_csv, missing values as empty fields"""
+        tickets = [
+            {'ticket_id': 'TICK-1', 'title': 'Crash, "again"', 'description': 'Line one\nline two',
+             'confidence': 0.25, 'metadata': None, 'similar_requests': 0},
+            {'ticket_id': 'TICK-2', 'title': 'Slow', 'description': '', 'confidence': float('nan'),
+             'metadata': "{'source_rating': nan}", 'similar_requests': 2}
+        ]
+        
+        with open(tmp_path / "tickets.csv", 'wb') as f:
+            write_tickets([tickets[:1], tickets[1:]], f, 'csv')
+        assert (tmp_path / "tickets.csv").read_text() == pd.DataFrame(tickets).to_csv(index=False)
+    
+    def test_parquet_row_groups(self, tmp_path):
+        """Test Parquet exports are written in row groups"""
+        pq = pytest.importorskip('pyarrow.parquet')
+        from src.services.ticket_export import ParquetTicketWriter
+        
+        with open(tmp_path / "tickets.parquet", 'wb') as f:
+            writer = ParquetTicketWriter(f, row_group_size=2)
+            for chunk in self.make_chunks():
+                writer.write(chunk)
+            writer.close()
+        
+        parquet = pq.ParquetFile(tmp_path / "tickets.parquet")
+        assert parquet.num_row_groups == 3
+        assert parquet.read().column('similar_requests').to_pylist() == [0, 1, 2, 3, 4]
+
+
+class TestFeedbackIngestor:
+    """Test typed, projected CSV ingestion"""
+    
+    def write_reviews(self, tmp_path):
+        """Reviews file with an unused column and a missing text"""
+        path = tmp_path / "reviews.csv"
+        path.write_text(
+            "review_id,platform,rating,review_text,unused,app_version\n"
+            "R1,Google Play,1,\"Crashes,\nevery time\",x,2.1\n"
+            "R2,App Store,5,,y,2.1\n"
+            "R3,Google Play,4,Love it,z,3.0\n"
+        )
+        return str(path)
+    
+    @pytest.mark.parametrize('engine', ['c', 'pyarrow'])
+    def test_dtypes_and_projection(self, tmp_path, engine):
+        """Test both engines read only used columns, with categoricals and pandas-style values"""
+        if engine == 'pyarrow':
+            pytest.importorskip('pyarrow')
+        
+        df = FeedbackIngestor(engine, memory_map=True).read_frame(self.write_reviews(tmp_path), 'review')
+        
+        assert list(df.columns) == ['review_id', 'platform', 'rating', 'review_text', 'app_version']
+        assert df['platform'].dtype == 'category'
+        assert df['app_version'].tolist() == ['2.1', '2.1', '3.0']
+        assert df['rating'].tolist() == [1, 5, 4]
+        assert df['review_text'].tolist()[0] == 'Crashes,\nevery time'
+        assert pd.isna(df['review_text'].tolist()[1])
+    
+    @pytest.mark.parametrize('engine', ['c', 'pyarrow'])
+    def test_chunks_and_headerless_reads(self, tmp_path, engine):
+        """Test chunked reads split rows by chunksize and accept explicit column names"""
+        if engine == 'pyarrow':
+            pytest.importorskip('pyarrow')
+        ingestor = FeedbackIngestor(engine)
+        path = self.write_reviews(tmp_path)
+        
+        assert [len(df) for df in ingestor.iter_frames(path, 'review', 2)] == [2, 1]
+        
+        with open(path, 'rb') as f:
+            names = f.readline().decode().strip().split(',')
+            frames = list(ingestor.iter_frames(f, 'review', 10, names=names))
+        assert frames[0]['review_id'].tolist() == ['R1', 'R2', 'R3']
+
+
+class TestSourceAdapters:
+    """Test JSON Lines, Parquet and compressed CSV sources with column mappings"""
+    
+    def setup_method(self):
+        """Setup reader and a reviews frame under export column names"""
+        self.reader = CSVReaderAgent()
+        self.reviews = pd.DataFrame({
+            'id': ['R1', 'R2', 'R3'],
+            'content': ['App crashes on login', 'Please add dark mode', 'Love it'],
+            'stars': [1, 3, 5],
+            'date': ['2024-01-10', '2024-01-20', '2024-01-30']
+        })
+        self.columns = {'source_id': 'id', 'text': 'content', 'rating': 'stars'}
+    
+    def read(self, spec):
+        """All records of a source"""
+        return [record for chunk in self.reader.iter_sources([spec], 2) for record in chunk]
+    
+    def test_spec_infers_storage_and_validates_fields(self):
+        """Test format and compression come from the extension and unknown fields are rejected"""
+        spec = SourceSpec('exports/reviews.ndjson.gz', 'review', columns=self.columns)
+        assert (spec.format, spec.compression) == ('jsonl', 'gzip')
+        assert spec.column_map()['content'] == 'review_text'
+        
+        with pytest.raises(ValueError):
+            SourceSpec('reviews.csv', 'review', columns={'body_text': 'content'})
+        with pytest.raises(ValueError):
+            SourceSpec('reviews.csv', 'review', filters=[('date', '~', '2024')])
+    
+    def test_compressed_jsonl_with_mapping_and_filter(self, tmp_path):
+        """Test gzip JSON Lines rows are mapped to records and filtered while reading"""
+        path = str(tmp_path / "reviews.jsonl.gz")
+        self.reviews.to_json(path, orient='records', lines=True, compression='gzip')
+        
+        records = self.read(SourceSpec(path, 'review', columns=self.columns, filters=[('date', '>', '2024-01-15')]))
+        
+        assert [record.source_id for record in records] == ['R2', 'R3']
+        assert records[0]['review_text'] == 'Please add dark mode'
+        assert records[0]['rating'] == 3
+        assert records[0]['date'] == '2024-01-20'
+    
+    def test_parquet_and_gzip_csv(self, tmp_path):
+        """Test Parquet (filters pushed into the scan) and gzip CSV sources"""
+        pytest.importorskip('pyarrow')
+        parquet = str(tmp_path / "reviews.parquet")
+        self.reviews.to_parquet(parquet, row_group_size=1)
+        csv_gz = str(tmp_path / "reviews.csv.gz")
+        self.reviews.to_csv(csv_gz, index=False, compression='gzip')
+        
+        for path in (parquet, csv_gz):
+            records = self.read(SourceSpec(path, 'review', columns=self.columns, filters=[('rating', '<=', 3)]))
+            assert [record.source_id for record in records] == ['R1', 'R2']
+
+
+class TestDedupIndex:
+    """Test near-duplicate grouping"""
+    
+    def test_groups_near_duplicates(self):
+        """Test reworded copies join the first report's group"""
+        index = MinHashLSHIndex(threshold=0.5)
+        assert index.add('R1', "App crashes every time I upload a photo on my iPhone 13") == 'R1'
+        assert index.add('E1', "The app crashes every time I upload a photo from my iPhone 13!") == 'R1'
+        assert index.add('R2', "Please add a dark mode, the white screen hurts at night") == 'R2'
+        assert index.group_of('E1') == 'R1'
+        assert len(index) == 3
+    
+    def test_service_collapses_duplicates_per_category(self):
+        """Test duplicates share one ticket only within a category"""
+        service = FeedbackService()
+        service.dedup_threshold = 0.5
+        items = [
+            {'review_id': 'R1', 'review_text': "App crashes every time I upload a photo"},
+            {'email_id': 'E1', 'body': "App crashes every time I upload a photo!!"},
+            {'review_id': 'R2', 'review_text': "App crashes every time I upload a photo"},
+        ]
+        groups = service.group_duplicates(items, ['Bug', 'Bug', 'Complaint'])
+        assert groups == [[0, 1], [2]]
+        
+        ticket = service.create_ticket(items[0], {'category': 'Bug', 'confidence': 0.9}, None, [items[1]])
+        assert ticket['similar_requests'] == 1
+        assert ticket['member_source_ids'] == 'R1, E1'
+    
+    def test_texts_without_words_are_not_grouped(self):
+        """Test empty and punctuation-only texts keep their own tickets instead of collapsing together"""
+        items = [
+            {'review_id': 'R1', 'review_text': '', 'category': 'Complaint'},
+            {'review_id': 'R2', 'review_text': '   ', 'category': 'Complaint'},
+            {'review_id': 'R3', 'review_text': '!!!', 'category': 'Complaint'},
+            {'review_id': 'R4', 'review_text': 'Support never answered my emails', 'category': 'Complaint'},
+            {'review_id': 'R5', 'review_text': 'Support never answered my emails!', 'category': 'Complaint'},
+        ]
+        grouper = DuplicateGrouper(0.5)
+        grouper.group_batch(items)
+        assert [item.get('duplicate_of') for item in items] == [None, None, None, None, 'R4']
+        assert len(grouper) == 5
+        
+        service = FeedbackService()
+        service.dedup_threshold = 0.5
+        assert service.group_duplicates(items, [item['category'] for item in items]) == [[0], [1], [2], [3, 4]]
+
+
+class TestFeedbackRecord:
+    """Test the slotted feedback record"""
+    
+    def test_answers_row_dict_lookups(self):
+        """Test records behave like the CSV row dicts agents expect"""
+        review = FeedbackRecord.from_dict({
+            'review_id': 'R1', 'review_text': 'App CRASHES on login', 'rating': 1, 'platform': 'App Store'
+        })
+        email = FeedbackRecord.from_dict({'email_id': 'E1', 'body': float('nan'), 'priority': 'High'})
+        
+        assert review['review_id'] == 'R1' and 'email_id' not in review
+        assert review.text_lower == 'app crashes on login'
+        assert review.tokens == ['App', 'CRASHES', 'on', 'login']
+        assert email.get('body') == '' and email.get('rating', 3) == 3
+        assert email['priority'] == 'High'
+        
+        email['category'] = 'Bug'
+        assert 'category' in email and 'ticket' not in email
+        assert email.to_dict() == {'email_id': 'E1', 'body': '', 'category': 'Bug', 'priority': 'High'}
+    
+    def test_agents_accept_records(self):
+        """Test agents give the same analysis for records and dicts"""
+        row = {
+            'review_id': 'R1', 'rating': 1, 'platform': 'Google Play', 'app_version': '2.1.3',
+            'review_text': 'Crash when uploading. Error: "upload error 42". Samsung Galaxy S21, Android 13.'
+        }
+        agent = BugAnalyzerAgent()
+        
+        assert agent.analyze_bug(FeedbackRecord.from_dict(row)) == agent.analyze_bug(row)
+    
+    def test_pickles_without_derived_text(self):
+        """Test records survive pickling (for worker processes) with text fields rebuilt"""
+        record = FeedbackRecord.from_dict({'review_id': 'R1', 'review_text': 'Dark mode please', 'rating': 5})
+        record['category'] = 'Feature Request'
+        
+        copy = pickle.loads(pickle.dumps(record))
+        
+        assert copy.to_dict() == record.to_dict()
+        assert copy.tokens == ['Dark', 'mode', 'please'] and copy.text_lower == 'dark mode please'
+
+
+class TestFeedbackPipeline:
+    """Test the staged agent pipeline"""
+    
+    def test_stages_only_see_routed_items(self):
+        """Test routing and per-stage timings"""
+        seen = []
+        executor = PipelineExecutor([
+            PipelineStage('tag', lambda batch: [item.update(tagged=True) for item in batch]),
+            PipelineStage('odd', lambda batch: seen.extend(batch), lambda item: item['n'] % 2)
+        ])
+        items = [{'n': n} for n in range(5)]
+        executor.run(items, batch_size=2)
+        
+        assert all(item['tagged'] for item in items)
+        assert seen == [items[1], items[3]]
+        assert seen[0] is items[1]
+        assert executor.timings['tag']['items'] == 5
+        assert executor.timings['odd']['items'] == 2
+    
+    def test_batch_size_does_not_change_tickets(self):
+        """Test batched runs create the same tickets as a single batch"""
+        reviews_path = "data/app_store_reviews.csv"
+        emails_path = "data/support_emails.csv"
+        if not os.path.exists(reviews_path) or not os.path.exists(emails_path):
+            pytest.skip("Test data files not found")
+        
+        fields = ['source_id', 'category', 'title', 'priority', 'similar_requests', 'member_source_ids']
+        results = [
+            FeedbackPipeline(dedup_threshold=0.5, batch_size=batch_size).process_files(reviews_path, emails_path)
+            for batch_size in (None, 7)
+        ]
+        single, batched = ([[t[f] for f in fields] for t in r['tickets']] for r in results)
+        
+        assert single == batched
+        assert results[0]['quality_review']['total_tickets'] == len(single)
+        assert set(results[0]['stage_timings']) >= {'read', 'classify', 'create_ticket', 'review_quality'}
+    
+    def test_memo_cache_reuses_stage_results(self):
+        """Test memoized stages create the same tickets and a second run computes nothing again"""
+        reviews_path = "data/app_store_reviews.csv"
+        emails_path = "data/support_emails.csv"
+        if not os.path.exists(reviews_path) or not os.path.exists(emails_path):
+            pytest.skip("Test data files not found")
+        
+        fields = ['source_id', 'category', 'title', 'description', 'priority', 'confidence']
+        cache = MemoCache()
+        plain = FeedbackPipeline(dedup_threshold=0.5).process_files(reviews_path, emails_path)
+        first = FeedbackPipeline(dedup_threshold=0.5, memo_cache=cache).process_files(reviews_path, emails_path)
+        misses = cache.stats()['misses']
+        second = FeedbackPipeline(dedup_threshold=0.5, memo_cache=cache).process_files(reviews_path, emails_path)
+        
+        expected = [[t[f] for f in fields] for t in plain['tickets']]
+        assert [[t[f] for f in fields] for t in first['tickets']] == expected
+        assert [[t[f] for f in fields] for t in second['tickets']] == expected
+        assert cache.stats()['misses'] == misses
+        assert cache.stats()['hits'] > 0
+    
+    def test_streaming_matches_full_run(self, tmp_path):
+        """Test chunked streaming to a CSV sink creates the same tickets"""
+        reviews_path = "data/app_store_reviews.csv"
+        emails_path = "data/support_emails.csv"
+        if not os.path.exists(reviews_path) or not os.path.exists(emails_path):
+            pytest.skip("Test data files not found")
+        
+        service = FeedbackService()
+        full = service.process_with_agents(reviews_path, emails_path)
+        
+        chunks = []
+        sink = CsvTicketSink(str(tmp_path / "tickets.csv"))
+        
+        def record_chunk(tickets):
+            chunks.append(len(tickets))
+            sink(tickets)
+        
+        streamed = service.stream_feedback(reviews_path, emails_path, record_chunk, chunksize=4)
+        
+        written = pd.read_csv(tmp_path / "tickets.csv", keep_default_na=False)
+        assert len(chunks) > 2
+        assert list(written['source_id']) == [t['source_id'] for t in full['tickets']]
+        assert list(written['similar_requests']) == [t['similar_requests'] for t in full['tickets']]
+        assert list(written['member_source_ids']) == [t['member_source_ids'] for t in full['tickets']]
+        assert streamed['metrics']['tickets_created'] == full['metrics']['tickets_created'] == sink.ticket_count
+        assert streamed['metrics']['duplicates_collapsed'] == full['metrics']['duplicates_collapsed']
+    
+    def test_streamed_tickets_include_later_duplicates(self, tmp_path):
+        """Test a ticket is only yielded once its dedup window closes, with duplicates from later chunks"""
+        reviews = tmp_path / "reviews.csv"
+        emails = tmp_path / "emails.csv"
+        reviews.write_text(
+            "review_id,platform,rating,review_text\n"
+            "R1,Google Play,1,App crashes on login every single time\n"
+            "R2,Google Play,1,App crashes on login every single time\n"
+            "R3,App Store,2,Checkout page crashes when paying by card\n"
+        )
+        emails.write_text("email_id,subject,body\n")
+        pipeline = FeedbackPipeline(dedup_threshold=0.5, dedup_window=2)
+        
+        chunks = list(pipeline.iter_tickets(str(reviews), str(emails), chunksize=1))
+        
+        # R1 and R2 share a window, held until R3 starts the next one
+        assert [[t['source_id'] for t in chunk] for chunk in chunks] == [[], [], ['R1'], ['R3']]
+        assert chunks[2][0]['similar_requests'] == 1
+        assert chunks[2][0]['member_source_ids'] == 'R1, R2'
+    
+    def test_process_pool_chunk_size_adapts(self):
+        """Test chunks spread items over the workers within the size bounds"""
+        pool = PipelineProcessPool(4, min_chunk_size=100, max_chunk_size=1000, chunks_per_worker=4)
+        
+        assert pool.chunk_size(50) == 100
+        assert pool.chunk_size(8000) == 500
+        assert pool.chunk_size(10 ** 6) == 1000
+    
+    def test_process_pool_matches_sequential_run(self):
+        """Test worker processes create the same, identically numbered tickets as an in-process run"""
+        reviews_path = "data/app_store_reviews.csv"
+        emails_path = "data/support_emails.csv"
+        if not os.path.exists(reviews_path) or not os.path.exists(emails_path):
+            pytest.skip("Test data files not found")
+        
+        pool = PipelineProcessPool(2, min_chunk_size=4)
+        try:
+            sequential = FeedbackPipeline(dedup_threshold=0.5, batch_size=7)
+            parallel = FeedbackPipeline(dedup_threshold=0.5, batch_size=7, process_pool=pool)
+            expected = sequential.process_files(reviews_path, emails_path)
+            result = parallel.process_files(reviews_path, emails_path)
+        finally:
+            pool.close()
+        
+        fields = ['ticket_id', 'source_id', 'category', 'title', 'priority', 'similar_requests', 'member_source_ids']
+        tickets, expected_tickets = ([[t[f] for f in fields] for t in r['tickets']] for r in (result, expected))
+        assert tickets == expected_tickets
+        assert result['category_counts'] == expected['category_counts']
+        assert result['duplicates_collapsed'] == expected['duplicates_collapsed']
+        assert result['quality_review']['approved'] == expected['quality_review']['approved']
+        assert parallel.ticket_creator.ticket_counter == sequential.ticket_creator.ticket_counter
+
+
+class TestJobManager:
+    """Test the bounded background job queue"""
+    
+    def setup_method(self):
+        """Setup a one-worker manager with room for one waiting job"""
+        self.manager = JobManager(max_workers=1, max_queued=1, max_finished=10)
+        self.release = threading.Event()
+    
+    def teardown_method(self):
+        self.release.set()
+        self.manager.shutdown()
+    
+    def wait_for(self, job, *statuses):
+        """Wait until a job reaches one of the statuses"""
+        for _ in range(200):
+            if job.status in statuses:
+                return
+            time.sleep(0.01)
+        raise AssertionError(f"job stayed {job.status}")
+    
+    def blocking_job(self, job):
+        """Job reporting progress until released"""
+        while not self.release.wait(0.01):
+            job.report(waiting=True)
+        return {'metrics': {'tickets_created': 1}}
+    
+    def test_queue_is_bounded_and_queued_jobs_cancel(self):
+        """Test submissions beyond workers + queue are rejected and a queued job never runs"""
+        running = self.manager.submit('test', self.blocking_job)
+        queued = self.manager.submit('test', lambda job: pytest.fail("cancelled job ran"))
+        self.wait_for(running, 'running')
+        
+        with pytest.raises(JobQueueFull):
+            self.manager.submit('test', self.blocking_job)
+        
+        assert self.manager.cancel(queued.job_id).status == 'cancelled'
+        self.release.set()
+        self.wait_for(running, 'succeeded')
+        assert running.to_dict()['metrics'] == {'tickets_created': 1}
+        assert self.manager.stats()['succeeded'] == 1 and self.manager.stats()['cancelled'] == 1
+    
+    def test_running_job_stops_at_next_report(self):
+        """Test cancelling a running job stops it at its next progress report"""
+        job = self.manager.submit('test', self.blocking_job)
+        self.wait_for(job, 'running')
+        
+        self.manager.cancel(job.job_id)
+        self.wait_for(job, 'cancelled')
+        
+        assert job.result is None and job.progress == {'waiting': True}
+        with pytest.raises(ValueError):
+            self.manager.cancel(job.job_id)
+        with pytest.raises(JobCancelled):
+            job.check_cancelled()
+    
+    def test_job_routes(self):
+        """Test submitting a job, polling it and fetching its tickets over HTTP"""
+        from fastapi.testclient import TestClient
+        from src.main import app
+        if not os.path.exists("data/app_store_reviews.csv"):
+            pytest.skip("Test data files not found")
+        client = TestClient(app)
+        
+        response = client.post("/api/v1/feedback/jobs")
+        assert response.status_code == 202
+        job_id = response.json()['job_id']
+        
+        for _ in range(200):
+            job = client.get(f"/api/v1/feedback/jobs/{job_id}").json()
+            if job['status'] not in ('queued', 'running'):
+                break
+            time.sleep(0.01)
+        
+        result = client.get(f"/api/v1/feedback/jobs/{job_id}/result").json()
+        assert job['status'] == 'succeeded'
+        assert job['progress']['items_processed'] == job['metrics']['total_feedback']
+        assert len(result['tickets']) == job['metrics']['tickets_created']
+        assert client.delete(f"/api/v1/feedback/jobs/{job_id}").status_code == 409
+        assert client.get("/api/v1/feedback/jobs/unknown").status_code == 404
+
+
+class TestAppServices:
+    """Test the services shared across requests through the app lifespan"""
+    
+    def test_lifespan_shares_and_closes_services(self):
+        """Test every request gets the same controllers and shutdown closes the LLM connection pool"""
+        from fastapi.testclient import TestClient
+        from src.main import app
+        
+        with TestClient(app) as client:
+            services = app.state.services
+            assert client.get("/api/v1/user/me").status_code == 200
+            assert client.get("/api/v1/feedback/jobs/unknown").status_code == 404
+            assert app.state.services is services
+            assert not services.llm_http_client.is_closed
+        
+        assert services.llm_http_client.is_closed
+        assert app.state.services is None
+    
+    def test_chat_service_reuses_pooled_client(self, monkeypatch):
+        """Test chat calls go through the shared HTTP client, and a missing key fails per request"""
+        import httpx
+        from src.services.chat_service import ChatService
+        
+        requests = []
+        
+        def respond(request):
+            requests.append(request.url.path)
+            return httpx.Response(200, json={
+                'id': 'c1', 'object': 'chat.completion', 'created': 0, 'model': 'gpt-4o-mini',
+                'choices': [{'index': 0, 'finish_reason': 'stop', 'message': {'role': 'assistant', 'content': 'Hi'}}]
+            })
+        
+        http_client = httpx.AsyncClient(transport=httpx.MockTransport(respond))
+        monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+        service = ChatService(http_client)
+        
+        async def chat_twice():
+            return [await service.get_chat_response("Hello") for _ in range(2)]
+        
+        assert asyncio.run(chat_twice()) == ['Hi', 'Hi']
+        assert requests == ['/v1/chat/completions'] * 2
+        
+        monkeypatch.delenv("OPENAI_API_KEY")
+        with pytest.raises(ValueError):
+            asyncio.run(ChatService(http_client).get_chat_response("Hello"))
+
+
+class TestChatStreaming:
+    """Test token streaming from a stub completion server"""
+    
+    def stub_client(self, tokens, delay=0.0):
+        """HTTP client whose completions endpoint streams the tokens as SSE chunks, then a usage chunk"""
+        import httpx
+        import json
+        
+        def chunk(choices, **extra):
+            body = {'id': 'c1', 'object': 'chat.completion.chunk', 'created': 0, 'model': 'gpt-4o-mini',
+                    'choices': choices, **extra}
+            return f"data: {json.dumps(body)}\n\n".encode()
+        
+        class TokenStream(httpx.AsyncByteStream):
+            async def __aiter__(self):
+                for token in tokens:
+                    yield chunk([{'index': 0, 'delta': {'content': token}, 'finish_reason': None}])
+                    await asyncio.sleep(delay)
+                yield chunk([{'index': 0, 'delta': {}, 'finish_reason': 'stop'}])
+                yield chunk([], usage={'prompt_tokens': 3, 'completion_tokens': len(tokens),
+                                       'total_tokens': 3 + len(tokens)})
+                yield b"data: [DONE]\n\n"
+        
+        def respond(request):
+            assert json.loads(request.content)['stream'] is True
+            return httpx.Response(200, headers={'content-type': 'text/event-stream'}, stream=TokenStream())
+        
+        return httpx.AsyncClient(transport=httpx.MockTransport(respond))
+    
+    def test_tokens_relayed_before_completion_ends(self, monkeypatch):
+        """Test the first token is relayed well before a slow completion finishes, ending with a usage record"""
+        from src.services.chat_service import ChatService
+        
+        monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+        service = ChatService(self.stub_client(['Hel', 'lo', ' there'], delay=0.2))
+        
+        async def collect():
+            started = time.perf_counter()
+            stream = await service.open_chat_stream("Hello")
+            events = []
+            async for event in service.iter_chat_stream(stream):
+                events.append((event, time.perf_counter() - started))
+            return events
+        
+        events = asyncio.run(collect())
+        assert [event['content'] for event, _ in events[:-1]] == ['Hel', 'lo', ' there']
+        assert events[0][1] < 0.2 < events[-1][1]
+        
+        done = events[-1][0]
+        assert done['type'] == 'done'
+        assert done['finish_reason'] == 'stop'
+        assert done['usage']['completion_tokens'] == 3
+    
+    def test_stream_endpoint_emits_server_sent_events(self, monkeypatch):
+        """Test the endpoint frames tokens and the final record as SSE, and rejects blank messages"""
+        import json
+        from fastapi.testclient import TestClient
+        from src.controller.chat_controller import ChatController
+        from src.main import app
+        from src.services.chat_service import ChatService
+        
+        monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+        with TestClient(app) as client:
+            app.state.services.chat_controller = ChatController(ChatService(self.stub_client(['Hi', '!'])))
+            response = client.post("/api/v1/mainchat/chat/stream", json={'message': 'Hello'})
+            blank = client.post("/api/v1/mainchat/chat/stream", json={'message': '   '})
+        
+        assert response.status_code == 200
+        assert response.headers['content-type'].startswith('text/event-stream')
+        events = [block.split('\n') for block in response.text.strip().split('\n\n')]
+        assert [lines[0] for lines in events] == ['event: token', 'event: token', 'event: done']
+        assert [json.loads(lines[1][len('data: '):]).get('content') for lines in events[:2]] == ['Hi', '!']
+        assert json.loads(events[-1][1][len('data: '):])['usage']['total_tokens'] == 5
+        assert blank.status_code == 400
+    
+    def test_stream_usage_settles_budget(self, monkeypatch):
+        """Test the usage reported in the final chunk replaces the stream's estimated token charge"""
+        from src.services.chat_service import ChatService
+        from src.services.rate_limiter import UpstreamScheduler
+        
+        monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+        scheduler = UpstreamScheduler(tokens_per_minute=6000)
+        service = ChatService(self.stub_client(['Hi', '!']), scheduler=scheduler)
+        
+        async def consume():
+            stream = await service.open_chat_stream("Hello")
+            charged = scheduler.tokens.available()
+            events = [event async for event in service.iter_chat_stream(stream)]
+            return charged, events
+        
+        charged, events = asyncio.run(consume())
+        assert charged < 6000 - 200
+        assert events[-1]['usage']['total_tokens'] == 5
+        assert scheduler.tokens.available() > 6000 - 10
+
+
+class TestLLMResponseCache:
+    """Test the chat response cache and its on-disk tier"""
+    
+    def test_repeated_prompts_skip_upstream(self, monkeypatch):
+        """Test repeated and concurrent identical prompts make one upstream call"""
+        import httpx
+        from src.services.chat_service import ChatService
+        from src.services.llm_cache import LLMResponseCache
+        
+        calls = []
+        
+        def respond(request):
+            calls.append(request.url.path)
+            return httpx.Response(200, json={
+                'id': 'c1', 'object': 'chat.completion', 'created': 0, 'model': 'gpt-4o-mini',
+                'choices': [{'index': 0, 'finish_reason': 'stop', 'message': {'role': 'assistant', 'content': 'Hi'}}]
+            })
+        
+        monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+        cache = LLMResponseCache(max_entries=10)
+        service = ChatService(httpx.AsyncClient(transport=httpx.MockTransport(respond)), cache)
+        
+        async def chat():
+            first = await asyncio.gather(*(service.get_chat_response("Hello  there") for _ in range(5)))
+            return first + [await service.get_chat_response(" Hello there ")]
+        
+        assert asyncio.run(chat()) == ['Hi'] * 6
+        assert len(calls) == 1
+        assert cache.stats()['memory_hits'] == 1
+    
+    def test_disk_tier_survives_restart(self, tmp_path):
+        """Test a new cache on the same file serves stored responses until they expire"""
+        from src.services.llm_cache import LLMResponseCache
+        
+        path = str(tmp_path / "llm_cache.db")
+        key = LLMResponseCache.make_key('gpt-4o-mini', [{'role': 'user', 'content': 'Hello'}])
+        other = LLMResponseCache.make_key('gpt-4o', [{'role': 'user', 'content': 'Hello'}])
+        asyncio.run(LLMResponseCache(db_path=path).set(key, 'Hi'))
+        
+        restarted = LLMResponseCache(db_path=path)
+        assert asyncio.run(restarted.get(key)) == 'Hi'
+        assert asyncio.run(restarted.get(key)) == 'Hi'
+        assert asyncio.run(restarted.get(other)) is None
+        stats = restarted.stats()
+        assert (stats['disk_hits'], stats['memory_hits'], stats['misses']) == (1, 1, 1)
+        
+        expiring = LLMResponseCache(db_path=str(tmp_path / "expiring.db"), ttl_seconds=0.05)
+        asyncio.run(expiring.set(key, 'Hi'))
+        time.sleep(0.1)
+        assert asyncio.run(LLMResponseCache(db_path=str(tmp_path / "expiring.db")).get(key)) is None
+
+
+class TestLLMClassifier:
+    """Test the batched LLM classifier against a local stub completions server"""
+    
+    def start_stub(self, label):
+        """Stub server answering each classification request with `label(item)` per item; returns (url, state)"""
+        import json
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        
+        state = {'requests': [], 'in_flight': 0, 'max_in_flight': 0}
+        lock = threading.Lock()
+        
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+                items = json.loads(body['messages'][-1]['content'])
+                with lock:
+                    state['requests'].append(body)
+                    state['in_flight'] += 1
+                    state['max_in_flight'] = max(state['max_in_flight'], state['in_flight'])
+                time.sleep(0.05)
+                with lock:
+                    state['in_flight'] -= 1
+                
+                content = label(items)
+                if not isinstance(content, str):
+                    content = json.dumps({'results': content})
+                response = json.dumps({
+                    'id': 'c1', 'object': 'chat.completion', 'created': 0, 'model': body['model'],
+                    'choices': [{'index': 0, 'finish_reason': 'stop',
+                                 'message': {'role': 'assistant', 'content': content}}]
+                }).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(response)))
+                self.end_headers()
+                self.wfile.write(response)
+            
+            def log_message(self, *args):
+                pass
+        
+        server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.server = server
+        return f"http://127.0.0.1:{server.server_port}/v1", state
+    
+    def teardown_method(self):
+        """Stop the stub server"""
+        if getattr(self, 'server', None) is not None:
+            self.server.shutdown()
+            self.server.server_close()
+    
+    def items(self, count):
+        """Feedback items the keyword classifier calls bugs"""
+        return [{'review_id': f'R{i}', 'review_text': f'App crashes with an error {i}', 'rating': 1}
+                for i in range(count)]
+    
+    def write_inputs(self, tmp_path):
+        """Five small reviews and no emails"""
+        reviews = tmp_path / "reviews.csv"
+        emails = tmp_path / "emails.csv"
+        reviews.write_text("review_id,platform,rating,review_text\n" + "".join(
+            f"R{i},App Store,2,The app is slow and annoying {i}\n" for i in range(5)
+        ))
+        emails.write_text("email_id,subject,body\n")
+        return str(reviews), str(emails)
+    
+    def test_items_packed_into_concurrent_batches(self):
+        """Test items go out batch_size per request, at most max_concurrency at once, with per-item fallback"""
+        from src.agents.llm_classifier_agent import LLMClassifierAgent
+        
+        def label(items):
+            # The second item of every batch gets an unknown category
+            return [{'id': item['id'], 'category': 'Praise' if item['id'] != 1 else 'Nonsense', 'confidence': 0.9}
+                    for item in items]
+        
+        url, state = self.start_stub(label)
+        agent = LLMClassifierAgent('test-key', 'gpt-4o-mini', batch_size=3, max_concurrency=2, base_url=url)
+        items = agent.classify_batch(self.items(8))
+        
+        assert len(state['requests']) == 3
+        assert state['max_in_flight'] == 2
+        assert state['requests'][0]['response_format']['type'] == 'json_schema'
+        assert [item['category'] for item in items] == ['Praise', 'Bug', 'Praise'] * 2 + ['Praise', 'Bug']
+        assert all('keyword_hits' in item for item in items)
+        assert agent.stats()['fallbacks'] == 3
+    
+    def test_malformed_responses_fall_back_to_keywords(self):
+        """Test invalid JSON keeps keyword labels for the batch, and invalid results are dropped one by one"""
+        from src.agents.llm_classifier_agent import LLMClassifierAgent
+        
+        url, _ = self.start_stub(lambda items: 'not json')
+        agent = LLMClassifierAgent('test-key', 'gpt-4o-mini', batch_size=2, base_url=url)
+        
+        assert [item['category'] for item in agent.classify_batch(self.items(3))] == ['Bug'] * 3
+        assert agent.parse_response(
+            '{"results": [{"id": 0, "category": "Spam", "confidence": 0.7}, {"id": 0, "category": "Bug", '
+            '"confidence": 0.5}, {"id": 5, "category": "Bug", "confidence": 0.5}, '
+            '{"id": 1, "category": "Bug", "confidence": 2}, {"id": true, "category": "Bug", "confidence": 0.5}]}',
+            3
+        ) == {0: ('Spam', 0.7)}
+    
+    def test_pipeline_uses_llm_classifier(self, tmp_path):
+        """Test the pipeline classifies through the LLM backend, even with a process pool configured"""
+        from src.agents.llm_classifier_agent import LLMClassifierAgent
+        
+        url, state = self.start_stub(lambda items: [
+            {'id': item['id'], 'category': 'Complaint', 'confidence': 0.8} for item in items
+        ])
+        agent = LLMClassifierAgent('test-key', 'gpt-4o-mini', batch_size=4, base_url=url)
+        pool = PipelineProcessPool(2, min_chunk_size=1)
+        try:
+            pipeline = FeedbackPipeline(batch_size=10, process_pool=pool, classifier=agent)
+            result = pipeline.process_files(*self.write_inputs(tmp_path))
+        finally:
+            pool.close()
+        
+        assert result['category_counts'] == {'Complaint': 5}
+        assert len(state['requests']) == 2
+    
+class TestLLMResilience:
+    """Test deadlines, retries, hedging and circuit breaking against a fault-injecting stub"""
+    
+    def stub_service(self, monkeypatch, faults, resilience):
+        """ChatService on a stub completions endpoint; `faults` yields (status, delay) for each request"""
+        import httpx
+        from src.services.chat_service import ChatService
+        
+        calls = []
+        
+        async def respond(request):
+            status, delay = next(faults)
+            calls.append(status)
+            await asyncio.sleep(delay)
+            if status != 200:
+                return httpx.Response(status, json={'error': {'message': 'injected fault'}})
+            return httpx.Response(200, json={
+                'id': 'c1', 'object': 'chat.completion', 'created': 0, 'model': 'gpt-4o-mini',
+                'choices': [{'index': 0, 'finish_reason': 'stop', 'message': {'role': 'assistant', 'content': 'Hi'}}]
+            })
+        
+        monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+        service = ChatService(httpx.AsyncClient(transport=httpx.MockTransport(respond)), resilience=resilience)
+        return service, calls
+    
+    def test_transient_errors_retried_within_deadline(self, monkeypatch):
+        """Test 5xx responses are retried, client errors are not, and a slow upstream hits the deadline"""
+        from src.services.llm_resilience import ResilientCaller
+        
+        resilience = ResilientCaller(deadline_seconds=0.5, max_attempts=3, backoff_base_seconds=0.01)
+        faults = iter([(500, 0), (503, 0), (200, 0), (400, 0), (200, 2)])
+        service, calls = self.stub_service(monkeypatch, faults, resilience)
+        
+        assert asyncio.run(service.get_chat_response("Hello")) == 'Hi'
+        assert calls == [500, 503, 200]
+        with pytest.raises(Exception, match="injected fault"):
+            asyncio.run(service.get_chat_response("Hello"))
+        assert calls[-1] == 400
+        
+        started = time.perf_counter()
+        with pytest.raises(asyncio.TimeoutError):
+            asyncio.run(service.get_chat_response("Hello"))
+        assert time.perf_counter() - started < 1
+        
+        stats = resilience.stats()
+        assert (stats['retries'], stats['deadline_exceeded'], stats['successes']) == (2, 1, 1)
+    
+    def test_circuit_opens_fails_fast_and_recovers(self, monkeypatch):
+        """Test the breaker rejects calls without reaching upstream once errors spike, then recovers"""
+        from fastapi import HTTPException
+        from src.controller.chat_controller import ChatController
+        from src.services.llm_resilience import CircuitBreaker, CircuitOpenError, ResilientCaller
+        
+        breaker = CircuitBreaker(failure_rate=0.5, window=10, min_calls=4, open_seconds=0.2)
+        resilience = ResilientCaller(deadline_seconds=1, max_attempts=1, breaker=breaker)
+        faults = iter([(500, 0)] * 4 + [(200, 0)])
+        service, calls = self.stub_service(monkeypatch, faults, resilience)
+        
+        for _ in range(4):
+            with pytest.raises(Exception, match="injected fault"):
+                asyncio.run(service.get_chat_response("Hello"))
+        assert breaker.state == 'open'
+        with pytest.raises(CircuitOpenError):
+            asyncio.run(service.get_chat_response("Hello"))
+        with pytest.raises(HTTPException) as error:
+            asyncio.run(ChatController(service).handle_basic_chat())
+        assert error.value.status_code == 503
+        assert len(calls) == 4
+        
+        time.sleep(0.25)
+        assert asyncio.run(service.get_chat_response("Hello")) == 'Hi'
+        assert breaker.state == 'closed'
+        assert resilience.stats()['circuit_rejected'] == 2
+    
+    def test_slow_attempt_is_hedged(self, monkeypatch):
+        """Test an attempt slower than the latency percentile gets a second request, which wins"""
+        from src.services.llm_resilience import ResilientCaller
+        
+        resilience = ResilientCaller(deadline_seconds=5, hedge_percentile=50, hedge_min_samples=3)
+        faults = iter([(200, 0.01)] * 3 + [(200, 3), (200, 0.01)])
+        service, calls = self.stub_service(monkeypatch, faults, resilience)
+        
+        async def chat():
+            for _ in range(3):
+                await service.get_chat_response("Hello")
+            started = time.perf_counter()
+            response = await service.get_chat_response("Hello")
+            return response, time.perf_counter() - started
+        
+        response, elapsed = asyncio.run(chat())
+        assert response == 'Hi'
+        assert elapsed < 1
+        assert len(calls) == 5
+        assert (resilience.hedges, resilience.hedge_wins) == (1, 1)
+
+
+class TestUpstreamScheduler:
+    """Test the requests- and tokens-per-minute scheduler for upstream calls"""
+    
+    def test_requests_admitted_in_order_within_budget(self):
+        """Test queued requests wait for the token budget and are admitted first come, first served"""
+        from src.services.rate_limiter import UpstreamScheduler
+        
+        scheduler = UpstreamScheduler(tokens_per_minute=6000, max_wait_seconds=5)
+        admitted = []
+        
+        async def request(name, tokens, delay):
+            await asyncio.sleep(delay)
+            await scheduler.acquire(tokens)
+            admitted.append((name, time.perf_counter() - started))
+        
+        async def burst():
+            await scheduler.acquire(6000)
+            # The large request is first in line; the small one behind it must not overtake it
+            await asyncio.gather(request('large', 30, 0), request('small', 1, 0.01), request('last', 10, 0.02))
+        
+        started = time.perf_counter()
+        asyncio.run(burst())
+        
+        assert [name for name, _ in admitted] == ['large', 'small', 'last']
+        assert 0.25 < admitted[0][1] < admitted[-1][1] < 1
+        stats = scheduler.stats()
+        assert (stats['admitted'], stats['queue_depth']) == (4, 0)
+        assert stats['wait_p95_seconds'] > 0.25
+    
+    def test_waits_are_bounded(self):
+        """Test a request is rejected when its wait would be too long or the queue is full"""
+        from src.services.rate_limiter import RateLimitExceeded, UpstreamScheduler
+        
+        scheduler = UpstreamScheduler(requests_per_minute=60, max_wait_seconds=1.5, max_queue=1)
+        
+        async def scenario():
+            # With the budget spent, the next request waits about a second at the head of the queue
+            scheduler.requests.take(60)
+            head = asyncio.ensure_future(scheduler.acquire(1))
+            await asyncio.sleep(0.05)
+            with pytest.raises(RateLimitExceeded):
+                await scheduler.acquire(1)
+            await head
+            
+            scheduler.requests.take(60)
+            with pytest.raises(RateLimitExceeded) as error:
+                await scheduler.acquire(1)
+            return error.value
+        
+        error = asyncio.run(scenario())
+        assert error.retry_after > 1.5
+        assert scheduler.stats()['admitted'] == 1
+        assert scheduler.stats()['rejected'] == 2
+    
+    def test_reported_usage_settles_budget_and_maps_to_429(self, monkeypatch):
+        """Test actual usage is charged to the budget and an exhausted budget becomes a 429 with Retry-After"""
+        import httpx
+        from fastapi import HTTPException
+        from src.controller.chat_controller import ChatController
+        from src.services.chat_service import ChatService
+        from src.services.rate_limiter import UpstreamScheduler
+        
+        def respond(request):
+            return httpx.Response(200, json={
+                'id': 'c1', 'object': 'chat.completion', 'created': 0, 'model': 'gpt-4o-mini',
+                'choices': [{'index': 0, 'finish_reason': 'stop', 'message': {'role': 'assistant', 'content': 'Hi'}}],
+                'usage': {'prompt_tokens': 100, 'completion_tokens': 5800, 'total_tokens': 5900}
+            })
+        
+        monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+        scheduler = UpstreamScheduler(tokens_per_minute=6000, max_wait_seconds=0.1)
+        service = ChatService(httpx.AsyncClient(transport=httpx.MockTransport(respond)), scheduler=scheduler)
+        controller = ChatController(service)
+        
+        async def chat_twice():
+            first = await controller.handle_basic_chat()
+            with pytest.raises(HTTPException) as error:
+                await controller.handle_basic_chat()
+            return first, error.value
+        
+        first, error = asyncio.run(chat_twice())
+        assert first.response == 'Hi'
+        assert scheduler.tokens.available() < 200
+        assert error.status_code == 429
+        assert int(error.headers['Retry-After']) >= 1
+
+
+    def test_every_attempt_is_charged(self, monkeypatch):
+        """Test a retried completion takes budget for each upstream request, not once per call"""
+        import httpx
+        from src.services.chat_service import ChatService
+        from src.services.llm_resilience import ResilientCaller
+        from src.services.rate_limiter import UpstreamScheduler
+        
+        responses = [httpx.Response(500, json={'error': {'message': 'overloaded'}})]
+        
+        def respond(request):
+            if responses:
+                return responses.pop()
+            return httpx.Response(200, json={
+                'id': 'c1', 'object': 'chat.completion', 'created': 0, 'model': 'gpt-4o-mini',
+                'choices': [{'index': 0, 'finish_reason': 'stop', 'message': {'role': 'assistant', 'content': 'Hi'}}]
+            })
+        
+        monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+        scheduler = UpstreamScheduler(requests_per_minute=60)
+        service = ChatService(
+            httpx.AsyncClient(transport=httpx.MockTransport(respond)),
+            resilience=ResilientCaller(backoff_base_seconds=0.01), scheduler=scheduler
+        )
+        
+        assert asyncio.run(service.get_chat_response("Hello")) == 'Hi'
+        assert scheduler.stats()['admitted'] == 2
+        assert scheduler.requests.available() < 59
 
 
 class TestFeedbackController:
@@ -117,6 +1473,230 @@ class TestFeedbackController:
         """Test controller initializes correctly"""
         assert self.controller is not None
         assert self.controller.feedback_service is not None
+    
+    def test_sources_must_be_inside_the_source_dir(self, tmp_path, monkeypatch):
+        """Test declared sources outside FEEDBACK_SOURCE_DIR are rejected before they are opened"""
+        from fastapi import HTTPException
+        from src.models.feedback_models import FeedbackSourcesInput
+        
+        data_dir = tmp_path / 'data'
+        data_dir.mkdir()
+        (data_dir / 'reviews.csv').write_text("review_id,review_text\nR1,App crashes\n")
+        (tmp_path / 'secret.csv').write_text("name,text\nx,secret\n")
+        (data_dir / 'link.csv').symlink_to(tmp_path / 'secret.csv')
+        monkeypatch.setattr('src.controller.feedback_controller.settings.feedback_source_dir', str(data_dir))
+        
+        def specs(path):
+            source = {'path': path, 'source_type': 'review', 'columns': {'text': 'text'}}
+            sources = FeedbackSourcesInput(sources=[source])
+            return self.controller._source_specs(sources)
+        
+        assert specs(str(data_dir / 'reviews.csv'))[0].path == os.path.realpath(data_dir / 'reviews.csv')
+        for path in (str(tmp_path / 'secret.csv'), str(data_dir / '..' / 'secret.csv'), str(data_dir / 'link.csv'),
+                     '/etc/passwd', str(tmp_path / 'missing.csv')):
+            with pytest.raises(HTTPException) as error:
+                specs(path)
+            assert error.value.status_code == 403
+        with pytest.raises(HTTPException) as error:
+            specs(str(data_dir / 'missing.csv'))
+        assert error.value.status_code == 404
+    
+    def test_app_services_own_the_ticket_databases(self, ticket_databases):
+        """Test the ticket store and ID allocator are created with the app services, from the settings"""
+        from src.dependencies import AppServices
+        
+        services = AppServices()
+        controller = services.feedback_controller
+        assert controller.ticket_store is services.ticket_store
+        assert controller.feedback_service.id_allocator is services.ticket_ids
+        assert services.ticket_store.db_path == services.ticket_ids.db_path == ticket_databases
+        assert self.controller.ticket_store.db_path == ':memory:'
+        assert self.controller.feedback_service.id_allocator is None
+
+
+class TestUploadProcessing:
+    """Test streamed processing of uploaded CSV files"""
+    
+    def setup_method(self):
+        """Setup test client"""
+        from fastapi.testclient import TestClient
+        from src.main import app
+        self.client = TestClient(app)
+        self.url = "/api/v1/feedback/process/upload"
+    
+    def test_processes_uploads_without_temp_files(self):
+        """Test uploads are parsed straight from the request files"""
+        reviews = b"review_id,platform,rating,review_text\nR1,App Store,1,App crashes on login every time\n"
+        emails = b"email_id,subject,body\nE1,Idea,Please add a dark mode feature\n"
+        
+        response = self.client.post(self.url, files={
+            'reviews_file': ('reviews.csv', reviews, 'text/csv'),
+            'emails_file': ('emails.csv', emails, 'text/csv')
+        })
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert data['metrics']['total_feedback'] == 2
+        assert [t['source_id'] for t in data['tickets']] == ['R1', 'E1']
+    
+    def test_rejects_bad_header_and_oversized_upload(self, monkeypatch):
+        """Test malformed headers and uploads over the cap fail before processing"""
+        emails = b"email_id,subject,body\nE1,Hi,Thanks\n"
+        response = self.client.post(self.url, files={
+            'reviews_file': ('reviews.csv', b"id,text\n1,hello\n", 'text/csv'),
+            'emails_file': ('emails.csv', emails, 'text/csv')
+        })
+        assert response.status_code == 400
+        assert 'review_id' in response.json()['detail']
+        
+        monkeypatch.setattr('src.controller.feedback_controller.settings.upload_max_mb', 0.00001)
+        response = self.client.post(self.url, files={
+            'reviews_file': ('reviews.csv', b"review_id,review_text\n" + b"R1,x\n" * 10, 'text/csv'),
+            'emails_file': ('emails.csv', emails, 'text/csv')
+        })
+        assert response.status_code == 413
+    
+    def test_body_limit_applies_while_streaming(self):
+        """Test multipart bodies over the limit are cut off as they arrive, declared length or not"""
+        from fastapi import FastAPI, File, UploadFile
+        from fastapi.testclient import TestClient
+        from src.middleware import BodySizeLimitMiddleware
+        
+        app = FastAPI()
+        app.add_middleware(BodySizeLimitMiddleware, max_bytes=1000)
+        
+        @app.post("/upload")
+        async def upload(file: UploadFile = File(...)):
+            return {'size': len(await file.read())}
+        
+        client = TestClient(app)
+        boundary = 'x-boundary'
+        
+        def body(size):
+            yield f"--{boundary}\r\nContent-Disposition: form-data; name=\"file\"; filename=\"a.csv\"\r\n\r\n".encode()
+            for _ in range(size // 100):
+                yield b"r" * 100
+            yield f"\r\n--{boundary}--\r\n".encode()
+        
+        headers = {'content-type': f"multipart/form-data; boundary={boundary}"}
+        assert client.post("/upload", content=body(500), headers=headers).json() == {'size': 500}
+        streamed = client.post("/upload", content=body(5000), headers=headers)
+        declared = client.post("/upload", files={'file': ('a.csv', b"r" * 5000, 'text/csv')})
+        assert streamed.status_code == declared.status_code == 413
+
+
+class TestIncrementalProcessing:
+    """Test incremental processing with per-file watermarks"""
+    
+    def setup_method(self):
+        """Setup service"""
+        self.service = FeedbackService()
+    
+    def write_inputs(self, tmp_path):
+        """Small review and email files"""
+        reviews = tmp_path / "reviews.csv"
+        emails = tmp_path / "emails.csv"
+        reviews.write_text("review_id,platform,rating,review_text\nR1,Google Play,1,App crashes on login every time\n")
+        emails.write_text("email_id,subject,body\nE1,Idea,Please add a dark mode feature\n")
+        return str(reviews), str(emails)
+    
+    def test_only_appended_rows_are_processed(self, tmp_path):
+        """Test a second run picks up new rows only, continuing ticket numbers and the output CSV"""
+        reviews, emails = self.write_inputs(tmp_path)
+        store = TicketStore(str(tmp_path / "tickets.db"))
+        output = str(tmp_path / "tickets.csv")
+        ids_path = str(tmp_path / "ticket_ids.db")
+        service = FeedbackService(id_allocator=TicketIdAllocator(ids_path, block_size=10))
+        
+        first = service.process_incremental(reviews, emails, store, CsvTicketSink(output, append=True))
+        assert first['metrics']['total_feedback'] == 2
+        assert first['watermarks'][reviews]['last_source_id'] == 'R1'
+        
+        with open(reviews, 'a') as f:
+            f.write("R2,App Store,5,Great app love it works perfectly\nR3,App Store,1,Crash wh")
+        restarted = FeedbackService(id_allocator=TicketIdAllocator(ids_path, block_size=10))
+        second = restarted.process_incremental(reviews, emails, store, CsvTicketSink(output, append=True))
+        
+        # The unterminated last row waits for the next run
+        assert second['metrics']['total_feedback'] == 1
+        assert second['watermarks'][reviews]['rows'] == 2
+        assert second['watermarks'][reviews]['last_source_id'] == 'R2'
+        saved = pd.read_csv(output)
+        assert list(saved['source_id']) == ['R1', 'E1', 'R2']
+        # The restarted service continues after the block reserved by the first one
+        assert list(saved['ticket_id']) == ['TICK-1001', 'TICK-1002', 'TICK-1011']
+        assert store.count() == 3
+    
+    def test_quoted_newlines_do_not_split_rows(self, tmp_path):
+        """Test a multi-line quoted field still being written is left whole for the next run"""
+        reviews, emails = self.write_inputs(tmp_path)
+        store = TicketStore(str(tmp_path / "tickets.db"))
+        with open(reviews, 'a') as f:
+            f.write('R2,App Store,1,"Crashes on start\nafter the update"\nR3,App Store,1,"Sync fails\n')
+        
+        first = self.service.process_incremental(reviews, emails, store)
+        assert first['watermarks'][reviews]['last_source_id'] == 'R2'
+        assert store.query(source_id='R2')[0]['description'].count('after the update') == 1
+        
+        with open(reviews, 'a') as f:
+            f.write('every time I open it"\n')
+        second = self.service.process_incremental(reviews, emails, store)
+        assert second['metrics']['total_feedback'] == 1
+        assert second['watermarks'][reviews]['rows'] == 3
+        assert 'Sync fails\nevery time I open it' in store.query(source_id='R3')[0]['description']
+    
+    def test_rewritten_file_is_rejected(self, tmp_path):
+        """Test a file whose processed part changed raises instead of skipping rows"""
+        reviews, emails = self.write_inputs(tmp_path)
+        store = TicketStore(str(tmp_path / "tickets.db"))
+        self.service.process_incremental(reviews, emails, store)
+        
+        with open(emails, 'w') as f:
+            f.write("email_id,subject,body\nE9,Other,Completely different content\n")
+        with pytest.raises(ValueError):
+            self.service.process_incremental(reviews, emails, store)
+        
+        store.reset_watermarks()
+        result = self.service.process_incremental(reviews, emails, store)
+        assert result['metrics']['total_feedback'] == 2
+    
+    @pytest.mark.parametrize('engine', ['pipeline', 'inline'])
+    def test_incremental_run_after_full_refresh_adds_nothing(self, tmp_path, monkeypatch, engine):
+        """Test a full refresh records watermarks, so the next incremental run does not reinsert its rows"""
+        reviews, emails = self.write_inputs(tmp_path)
+        store = TicketStore(str(tmp_path / "tickets.db"))
+        self.service.engine = engine
+        result = self.service.process_all_feedback(reviews, emails)
+        assert result['source_rows']['review'] == {'rows': 1, 'last_source_id': 'R1'}
+        
+        # Row counts come from the run, so the files are not parsed again
+        def reparse(*args, **kwargs):
+            raise AssertionError("file_watermarks reparsed a feedback file")
+        monkeypatch.setattr(self.service.pipeline.reader, 'iter_records_between', reparse)
+        watermarks = self.service.file_watermarks(reviews, emails, result['source_rows'])
+        monkeypatch.undo()
+        
+        store.replace_all(result['tickets'], 'digest-1', watermarks)
+        count = store.count()
+        
+        incremental = self.service.process_incremental(reviews, emails, store)
+        assert incremental['metrics']['total_feedback'] == 0
+        assert store.count() == count
+        assert store.watermark(os.path.abspath(reviews))['last_source_id'] == 'R1'
+        assert store.watermark(os.path.abspath(emails))['rows'] == 1
+    
+    def test_reread_rows_update_their_tickets(self, tmp_path):
+        """Test rows read again without watermarks replace their stored tickets, keeping the ticket IDs"""
+        reviews, emails = self.write_inputs(tmp_path)
+        store = TicketStore(str(tmp_path / "tickets.db"))
+        result = self.service.process_all_feedback(reviews, emails)
+        store.replace_all(result['tickets'], 'digest-1')
+        ticket_ids = sorted(ticket['ticket_id'] for ticket in store.query())
+        
+        self.service.process_incremental(reviews, emails, store)
+        assert store.count() == len(ticket_ids)
+        assert sorted(ticket['ticket_id'] for ticket in store.query()) == ticket_ids
+        assert store.count(source_id='R1') == 1
 
 
 class TestIntegration: